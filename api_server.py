@@ -0,0 +1,497 @@
+"""
+HTTP API serving KPIs, recommendations and chart JSON
+
+A plain ASGI application, so it runs under any ASGI server (uvicorn, hypercorn) and can
+be called in-process. Requests are handled on the asyncio loop while the pandas work
+runs in a pool of worker processes. Datasets are stored and deduplicated by content hash.
+
+Endpoints:
+    GET  /health
+    POST /datasets?name=<file name>          raw CSV/Excel body
+    GET  /datasets
+    GET  /datasets/<id>/kpis                 optional filters, segment_by=<column>
+    GET  /datasets/<id>/recommendations
+    GET  /datasets/<id>/charts/<chart>       distribution, correlation, time_series,
+                                             category, kpi_dashboard; optional filters
+
+Filters are query parameters: date_column, start and end (inclusive ISO dates) for a
+date range, and filter=<column>:<value>|<value> (repeatable) for categorical values.
+
+Usage:
+    python api_server.py [--host 127.0.0.1] [--port 8000] [--workers N]
+    uvicorn --factory api_server:create_app
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from multiprocessing import get_context
+from urllib.parse import parse_qs
+
+import pandas as pd
+import numpy as np
+
+from caching import LRUCache, content_hash
+
+CHART_TYPES = ('distribution', 'correlation', 'time_series', 'category', 'kpi_dashboard')
+
+# Processed datasets and recommendations per content hash, held by each worker process
+_WORKER_DATASETS = LRUCache(maxsize=4)
+_WORKER_RECOMMENDATIONS = LRUCache(maxsize=16)
+
+class ApiError(Exception):
+    """
+    Error returned to the client with an HTTP status code
+    """
+    
+    def __init__(self, status, message):
+        # Both values in args, so errors raised in worker processes unpickle intact
+        super().__init__(status, message)
+        self.status = status
+        self.message = message
+    
+    def __str__(self):
+        return self.message
+
+class SupplyChainAPI:
+    """
+    ASGI application exposing the analytics of uploaded datasets
+    """
+    
+    def __init__(self, storage_dir=None, max_workers=None, max_upload_bytes=200 * 1024 * 1024):
+        """
+        Initialize the application
+        
+        Args:
+            storage_dir (str): Directory of the uploaded files, named by content hash
+            max_workers (int): Number of worker processes, defaults to the CPU count
+            max_upload_bytes (int): Largest accepted upload
+        """
+        self.storage_dir = storage_dir or os.path.join(tempfile.gettempdir(), 'supply_chain_api')
+        self.max_workers = max_workers
+        self.max_upload_bytes = max_upload_bytes
+        self.datasets = {}
+        self._loading = {}
+        self._pool = None
+        os.makedirs(self.storage_dir, exist_ok=True)
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        
+        try:
+            status, body = await self._route(scope, receive)
+        except ApiError as e:
+            status, body = e.status, _json_bytes({'error': e.message})
+        except Exception as e:
+            status, body = 500, _json_bytes({'error': str(e)})
+        
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode())]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+    
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+    
+    async def _lifespan(self, receive, send):
+        """
+        Handle ASGI startup and shutdown events
+        """
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._get_pool()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def _route(self, scope, receive):
+        """
+        Dispatch a request to its handler
+        
+        Returns:
+            tuple: (HTTP status, JSON body bytes)
+        """
+        method = scope['method']
+        parts = [part for part in scope['path'].split('/') if part]
+        query = parse_qs(scope.get('query_string', b'').decode('utf-8'))
+        
+        if parts == ['health'] and method == 'GET':
+            return 200, _json_bytes({'status': 'ok', 'datasets': len(self.datasets)})
+        
+        if parts == ['datasets']:
+            if method == 'POST':
+                body = await self._read_body(receive)
+                name = query.get('name', ['upload.csv'])[0]
+                return 200, _json_bytes(await self._add_dataset(name, body))
+            if method == 'GET':
+                return 200, _json_bytes([_public(dataset) for dataset in self.datasets.values()])
+        
+        if len(parts) >= 3 and parts[0] == 'datasets' and method == 'GET':
+            dataset = self.datasets.get(parts[1])
+            if dataset is None:
+                raise ApiError(404, f"Unknown dataset: {parts[1]}")
+            args = (dataset['path'], dataset['id'])
+            
+            if parts[2:] == ['kpis']:
+                segment_by = query.get('segment_by', [None])[0]
+                result = await self._run(_compute_kpis, *args, _parse_filters(query), segment_by)
+                return 200, _json_bytes(result)
+            
+            if parts[2:] == ['recommendations']:
+                return 200, _json_bytes(await self._run(_compute_recommendations, *args))
+            
+            if len(parts) == 4 and parts[2] == 'charts':
+                if parts[3] not in CHART_TYPES:
+                    raise ApiError(404, f"Unknown chart: {parts[3]}")
+                params = {key: values[0] for key, values in query.items()
+                          if key in ('column', 'date_column', 'value_column', 'category_column')}
+                figure_json = await self._run(_build_chart, *args, parts[3], params, _parse_filters(query))
+                return 200, figure_json.encode('utf-8')
+        
+        raise ApiError(404, f"No route for {method} {scope['path']}")
+    
+    async def _read_body(self, receive):
+        """
+        Read the request body, enforcing the upload size limit
+        """
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise ApiError(400, "Client disconnected during upload")
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_upload_bytes:
+                raise ApiError(413, f"Upload larger than {self.max_upload_bytes} bytes")
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+    
+    async def _add_dataset(self, name, body):
+        """
+        Store and process an uploaded file, reusing the dataset of an identical upload
+        """
+        extension = os.path.splitext(name)[1].lower()
+        if extension not in ('.csv', '.xlsx', '.xls'):
+            raise ApiError(400, "Supported file types are .csv, .xlsx and .xls")
+        if not body:
+            raise ApiError(400, "Empty upload")
+        
+        digest = content_hash(body)
+        if digest in self.datasets:
+            return dict(_public(self.datasets[digest]), deduplicated=True)
+        
+        # Concurrent uploads of the same content wait for a single load
+        if digest not in self._loading:
+            self._loading[digest] = asyncio.ensure_future(self._load_dataset(digest, name, extension, body))
+        try:
+            dataset = await asyncio.shield(self._loading[digest])
+        finally:
+            self._loading.pop(digest, None)
+        return dict(_public(dataset), deduplicated=False)
+    
+    async def _load_dataset(self, digest, name, extension, body):
+        """
+        Write an upload to storage and validate it in a worker process
+        """
+        path = os.path.join(self.storage_dir, f"{digest}{extension}")
+        if not os.path.exists(path):
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(body)
+            os.replace(temp_path, path)
+        
+        try:
+            summary = await self._run(_load_summary, path, digest)
+        except Exception as e:
+            raise ApiError(400, str(e))
+        
+        dataset = {
+            'id': digest,
+            'name': name,
+            'path': path,
+            'rows': summary['rows'],
+            'columns': summary['columns'],
+            'uploaded_at': datetime.now().isoformat(timespec='seconds')
+        }
+        self.datasets[digest] = dataset
+        return dataset
+    
+    async def _run(self, function, *args):
+        """
+        Run a function in the worker pool without blocking the event loop
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), function, *args)
+    
+    def _get_pool(self):
+        """
+        Start the worker processes on first use
+        """
+        if self._pool is None:
+            # Spawned workers do not inherit the event loop or its threads
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=get_context('spawn'))
+        return self._pool
+
+def _public(dataset):
+    """
+    Dataset description returned to clients, without the server-side storage path
+    """
+    return {key: value for key, value in dataset.items() if key != 'path'}
+
+def _parse_filters(query):
+    """
+    Parse filter query parameters
+    
+    Returns:
+        dict: 'date' as (column, start, end) or None, 'values' as [(column, [values])]
+    """
+    date_filter = None
+    if 'date_column' in query:
+        try:
+            start = datetime.fromisoformat(query['start'][0]).date() if 'start' in query else None
+            end = datetime.fromisoformat(query['end'][0]).date() if 'end' in query else None
+        except ValueError:
+            raise ApiError(400, "start and end must be ISO dates")
+        date_filter = (query['date_column'][0], start, end)
+    
+    value_filters = []
+    for item in query.get('filter', []):
+        column, separator, values = item.partition(':')
+        if not separator or not values:
+            raise ApiError(400, f"Invalid filter '{item}', expected <column>:<value>|<value>")
+        value_filters.append((column, values.split('|')))
+    
+    return {'date': date_filter, 'values': value_filters}
+
+def _json_bytes(payload):
+    """
+    Encode a payload as JSON, with non-finite floats as null and numpy values as Python values
+    """
+    return json.dumps(_json_safe(payload), ensure_ascii=False).encode('utf-8')
+
+def _json_safe(value):
+    """
+    Convert a payload recursively into JSON-compatible values
+    """
+    if isinstance(value, dict):
+        return {str(key): _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, pd.DataFrame):
+        return _json_safe(value.to_dict(orient='records'))
+    return value
+
+def _worker_dataset(path, digest):
+    """
+    Get a processed dataset inside a worker process, loading it on first use
+    """
+    from data_processor import DataProcessor
+    
+    df = _WORKER_DATASETS.get(digest)
+    if df is None:
+        with open(path, 'rb') as f:
+            df = DataProcessor().load_data(f)
+        _WORKER_DATASETS.put(digest, df)
+    return df
+
+def _select_rows(df, digest, filters):
+    """
+    Resolve query filters to row positions and the filter state used by the KPI caches
+    
+    Returns:
+        tuple: (row positions or None when unfiltered, filter state tuple)
+    """
+    from indexes import DatasetIndex
+    
+    index = DatasetIndex.for_data(df, digest)
+    selection = None
+    filter_state = []
+    
+    if filters['date']:
+        date_column, start, end = filters['date']
+        if date_column not in df.columns or not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+            raise ApiError(400, f"Not a date column: {date_column}")
+        date_index = index.date_index(date_column)
+        start = start or date_index.min_date()
+        end = end or date_index.max_date()
+        selection = index.rows_to_bitset(date_index.range_rows(start, end))
+        filter_state.append((date_column, (start, end)))
+    
+    for column, values in filters['values']:
+        if column not in df.columns:
+            raise ApiError(400, f"Unknown column: {column}")
+        bitmap_index = index.bitmap_index(column)
+        if bitmap_index is None:
+            raise ApiError(400, f"Column {column} has too many distinct values to filter on")
+        
+        # Query values are strings, match them to the column values
+        by_text = {str(value): value for value in bitmap_index.values}
+        selected = tuple(by_text[value] for value in values if value in by_text)
+        matched = bitmap_index.union(selected)
+        selection = matched if selection is None else selection & matched
+        filter_state.append((column, selected))
+    
+    rows = index.bitset_rows(selection) if selection is not None else None
+    return rows, tuple(filter_state)
+
+def _load_summary(path, digest):
+    """
+    Worker task: process an uploaded file and describe it
+    """
+    df = _worker_dataset(path, digest)
+    return {'rows': len(df), 'columns': {column: str(dtype) for column, dtype in df.dtypes.items()}}
+
+def _compute_kpis(path, digest, filters, segment_by=None):
+    """
+    Worker task: KPIs of the filtered rows, optionally per value of a segment column
+    """
+    from indexes import DatasetIndex
+    from kpi_calculator import KPICalculator
+    
+    df = _worker_dataset(path, digest)
+    calculator = KPICalculator.for_data(df, digest)
+    rows, filter_state = _select_rows(df, digest, filters)
+    
+    def selection_kpis(selection, state):
+        if not state:
+            return calculator.calculate_all_kpis()
+        return calculator.calculate_selection_kpis(selection, state)
+    
+    result = {'rows': len(df) if rows is None else len(rows), 'filters': filter_state}
+    
+    if segment_by is None:
+        result['kpis'] = dict(selection_kpis(rows, filter_state))
+        return result
+    
+    if segment_by not in df.columns:
+        raise ApiError(400, f"Unknown column: {segment_by}")
+    bitmap_index = DatasetIndex.for_data(df, digest).bitmap_index(segment_by)
+    if bitmap_index is None:
+        raise ApiError(400, f"Column {segment_by} has too many distinct values to segment by")
+    
+    selection = np.ones(len(df), dtype=bool)
+    if rows is not None:
+        selection[:] = False
+        selection[rows] = True
+    result['segments'] = {}
+    for value in bitmap_index.values:
+        segment = selection & np.unpackbits(bitmap_index.union([value]), count=len(df)).astype(bool)
+        if segment.any():
+            state = filter_state + ((segment_by, (value,)),)
+            result['segments'][str(value)] = dict(selection_kpis(np.flatnonzero(segment), state))
+    return result
+
+def _compute_recommendations(path, digest):
+    """
+    Worker task: recommendations of the full dataset
+    """
+    from kpi_calculator import KPICalculator
+    from recommendation_engine import RecommendationEngine
+    
+    recommendations = _WORKER_RECOMMENDATIONS.get(digest)
+    if recommendations is None:
+        df = _worker_dataset(path, digest)
+        kpis = KPICalculator.for_data(df, digest).calculate_all_kpis()
+        recommendations = RecommendationEngine(df, dict(kpis)).generate_recommendations()
+        _WORKER_RECOMMENDATIONS.put(digest, recommendations)
+    return _json_safe({'recommendations': recommendations})
+
+def _build_chart(path, digest, chart, params, filters):
+    """
+    Worker task: Plotly figure JSON of a chart of the filtered rows
+    """
+    from kpi_calculator import KPICalculator
+    from visualizations import SupplyChainVisualizations
+    
+    df = _worker_dataset(path, digest)
+    rows, filter_state = _select_rows(df, digest, filters)
+    data = df if rows is None else df.iloc[rows]
+    viz = SupplyChainVisualizations(data, cache_key=(digest, filter_state))
+    
+    numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+    date_cols = data.select_dtypes(include=['datetime64']).columns.tolist()
+    categorical_cols = data.select_dtypes(include=['object', 'category']).columns.tolist()
+    
+    def column(name, candidates):
+        value = params.get(name) or (candidates[0] if candidates else None)
+        if value is None or value not in candidates:
+            raise ApiError(400, f"Missing or invalid {name}")
+        return value
+    
+    if chart == 'distribution':
+        fig = viz.create_distribution_plot(column('column', numeric_cols))
+    elif chart == 'correlation':
+        fig = viz.create_correlation_matrix()
+    elif chart == 'time_series':
+        fig = viz.create_time_series(column('date_column', date_cols), column('value_column', numeric_cols))
+    elif chart == 'category':
+        fig = viz.create_category_analysis(column('category_column', categorical_cols),
+                                           column('value_column', numeric_cols))
+    else:
+        calculator = KPICalculator.for_data(df, digest)
+        kpis = calculator.calculate_selection_kpis(rows, filter_state) if filter_state else calculator.calculate_all_kpis()
+        fig = viz.create_kpi_dashboard(dict(kpis))
+    
+    if fig is None:
+        raise ApiError(422, f"Not enough data for the {chart} chart")
+    return fig.to_json()
+
+def create_app(storage_dir=None, max_workers=None):
+    """
+    Build the application, used by ASGI servers as a factory
+    
+    Args:
+        storage_dir (str): Directory of the uploaded files, named by content hash
+        max_workers (int): Number of worker processes, defaults to the CPU count
+        
+    Returns:
+        SupplyChainAPI: ASGI application
+    """
+    return SupplyChainAPI(storage_dir, max_workers)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve supply chain KPIs and recommendations over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1', help='bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='port (default: 8000)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    args = parser.parse_args(argv)
+    
+    try:
+        import uvicorn
+    except ImportError:
+        parser.error("serving requires an ASGI server: pip install uvicorn")
+    
+    # Serve the app of the importable module, not of __main__, so that worker tasks
+    # and their errors pickle by the same module name in both processes
+    from api_server import create_app
+    uvicorn.run(create_app(max_workers=args.workers), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
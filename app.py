@@ -2,13 +2,24 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import io
+import os
+import time
 
 from data_processor import DataProcessor
 from kpi_calculator import KPICalculator
 from recommendation_engine import RecommendationEngine
-from visualizations import SupplyChainVisualizations
 from translations import get_text, get_language_options
+from caching import content_hash, FigureCache
+from indexes import DatasetIndex
+from exports import ExportCache, EXPORT_FORMATS
+from dataset_store import DatasetStore
+from session_spill import SessionSpiller
+from ingestion import IngestionManager
+from instrumentation import RECORDER
+from compute_backend import available_backends, resolve_backend
+from database_source import DatabaseSource
+from incremental import (IncrementalDataset, SchemaMismatchError, DuplicateKeyError, DEFAULT_KEY_COLUMNS,
+                         carry_over_caches, duplicate_key_rows)
 
 # Page configuration
 st.set_page_config(
@@ -18,6 +29,106 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide cache of rendered figures, shared by all sessions"""
+    return FigureCache(max_bytes=128 * 1024 * 1024)
+
+@st.cache_resource
+def get_figure_warmup():
+    """Process-wide thread pool building default figures after upload"""
+    # Plotting modules are imported on first use to keep the app's cold start short
+    from figure_warmup import FigureWarmup
+    return FigureWarmup(get_figure_cache())
+
+@st.cache_resource
+def get_report_renderer():
+    """Process-wide renderer of PDF/HTML reports with its chart image cache"""
+    from reporting import BatchReportRenderer
+    return BatchReportRenderer()
+
+@st.cache_resource
+def get_export_cache():
+    """Process-wide cache of CSV and Excel exports"""
+    return ExportCache()
+
+@st.cache_resource
+def get_dataset_store():
+    """Process-wide store of processed datasets, shared by sessions uploading the same file"""
+    return DatasetStore()
+
+@st.cache_resource
+def get_session_spiller():
+    """Process-wide manager moving the data of idle sessions into compressed Arrow buffers"""
+    spiller = SessionSpiller(get_dataset_store())
+    spiller.start()
+    return spiller
+
+@st.cache_resource
+def get_ingestion_manager():
+    """Process-wide thread pool parsing and cleaning uploaded files in chunks"""
+    return IngestionManager()
+
+@st.cache_resource
+def get_database_source(connection):
+    """Pooled connections to a database, shared by every session reading from it"""
+    return DatabaseSource(connection)
+
+# Table metadata read for the database filters is kept 10 minutes, not scanned on every rerun
+@st.cache_data(ttl=600, show_spinner=False)
+def get_database_filter_columns(connection, table):
+    """Date and categorical columns of a table, detected on its first rows"""
+    # Chosen the way the sidebar chooses them on the loaded data
+    processor = DataProcessor()
+    preview = get_database_source(connection).preview(table)
+    raw_columns = dict(zip(processor._standardize_column_names(preview.columns), preview.columns))
+    cleaned = processor.clean_data(preview)
+    date_columns = [raw_columns[col] for col in cleaned.select_dtypes(include=['datetime64']).columns]
+    categorical_cols = [raw_columns[col] for col in cleaned.select_dtypes(include=['object', 'category']).columns]
+    return date_columns, categorical_cols
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_database_date_bounds(connection, table, column):
+    """First and last dates of a table column"""
+    return get_database_source(connection).date_bounds(table, column)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_database_compares_dates(connection, table, column):
+    """Whether the database compares the dates of a table column in date order"""
+    return get_database_source(connection).compares_dates(table, column)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_database_values(connection, table, column):
+    """Distinct values of a table column, None if there are too many for a filter"""
+    return get_database_source(connection).distinct_values(table, column)
+
+# Folder holding the histories; sessions can only name folders inside it
+HISTORY_ROOT = os.environ.get(
+    'SUPPLY_CHAIN_HISTORY_ROOT',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history')
+)
+
+def resolve_history_directory(directory):
+    """
+    Resolve a history folder entered by a user under HISTORY_ROOT
+    
+    Args:
+        directory (str): Folder name, relative to HISTORY_ROOT
+        
+    Returns:
+        str: Absolute path of the folder, None if it is outside HISTORY_ROOT
+    """
+    root = os.path.realpath(HISTORY_ROOT)
+    path = os.path.realpath(os.path.join(root, directory))
+    if path == root or os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+@st.cache_resource
+def get_incremental_dataset(directory):
+    """Stored dataset of a directory, shared by every session appending to it"""
+    return IncrementalDataset(directory)
+
 def main():
     # Initialize session state for language
     if 'language' not in st.session_state:
@@ -46,12 +157,22 @@ def main():
     st.markdown(get_text('main_subtitle', lang))
     
     # Initialize session state
-    if 'processed_data' not in st.session_state:
-        st.session_state.processed_data = None
-    if 'kpis' not in st.session_state:
-        st.session_state.kpis = None
-    if 'recommendations' not in st.session_state:
-        st.session_state.recommendations = None
+    if 'session_slot' not in st.session_state:
+        # Dataset, KPIs and recommendations, spilled while the session is idle
+        st.session_state.session_slot = get_session_spiller().new_slot()
+    if 'data_key' not in st.session_state:
+        st.session_state.data_key = None
+    if 'export_requests' not in st.session_state:
+        st.session_state.export_requests = set()
+    if 'view_timings' not in st.session_state:
+        st.session_state.view_timings = {}
+    if 'ingestion_job' not in st.session_state:
+        st.session_state.ingestion_job = None
+    if 'database_query' not in st.session_state:
+        st.session_state.database_query = None
+    
+    session = st.session_state.session_slot
+    get_session_spiller().activate(session)
 
     # Sidebar for file upload and filters
     with st.sidebar:
@@ -61,23 +182,93 @@ def main():
             type=["xlsx", "csv", "xls"],
             help=get_text('upload_help', lang)
         )
+        precompute_charts = st.checkbox(
+            get_text('precompute_charts', lang),
+            value=True,
+            help=get_text('precompute_charts_help', lang)
+        )
+        st.checkbox(
+            get_text('show_diagnostics', lang),
+            value=False,
+            key='show_diagnostics',
+            help=get_text('show_diagnostics_help', lang)
+        )
+        compute_engine = st.selectbox(
+            get_text('compute_engine', lang),
+            ['auto'] + available_backends(),
+            format_func=lambda engine: get_text(f"engine_{engine}", lang),
+            key='compute_engine',
+            help=get_text('compute_engine_help', lang)
+        )
+        
+        spill_stats = get_session_spiller().stats()
+        if spill_stats['spilled_sessions']:
+            st.caption(
+                f"{get_text('idle_sessions_spilled', lang)}: {spill_stats['spilled_sessions']} | "
+                f"{get_text('memory_reclaimed', lang)}: {spill_stats['reclaimed_bytes'] / 1024 ** 2:.1f} MB"
+            )
+        
+        # An open history replaces the uploaded file and the database table
+        history = render_history(session, lang)
         
-        if uploaded_file is not None:
-            # Process uploaded file
+        database_query = None
+        if uploaded_file is None or history is not None:
+            # Removing the file cancels its processing
+            release_ingestion_job()
+        if uploaded_file is None and history is None:
+            database_query = render_database_source(lang)
+        
+        if history is not None or uploaded_file is not None or database_query is not None:
+            # Process history, uploaded file or database table
             processor = DataProcessor()
             
             try:
                 with st.spinner(get_text('processing_data', lang)):
-                    df = processor.load_data(uploaded_file)
-                    st.session_state.processed_data = df
+                    if history is not None:
+                        # Changes with every append, including those of other sessions
+                        data_key = history.digest()
+                    elif uploaded_file is not None:
+                        data_key = content_hash(uploaded_file.getvalue())
+                    else:
+                        # The query includes the load time, so each load reads the current rows
+                        data_key = content_hash(repr(database_query).encode())
+                    
+                    if session.handle is None or session.handle.digest != data_key:
+                        if history is not None:
+                            loader = history.load
+                        elif uploaded_file is None:
+                            # Read and cleaned batch by batch, the filters evaluated by the database
+                            connection, table, database_filters, _ = database_query
+                            loader = lambda: processor.load_database(
+                                get_database_source(connection), table, database_filters
+                            )
+                        elif data_key not in get_dataset_store():
+                            # Parsed and cleaned in the background with progress and preliminary KPIs
+                            df_loaded = ingest_upload(uploaded_file, data_key, lang)
+                            loader = lambda: df_loaded
+                        else:
+                            loader = lambda: processor.load_data(uploaded_file)
+                        
+                        # One read-only copy per distinct dataset, shared with other sessions
+                        session.set_dataset(get_dataset_store().acquire(data_key, loader))
+                    
+                    df = session.data
+                    st.session_state.data_key = data_key
+                    
+                    # Index the categorical filter columns once per dataset
+                    DatasetIndex.for_data(df, st.session_state.data_key).build_bitmap_indexes()
                     
                     # Calculate KPIs
-                    kpi_calc = KPICalculator(df)
-                    st.session_state.kpis = kpi_calc.calculate_all_kpis()
+                    kpi_calc = KPICalculator.for_data(df, st.session_state.data_key)
+                    session.kpis = kpi_calc.calculate_all_kpis()
                     
                     # Generate recommendations
-                    rec_engine = RecommendationEngine(df, st.session_state.kpis)
-                    st.session_state.recommendations = rec_engine.generate_recommendations()
+                    rec_engine = RecommendationEngine(df, session.kpis)
+                    session.recommendations = rec_engine.generate_recommendations()
+                    
+                    # Build the default charts in the background while the user reads the dashboard
+                    if precompute_charts:
+                        get_figure_warmup().warm(df, st.session_state.data_key, lang)
                 
                 st.success(f"{get_text('data_processed', lang)} {len(df)} {get_text('records_loaded', lang)}")
                 
@@ -95,8 +286,14 @@ def main():
                 return
 
     # Main content area
-    if st.session_state.processed_data is not None:
-        df = st.session_state.processed_data
+    if session.data is not None:
+        df = session.data
+        
+        dataset_index = DatasetIndex.for_data(df, st.session_state.data_key)
+        selection = dataset_index.full_bitset()
+        
+        # Filter state identifies the filtered view in chart caches
+        filter_state = []
         
         # Add filters in sidebar
         with st.sidebar:
@@ -106,8 +303,9 @@ def main():
             date_columns = df.select_dtypes(include=['datetime64']).columns.tolist()
             if date_columns:
                 date_col = st.selectbox(get_text('select_date_column', lang), date_columns)
-                min_date = df[date_col].min().date()
-                max_date = df[date_col].max().date()
+                date_index = dataset_index.date_index(date_col)
+                min_date = date_index.min_date()
+                max_date = date_index.max_date()
                 
                 date_range = st.date_input(
                     get_text('date_range', lang),
@@ -116,297 +314,71 @@ def main():
                     max_value=max_date
                 )
                 
-                if len(date_range) == 2:
-                    df = df[(df[date_col].dt.date >= date_range[0]) & 
-                           (df[date_col].dt.date <= date_range[1])]
+                # Only a range narrower than the data is an active filter
+                if len(date_range) == 2 and tuple(date_range) != (min_date, max_date):
+                    # Binary search on the sorted date index instead of comparing every row
+                    selection = dataset_index.rows_to_bitset(date_index.range_rows(date_range[0], date_range[1]))
+                    filter_state.append((date_col, tuple(date_range)))
             
-            # Categorical filters
+            # Categorical filters, combined as bitwise operations on the bitmap indexes
             categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+            filter_columns = []
             for col in categorical_cols[:3]:  # Limit to first 3 categorical columns
-                unique_values = df[col].dropna().unique()
-                if len(unique_values) > 1 and len(unique_values) <= 50:  # Only show if reasonable number of options
+                bitmap_index = dataset_index.bitmap_index(col)
+                if bitmap_index is None:  # Only show if reasonable number of options
+                    continue
+                filter_columns.append(col)
+                unique_values = bitmap_index.present_values(selection)
+                if len(unique_values) > 1:
                     selected_values = st.multiselect(
                         f"{get_text('filter_by', lang)} {col}",
                         options=unique_values,
                         default=unique_values
                     )
-                    if selected_values:
-                        df = df[df[col].isin(selected_values)]
-        
-        # Create tabs for different views
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            get_text('dashboard', lang), 
-            get_text('visualizations', lang), 
-            get_text('kpi_analysis', lang), 
-            get_text('recommendations', lang), 
-            get_text('raw_data', lang)
-        ])
-        
-        with tab1:
-            st.header(get_text('supply_chain_dashboard', lang))
+                    if selected_values and len(selected_values) < len(unique_values):
+                        selection = selection & bitmap_index.union(selected_values)
+                        filter_state.append((col, tuple(selected_values)))
             
-            # KPI cards
-            if st.session_state.kpis:
-                kpis = st.session_state.kpis
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric(
-                        get_text('service_level', lang), 
-                        f"{kpis.get('service_level', 0):.1f}%",
-                        delta=f"{kpis.get('service_level_trend', 0):.1f}%"
-                    )
+            kpis = session.kpis
+            if filter_state:
+                selected_rows = dataset_index.bitset_rows(selection)
+                df = df.iloc[selected_rows]
                 
-                with col2:
-                    st.metric(
-                        get_text('stock_turnover', lang), 
-                        f"{kpis.get('stock_turnover', 0):.1f}x",
-                        delta=f"{kpis.get('turnover_trend', 0):.1f}%"
-                    )
-                
-                with col3:
-                    st.metric(
-                        get_text('otif_rate', lang), 
-                        f"{kpis.get('otif_rate', 0):.1f}%",
-                        delta=f"{kpis.get('otif_trend', 0):.1f}%"
-                    )
-                
-                with col4:
-                    st.metric(
-                        get_text('avg_lead_time', lang), 
-                        f"{kpis.get('avg_lead_time', 0):.1f} {get_text('days', lang)}",
-                        delta=f"{kpis.get('lead_time_trend', 0):.1f}%"
-                    )
-            
-            # Summary statistics
-            st.subheader(get_text('data_summary', lang))
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.write(f"**{get_text('numeric_summary', lang)}**")
-                numeric_cols = df.select_dtypes(include=[np.number]).columns
-                if len(numeric_cols) > 0:
-                    st.dataframe(df[numeric_cols].describe())
-                else:
-                    st.info(get_text('no_numeric_columns', lang))
-            
-            with col2:
-                st.write(f"**{get_text('data_quality', lang)}**")
-                quality_metrics = {
-                    get_text('total_rows', lang): len(df),
-                    get_text('total_columns', lang): len(df.columns),
-                    get_text('missing_values', lang): df.isnull().sum().sum(),
-                    get_text('duplicate_rows', lang): df.duplicated().sum()
-                }
-                quality_df = pd.DataFrame(list(quality_metrics.items()), 
-                                        columns=[get_text('metric', lang), get_text('value', lang)])
-                st.dataframe(quality_df, hide_index=True)
-        
-        with tab2:
-            st.header(get_text('interactive_viz', lang))
-            
-            viz = SupplyChainVisualizations(df)
-            
-            # Chart selection
-            chart_type = st.selectbox(
-                get_text('select_viz_type', lang),
-                [get_text('distribution_analysis', lang), get_text('correlation_matrix', lang), 
-                 get_text('time_series', lang), get_text('category_analysis', lang)]
-            )
-            
-            if chart_type == get_text('distribution_analysis', lang):
-                numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-                if numeric_cols:
-                    selected_col = st.selectbox(get_text('select_column', lang), numeric_cols)
-                    fig = viz.create_distribution_plot(selected_col)
-                    if fig:
-                        st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.warning(get_text('no_numeric_for_distribution', lang))
-            
-            elif chart_type == get_text('correlation_matrix', lang):
-                fig = viz.create_correlation_matrix()
-                if fig:
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.warning(get_text('not_enough_numeric', lang))
-            
-            elif chart_type == get_text('time_series', lang):
-                date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
-                numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-                
-                if date_cols and numeric_cols:
-                    date_col = st.selectbox(get_text('select_date_column_viz', lang), date_cols)
-                    value_col = st.selectbox(get_text('select_value_column', lang), numeric_cols)
-                    fig = viz.create_time_series(date_col, value_col)
-                    if fig:
-                        st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.warning(get_text('date_numeric_required', lang))
-            
-            elif chart_type == get_text('category_analysis', lang):
-                categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-                numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-                
-                if categorical_cols and numeric_cols:
-                    cat_col = st.selectbox(get_text('select_category_column', lang), categorical_cols)
-                    val_col = st.selectbox(get_text('select_value_column', lang), numeric_cols)
-                    fig = viz.create_category_analysis(cat_col, val_col)
-                    if fig:
-                        st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.warning(get_text('category_numeric_required', lang))
+                # KPIs of the filtered rows, from per-day and per-category partial sums,
+                # or aggregated by the SQL engine, which returns the totals only
+                if kpis:
+                    kpi_calc = KPICalculator.for_data(session.data, st.session_state.data_key)
+                    backend = None
+                    if resolve_backend(compute_engine, len(session.data)) != 'pandas':
+                        backend = kpi_calc.compute_backend(compute_engine, date_columns + filter_columns)
+                    kpis = kpi_calc.calculate_selection_kpis(selected_rows, filter_state, filter_columns, backend)
         
-        with tab3:
-            st.header(get_text('kpi_analysis_title', lang))
-            
-            if st.session_state.kpis:
-                kpis = st.session_state.kpis
-                
-                st.subheader(get_text('key_performance_indicators', lang))
-                
-                # Create KPI summary table
-                kpi_data = []
-                for kpi_name, kpi_value in kpis.items():
-                    if not kpi_name.endswith('_trend'):
-                        trend_key = f"{kpi_name}_trend"
-                        trend_value = kpis.get(trend_key, 0)
-                        
-                        # Determine status based on KPI type and value
-                        if 'rate' in kpi_name.lower() or 'level' in kpi_name.lower():
-                            status = get_text('good', lang) if kpi_value >= 90 else get_text('average', lang) if kpi_value >= 75 else get_text('poor', lang)
-                        elif 'time' in kpi_name.lower():
-                            status = get_text('good', lang) if kpi_value <= 7 else get_text('average', lang) if kpi_value <= 14 else get_text('poor', lang)
-                        else:
-                            status = get_text('monitor', lang)
-                        
-                        kpi_data.append({
-                            get_text('kpi', lang): kpi_name.replace('_', ' ').title(),
-                            get_text('value', lang): f"{kpi_value:.2f}",
-                            get_text('trend', lang): f"{trend_value:+.1f}%",
-                            get_text('status', lang): status
-                        })
-                
-                if kpi_data:
-                    kpi_df = pd.DataFrame(kpi_data)
-                    st.dataframe(kpi_df, hide_index=True, use_container_width=True)
-                
-                # Additional KPI insights
-                st.subheader(get_text('kpi_insights', lang))
-                
-                # Performance alerts
-                alerts = []
-                if kpis.get('service_level', 100) < 95:
-                    alerts.append(get_text('service_level_below', lang))
-                if kpis.get('otif_rate', 100) < 90:
-                    alerts.append(get_text('otif_needs_improvement', lang))
-                if kpis.get('avg_lead_time', 0) > 14:
-                    alerts.append(get_text('lead_times_long', lang))
-                
-                if alerts:
-                    st.warning(get_text('performance_alerts', lang))
-                    for alert in alerts:
-                        st.write(alert)
-                else:
-                    st.success(get_text('metrics_acceptable', lang))
-            
-            else:
-                st.info(get_text('kpi_after_processing', lang))
+        # Only the selected view is computed on each rerun
+        view_renderers = {
+            'dashboard': lambda: render_dashboard(df, kpis, lang),
+            'visualizations': lambda: render_visualizations(df, filter_state, lang),
+            'kpi_analysis': lambda: render_kpi_analysis(kpis, lang),
+            'recommendations': lambda: render_recommendations(df, kpis, lang),
+            'raw_data': lambda: render_raw_data(df, filter_state, lang)
+        }
+        active_view = st.radio(
+            get_text('navigation', lang),
+            list(view_renderers),
+            format_func=lambda view: get_text(view, lang),
+            horizontal=True,
+            label_visibility='collapsed',
+            key='active_view'
+        )
         
-        with tab4:
-            st.header(get_text('business_recommendations', lang))
-            
-            if st.session_state.recommendations:
-                recommendations = st.session_state.recommendations
-                
-                # Priority recommendations
-                st.subheader(get_text('priority_actions', lang))
-                priority_recs = [r for r in recommendations if r.get('priority') == 'High']
-                for i, rec in enumerate(priority_recs, 1):
-                    with st.container():
-                        st.markdown(f"**{i}. {rec['title']}**")
-                        st.write(rec['description'])
-                        st.write(f"{get_text('impact', lang)} {rec['impact']}")
-                        st.write(f"{get_text('effort', lang)} {rec['effort']}")
-                        st.divider()
-                
-                # Medium priority recommendations
-                if any(r.get('priority') == 'Medium' for r in recommendations):
-                    st.subheader(get_text('medium_priority_actions', lang))
-                    medium_recs = [r for r in recommendations if r.get('priority') == 'Medium']
-                    for i, rec in enumerate(medium_recs, 1):
-                        with st.expander(f"{i}. {rec['title']}"):
-                            st.write(rec['description'])
-                            st.write(f"{get_text('impact', lang)} {rec['impact']}")
-                            st.write(f"{get_text('effort', lang)} {rec['effort']}")
-                
-                # Low priority recommendations
-                if any(r.get('priority') == 'Low' for r in recommendations):
-                    st.subheader(get_text('future_considerations', lang))
-                    low_recs = [r for r in recommendations if r.get('priority') == 'Low']
-                    for i, rec in enumerate(low_recs, 1):
-                        with st.expander(f"{i}. {rec['title']}"):
-                            st.write(rec['description'])
-                            st.write(f"{get_text('impact', lang)} {rec['impact']}")
-                            st.write(f"{get_text('effort', lang)} {rec['effort']}")
-                
-                # Export recommendations
-                st.subheader(get_text('export_recommendations', lang))
-                if st.button(get_text('generate_report', lang)):
-                    report_content = generate_report(recommendations, st.session_state.kpis, lang)
-                    st.download_button(
-                        label=get_text('download_report', lang),
-                        data=report_content,
-                        file_name=f"supply_chain_recommendations_{datetime.now().strftime('%Y%m%d')}.txt",
-                        mime="text/plain"
-                    )
-            
-            else:
-                st.info(get_text('recommendations_after_analysis', lang))
+        start_time = time.perf_counter()
+        view_renderers[active_view]()
+        st.session_state.view_timings[active_view] = (time.perf_counter() - start_time) * 1000
         
-        with tab5:
-            st.header(get_text('raw_data_title', lang))
-            
-            st.subheader(get_text('filtered_dataset', lang))
-            st.write(f"{get_text('showing_rows', lang)} {len(df)} {get_text('rows_after_filters', lang)}")
-            
-            # Show data with pagination
-            page_size = st.selectbox(get_text('rows_per_page', lang), [10, 25, 50, 100], index=1)
-            
-            total_pages = (len(df) - 1) // page_size + 1
-            page = st.number_input(get_text('page', lang), min_value=1, max_value=total_pages, value=1)
-            
-            start_idx = (page - 1) * page_size
-            end_idx = start_idx + page_size
-            
-            st.dataframe(df.iloc[start_idx:end_idx], use_container_width=True)
-            
-            # Export data
-            st.subheader(get_text('export_data', lang))
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label=get_text('download_csv', lang),
-                    data=csv,
-                    file_name=f"filtered_data_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv"
-                )
-            
-            with col2:
-                # Convert to Excel
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    df.to_excel(writer, sheet_name='Data', index=False)
-                
-                st.download_button(
-                    label=get_text('download_excel', lang),
-                    data=buffer.getvalue(),
-                    file_name=f"filtered_data_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+        # Last render time of each view, to measure the cost of every view
+        st.caption(f"{get_text('view_render_times', lang)}: " + " | ".join(
+            f"{get_text(view, lang)} {elapsed_ms:.0f} ms"
+            for view, elapsed_ms in st.session_state.view_timings.items()
+        ))
     
     else:
         # Welcome message when no data is uploaded
@@ -438,35 +410,557 @@ def main():
         {get_text('upload_prompt', lang)}
         """)
 
-def generate_report(recommendations, kpis, language='en'):
-    """Generate a text report of recommendations and KPIs"""
-    report = f"""
-{get_text('report_title', language)}
-{get_text('generated_on', language)} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+def ingest_upload(uploaded_file, data_key, lang):
+    """
+    Process an uploaded file in a background job, showing its progress and preliminary KPIs
+    
+    The job is kept in the session state, so uploading another file cancels it on the
+    next run.
+    
+    Returns:
+        pd.DataFrame: Processed dataframe
+    """
+    job = st.session_state.ingestion_job
+    if job is not None and job.digest != data_key:
+        release_ingestion_job()
+        job = None
+    if job is None:
+        job = get_ingestion_manager().submit(uploaded_file.name, uploaded_file.getvalue(), data_key)
+        st.session_state.ingestion_job = job
+    
+    progress_bar = st.progress(0.0)
+    preview = st.empty()
+    while not job.wait(0.5):
+        progress = job.progress()
+        progress_bar.progress(
+            progress['fraction'],
+            text=f"{get_text('stage_' + progress['stage'], lang)}: {progress['rows']:,} {get_text('rows_parsed', lang)} "
+                 f"({progress['rows_per_second']:,.0f} {get_text('rows_per_second', lang)})"
+        )
+        
+        kpis = progress['kpis']
+        if kpis:
+            with preview.container():
+                st.caption(get_text('preliminary_kpis', lang))
+                st.metric(get_text('service_level', lang), f"{kpis.get('service_level', 0):.1f}%")
+                st.metric(get_text('otif_rate', lang), f"{kpis.get('otif_rate', 0):.1f}%")
+                st.metric(get_text('avg_lead_time', lang), f"{kpis.get('avg_lead_time', 0):.1f} {get_text('days', lang)}")
+    
+    progress_bar.empty()
+    preview.empty()
+    release_ingestion_job()
+    return job.result()
+
+def render_database_source(lang):
+    """
+    Sidebar form reading a database table, with date range and category filters
+    evaluated by the database
+    
+    Returns:
+        tuple: (connection, table, filters, load time) of the last table loaded from the
+            connection, None if none was loaded
+    """
+    with st.expander(get_text('database_source', lang), expanded=st.session_state.database_query is not None):
+        connection = st.text_input(get_text('database_connection', lang), help=get_text('database_connection_help', lang))
+        if not connection:
+            st.session_state.database_query = None
+            return None
+        
+        try:
+            source = get_database_source(connection)
+            table = st.selectbox(get_text('database_table', lang), source.tables())
+            if table is None:
+                st.info(get_text('no_database_tables', lang))
+                return None
+            
+            date_columns, categorical_cols = get_database_filter_columns(connection, table)
+            
+            filters = []
+            if date_columns:
+                date_col = st.selectbox(get_text('select_date_column', lang), date_columns, key='database_date_column')
+                first, last = get_database_date_bounds(connection, table, date_col)
+                if not get_database_compares_dates(connection, table, date_col):
+                    st.caption(get_text('database_text_dates', lang))
+                if pd.notna(first) and pd.notna(last):
+                    min_date, max_date = first.date(), last.date()
+                    date_range = st.date_input(
+                        get_text('date_range', lang),
+                        value=(min_date, max_date),
+                        min_value=min_date,
+                        max_value=max_date,
+                        key='database_date_range'
+                    )
+                    if len(date_range) == 2 and tuple(date_range) != (min_date, max_date):
+                        filters.append((date_col, tuple(date_range)))
+            
+            for col in categorical_cols[:3]:
+                values = get_database_values(connection, table, col)
+                if values is None or len(values) <= 1:
+                    continue
+                selected_values = st.multiselect(
+                    f"{get_text('filter_by', lang)} {col}",
+                    options=values,
+                    default=values,
+                    key=f"database_filter_{col}"
+                )
+                if selected_values and len(selected_values) < len(values):
+                    filters.append((col, tuple(selected_values)))
+            
+            if st.button(get_text('load_from_database', lang)):
+                st.session_state.database_query = (connection, table, tuple(filters), time.time())
+        
+        except Exception as e:
+            st.error(f"{get_text('database_error', lang)} {str(e)}")
+            return None
+    
+    query = st.session_state.database_query
+    return query if query is not None and query[0] == connection else None
 
-{get_text('kpi_section', language)}
-"""
+def render_history(session, lang):
+    """
+    Sidebar panel keeping the loaded dataset as a history in a directory and appending
+    daily delta files to it
+    
+    The KPI measures, partial sums, rollups and indexes of the history are updated from
+    the appended and replaced rows only.
     
+    Returns:
+        IncrementalDataset: History stored in the directory, None if there is none
+    """
+    with st.expander(get_text('history', lang), expanded=False):
+        directory = st.text_input(get_text('history_directory', lang), help=get_text('history_directory_help', lang))
+        if not directory:
+            return None
+        
+        path = resolve_history_directory(directory)
+        if path is None:
+            st.error(get_text('history_directory_outside', lang))
+            return None
+        
+        history = get_incremental_dataset(path)
+        try:
+            if not history.exists():
+                if session.data is None:
+                    st.info(get_text('no_history', lang))
+                    return None
+                
+                columns = session.data.columns.tolist()
+                # Suggested only if they identify every loaded row
+                default_keys = list(DEFAULT_KEY_COLUMNS)
+                if not set(default_keys) <= set(columns) or duplicate_key_rows(session.data, default_keys).any():
+                    default_keys = []
+                key_columns = st.multiselect(
+                    get_text('history_key_columns', lang),
+                    options=columns,
+                    default=default_keys,
+                    help=get_text('history_key_columns_help', lang)
+                )
+                duplicates = int(duplicate_key_rows(session.data, key_columns).sum()) if key_columns else 0
+                if duplicates:
+                    st.warning(f"{duplicates} {get_text('duplicate_key_rows', lang)}")
+                if not st.button(get_text('save_history', lang), disabled=not key_columns or duplicates > 0):
+                    return None
+                stored = history.create(session.data, tuple(key_columns))
+                session.set_dataset(get_dataset_store().acquire(history.digest(), lambda: stored))
+            
+            schema = history.schema()
+            st.caption(
+                f"{get_text('history_segments', lang)}: {len(schema['segments'])} | "
+                f"{get_text('history_key_columns', lang)}: {', '.join(schema['key_columns'])}"
+            )
+            
+            delta_file = st.file_uploader(
+                get_text('delta_file', lang),
+                type=["xlsx", "csv", "xls"],
+                key='history_delta_file'
+            )
+            if delta_file is not None and st.button(get_text('append_delta', lang)):
+                base_digest = session.handle.digest if session.handle is not None else None
+                result = history.append_file(delta_file, base=session.data, base_digest=base_digest)
+                
+                handle = get_dataset_store().acquire(result.digest, lambda: result.data)
+                # Carried over from the version the delta was merged into, if it is cached
+                carry_over_caches(result.base_digest, result.digest, handle.data, result.changed_rows)
+                session.set_dataset(handle)
+                st.success(
+                    f"{get_text('delta_appended', lang)} {result.inserted} {get_text('rows_inserted', lang)}, "
+                    f"{result.updated} {get_text('rows_updated', lang)}"
+                )
+        
+        except SchemaMismatchError as e:
+            st.error(f"{get_text('delta_rejected', lang)} {str(e)}")
+        except DuplicateKeyError as e:
+            st.error(f"{get_text('delta_rejected', lang)} {str(e)}")
+            st.dataframe(e.rows, use_container_width=True)
+        except Exception as e:
+            st.error(f"{get_text('history_error', lang)} {str(e)}")
+            return None
+    
+    return history if history.exists() else None
+
+def release_ingestion_job():
+    """Stop waiting for the session's ingestion job, cancelling it if no other session needs it"""
+    job = st.session_state.ingestion_job
+    if job is not None:
+        st.session_state.ingestion_job = None
+        get_ingestion_manager().release(job)
+
+def render_diagnostics(spans, lang):
+    """Sidebar diagnostics: time, rows and memory delta of every stage of the last run"""
+    if not st.session_state.get('show_diagnostics'):
+        return
+    
+    with st.sidebar:
+        with st.expander(get_text('diagnostics', lang), expanded=True):
+            summary = RECORDER.summarize(spans)
+            if summary.empty:
+                st.info(get_text('no_spans_recorded', lang))
+            else:
+                total_seconds = sum(record['seconds'] for record in spans if record['depth'] == 0)
+                st.caption(f"{get_text('run_total_time', lang)}: {total_seconds:.2f} s")
+                st.dataframe(summary.round({'total_seconds': 3, 'max_seconds': 3, 'memory_delta_mb': 2}),
+                             hide_index=True)
+            
+            # JSON lines for the log pipeline: this run, or every recent span of the process
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            st.download_button(
+                label=get_text('download_run_spans', lang),
+                data=RECORDER.to_jsonl(spans),
+                file_name=f"spans_run_{timestamp}.jsonl",
+                mime='application/x-ndjson'
+            )
+            st.download_button(
+                label=get_text('download_recent_spans', lang),
+                data=RECORDER.to_jsonl(RECORDER.spans()),
+                file_name=f"spans_recent_{timestamp}.jsonl",
+                mime='application/x-ndjson'
+            )
+
+def render_dashboard(df, kpis, lang):
+    """Dashboard view: KPI cards and data summary"""
+    st.header(get_text('supply_chain_dashboard', lang))
+    
+    # KPI cards
     if kpis:
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(
+                get_text('service_level', lang), 
+                f"{kpis.get('service_level', 0):.1f}%",
+                delta=f"{kpis.get('service_level_trend', 0):.1f}%"
+            )
+        
+        with col2:
+            st.metric(
+                get_text('stock_turnover', lang), 
+                f"{kpis.get('stock_turnover', 0):.1f}x",
+                delta=f"{kpis.get('turnover_trend', 0):.1f}%"
+            )
+        
+        with col3:
+            st.metric(
+                get_text('otif_rate', lang), 
+                f"{kpis.get('otif_rate', 0):.1f}%",
+                delta=f"{kpis.get('otif_trend', 0):.1f}%"
+            )
+        
+        with col4:
+            st.metric(
+                get_text('avg_lead_time', lang), 
+                f"{kpis.get('avg_lead_time', 0):.1f} {get_text('days', lang)}",
+                delta=f"{kpis.get('lead_time_trend', 0):.1f}%"
+            )
+    
+    # Summary statistics
+    st.subheader(get_text('data_summary', lang))
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write(f"**{get_text('numeric_summary', lang)}**")
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        if len(numeric_cols) > 0:
+            st.dataframe(df[numeric_cols].describe())
+        else:
+            st.info(get_text('no_numeric_columns', lang))
+    
+    with col2:
+        st.write(f"**{get_text('data_quality', lang)}**")
+        quality_metrics = {
+            get_text('total_rows', lang): len(df),
+            get_text('total_columns', lang): len(df.columns),
+            get_text('missing_values', lang): df.isnull().sum().sum(),
+            get_text('duplicate_rows', lang): df.duplicated().sum()
+        }
+        quality_df = pd.DataFrame(list(quality_metrics.items()), 
+                                columns=[get_text('metric', lang), get_text('value', lang)])
+        st.dataframe(quality_df, hide_index=True)
+
+def render_visualizations(df, filter_state, lang):
+    """Visualizations view: interactive charts served from the figure cache"""
+    st.header(get_text('interactive_viz', lang))
+    
+    from visualizations import SupplyChainVisualizations
+    viz = SupplyChainVisualizations(df, cache_key=(st.session_state.data_key, tuple(filter_state)), language=lang)
+    figure_cache = get_figure_cache()
+    
+    def figure_key(chart_name, *params):
+        return FigureCache.make_key(st.session_state.data_key, tuple(filter_state), chart_name, params, lang)
+    
+    # Chart selection
+    chart_type = st.selectbox(
+        get_text('select_viz_type', lang),
+        [get_text('distribution_analysis', lang), get_text('correlation_matrix', lang), 
+         get_text('time_series', lang), get_text('category_analysis', lang)]
+    )
+    
+    if chart_type == get_text('distribution_analysis', lang):
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        if numeric_cols:
+            selected_col = st.selectbox(get_text('select_column', lang), numeric_cols)
+            fig = figure_cache.get_or_build(
+                figure_key('distribution', selected_col),
+                lambda: viz.create_distribution_plot(selected_col)
+            )
+            if fig:
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning(get_text('no_numeric_for_distribution', lang))
+    
+    elif chart_type == get_text('correlation_matrix', lang):
+        correlation_view = st.radio(
+            get_text('correlation_view', lang),
+            [get_text('correlation_heatmap', lang), get_text('strongest_pairs', lang)],
+            horizontal=True
+        )
+        if correlation_view == get_text('strongest_pairs', lang):
+            top_k = st.slider(get_text('number_of_pairs', lang), min_value=5, max_value=50, value=20)
+            fig = figure_cache.get_or_build(
+                figure_key('top_correlations', top_k),
+                lambda: viz.create_top_correlations(top_k)
+            )
+        else:
+            fig = figure_cache.get_or_build(
+                figure_key('correlation_matrix'),
+                viz.create_correlation_matrix
+            )
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning(get_text('not_enough_numeric', lang))
+    
+    elif chart_type == get_text('time_series', lang):
+        date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        
+        if date_cols and numeric_cols:
+            date_col = st.selectbox(get_text('select_date_column_viz', lang), date_cols)
+            value_col = st.selectbox(get_text('select_value_column', lang), numeric_cols)
+            fig = figure_cache.get_or_build(
+                figure_key('time_series', date_col, value_col),
+                lambda: viz.create_time_series(date_col, value_col)
+            )
+            if fig:
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning(get_text('date_numeric_required', lang))
+    
+    elif chart_type == get_text('category_analysis', lang):
+        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        
+        if categorical_cols and numeric_cols:
+            cat_col = st.selectbox(get_text('select_category_column', lang), categorical_cols)
+            val_col = st.selectbox(get_text('select_value_column', lang), numeric_cols)
+            fig = figure_cache.get_or_build(
+                figure_key('category_analysis', cat_col, val_col),
+                lambda: viz.create_category_analysis(cat_col, val_col)
+            )
+            if fig:
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning(get_text('category_numeric_required', lang))
+    
+    # Figure cache statistics, used to tune the memory budget
+    cache_stats = figure_cache.stats()
+    st.caption(
+        f"{get_text('figure_cache', lang)}: {cache_stats['hits']} {get_text('cache_hits', lang)}, "
+        f"{cache_stats['misses']} {get_text('cache_misses', lang)} ({cache_stats['hit_rate']:.0%}), "
+        f"{cache_stats['entries']} {get_text('cache_entries', lang)}, "
+        f"{cache_stats['bytes'] / 1024 / 1024:.1f} / {cache_stats['max_bytes'] / 1024 / 1024:.0f} MB"
+    )
+
+def render_kpi_analysis(kpis, lang):
+    """KPI analysis view: KPI table and performance alerts"""
+    st.header(get_text('kpi_analysis_title', lang))
+    
+    if kpis:
+        st.subheader(get_text('key_performance_indicators', lang))
+        
+        # Create KPI summary table
+        kpi_data = []
         for kpi_name, kpi_value in kpis.items():
             if not kpi_name.endswith('_trend'):
-                report += f"{kpi_name.replace('_', ' ').title()}: {kpi_value:.2f}\n"
+                trend_key = f"{kpi_name}_trend"
+                trend_value = kpis.get(trend_key, 0)
+                
+                # Determine status based on KPI type and value
+                if 'rate' in kpi_name.lower() or 'level' in kpi_name.lower():
+                    status = get_text('good', lang) if kpi_value >= 90 else get_text('average', lang) if kpi_value >= 75 else get_text('poor', lang)
+                elif 'time' in kpi_name.lower():
+                    status = get_text('good', lang) if kpi_value <= 7 else get_text('average', lang) if kpi_value <= 14 else get_text('poor', lang)
+                else:
+                    status = get_text('monitor', lang)
+                
+                kpi_data.append({
+                    get_text('kpi', lang): kpi_name.replace('_', ' ').title(),
+                    get_text('value', lang): f"{kpi_value:.2f}",
+                    get_text('trend', lang): f"{trend_value:+.1f}%",
+                    get_text('status', lang): status
+                })
+        
+        if kpi_data:
+            kpi_df = pd.DataFrame(kpi_data)
+            st.dataframe(kpi_df, hide_index=True, use_container_width=True)
+        
+        # Additional KPI insights
+        st.subheader(get_text('kpi_insights', lang))
+        
+        # Performance alerts
+        alerts = []
+        if kpis.get('service_level', 100) < 95:
+            alerts.append(get_text('service_level_below', lang))
+        if kpis.get('otif_rate', 100) < 90:
+            alerts.append(get_text('otif_needs_improvement', lang))
+        if kpis.get('avg_lead_time', 0) > 14:
+            alerts.append(get_text('lead_times_long', lang))
+        
+        if alerts:
+            st.warning(get_text('performance_alerts', lang))
+            for alert in alerts:
+                st.write(alert)
+        else:
+            st.success(get_text('metrics_acceptable', lang))
     
-    report += f"\n{get_text('recommendations_section', language)}\n"
+    else:
+        st.info(get_text('kpi_after_processing', lang))
+
+def render_recommendations(df, kpis, lang):
+    """Recommendations view: prioritized actions and report export"""
+    st.header(get_text('business_recommendations', lang))
     
+    recommendations = st.session_state.session_slot.recommendations
     if recommendations:
-        for i, rec in enumerate(recommendations, 1):
-            report += f"""
-{i}. {rec['title']} ({get_text('priority_label', language)} {rec.get('priority', 'Medium')})
-   Description: {rec['description']}
-   {get_text('impact', language)} {rec['impact']}
-   {get_text('effort', language)} {rec['effort']}
-"""
+        
+        # Priority recommendations
+        st.subheader(get_text('priority_actions', lang))
+        priority_recs = [r for r in recommendations if r.get('priority') == 'High']
+        for i, rec in enumerate(priority_recs, 1):
+            with st.container():
+                st.markdown(f"**{i}. {rec['title']}**")
+                st.write(rec['description'])
+                st.write(f"{get_text('impact', lang)} {rec['impact']}")
+                st.write(f"{get_text('effort', lang)} {rec['effort']}")
+                st.divider()
+        
+        # Medium priority recommendations
+        if any(r.get('priority') == 'Medium' for r in recommendations):
+            st.subheader(get_text('medium_priority_actions', lang))
+            medium_recs = [r for r in recommendations if r.get('priority') == 'Medium']
+            for i, rec in enumerate(medium_recs, 1):
+                with st.expander(f"{i}. {rec['title']}"):
+                    st.write(rec['description'])
+                    st.write(f"{get_text('impact', lang)} {rec['impact']}")
+                    st.write(f"{get_text('effort', lang)} {rec['effort']}")
+        
+        # Low priority recommendations
+        if any(r.get('priority') == 'Low' for r in recommendations):
+            st.subheader(get_text('future_considerations', lang))
+            low_recs = [r for r in recommendations if r.get('priority') == 'Low']
+            for i, rec in enumerate(low_recs, 1):
+                with st.expander(f"{i}. {rec['title']}"):
+                    st.write(rec['description'])
+                    st.write(f"{get_text('impact', lang)} {rec['impact']}")
+                    st.write(f"{get_text('effort', lang)} {rec['effort']}")
+        
+        # Export recommendations
+        st.subheader(get_text('export_recommendations', lang))
+        report_format = st.selectbox(get_text('report_format', lang), ['TXT', 'PDF', 'HTML'])
+        if st.button(get_text('generate_report', lang)):
+            report_name = f"supply_chain_recommendations_{datetime.now().strftime('%Y%m%d')}"
+            if report_format == 'TXT':
+                from reporting import generate_report
+                report_content = generate_report(recommendations, kpis, lang)
+                mime = "text/plain"
+            else:
+                renderer = get_report_renderer()
+                with st.spinner(get_text('rendering_report', lang)):
+                    if report_format == 'PDF':
+                        report_content = renderer.build_pdf(df, kpis, recommendations, lang)
+                        mime = "application/pdf"
+                    else:
+                        report_content = renderer.build_html(df, kpis, recommendations, lang)
+                        mime = "text/html"
+                render_stats = renderer.last_render_stats
+                st.caption(f"{get_text('charts_rendered', lang)}: {render_stats['rendered']} | "
+                           f"{get_text('charts_from_cache', lang)}: {render_stats['cached']}")
+            
+            st.download_button(
+                label=get_text('download_report', lang),
+                data=report_content,
+                file_name=f"{report_name}.{report_format.lower()}",
+                mime=mime
+            )
+    
     else:
-        report += f"{get_text('no_recommendations', language)}\n"
+        st.info(get_text('recommendations_after_analysis', lang))
+
+def render_raw_data(df, filter_state, lang):
+    """Raw data view: paginated filtered data and exports"""
+    st.header(get_text('raw_data_title', lang))
+    
+    st.subheader(get_text('filtered_dataset', lang))
+    st.write(f"{get_text('showing_rows', lang)} {len(df)} {get_text('rows_after_filters', lang)}")
+    
+    # Show data with pagination
+    page_size = st.selectbox(get_text('rows_per_page', lang), [10, 25, 50, 100], index=1)
+    
+    total_pages = (len(df) - 1) // page_size + 1
+    page = st.number_input(get_text('page', lang), min_value=1, max_value=total_pages, value=1)
     
-    report += f"\n{get_text('report_footer', language)}"
-    return report
+    start_idx = (page - 1) * page_size
+    end_idx = start_idx + page_size
+    
+    st.dataframe(df.iloc[start_idx:end_idx], use_container_width=True)
+    
+    # Export data, built only once requested and cached per dataset, filters and format
+    st.subheader(get_text('export_data', lang))
+    export_cache = get_export_cache()
+    export_key = (st.session_state.data_key, tuple(filter_state))
+    col1, col2 = st.columns(2)
+    
+    for column, export_format, prepare_label, download_label in [
+        (col1, 'csv', 'prepare_csv', 'download_csv'),
+        (col2, 'xlsx', 'prepare_excel', 'download_excel')
+    ]:
+        with column:
+            requested = export_key + (export_format,) in st.session_state.export_requests
+            if not requested and st.button(get_text(prepare_label, lang)):
+                st.session_state.export_requests.add(export_key + (export_format,))
+                requested = True
+            
+            if requested:
+                with st.spinner(get_text('preparing_export', lang)):
+                    content = export_cache.get_or_build(df, *export_key, export_format)
+                st.download_button(
+                    label=get_text(download_label, lang),
+                    data=content,
+                    file_name=f"filtered_data_{datetime.now().strftime('%Y%m%d')}.{export_format}",
+                    mime=EXPORT_FORMATS[export_format]
+                )
 
 if __name__ == "__main__":
-    main()
+    # Spans of this script run, shown in the diagnostics panel
+    with RECORDER.collect() as run_spans:
+        main()
+    render_diagnostics(run_spans, st.session_state.language)
@@ -0,0 +1,222 @@
+"""
+Headless batch processing of supply chain extracts
+
+Runs DataProcessor, KPICalculator, RecommendationEngine and generate_report on every
+file of a directory in parallel worker processes, without Streamlit. Files whose
+content did not change since the last run are skipped.
+
+Usage:
+    python batch_cli.py INPUT_DIR OUTPUT_DIR [--format json|parquet] [--workers N]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+from caching import content_hash
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+MANIFEST_NAME = 'manifest.json'
+
+def process_file(path, output_dir, output_format='json', language='en'):
+    """
+    Process one extract and write its KPIs, recommendations and text report
+    
+    Args:
+        path (str): Input CSV or Excel file
+        output_dir (str): Directory of the output files
+        output_format (str): 'json' or 'parquet'
+        language (str): Report language
+        
+    Returns:
+        dict: Rows processed and output file names
+    """
+    from data_processor import DataProcessor
+    from kpi_calculator import KPICalculator
+    from recommendation_engine import RecommendationEngine
+    from reporting import generate_report
+    
+    with open(path, 'rb') as f:
+        df = DataProcessor().load_data(f)
+    
+    kpis = KPICalculator(df).calculate_all_kpis()
+    recommendations = RecommendationEngine(df, kpis).generate_recommendations()
+    report = generate_report(recommendations, kpis, language)
+    
+    name = os.path.basename(path)
+    outputs = {
+        'kpis': f"{name}.kpis.{output_format}",
+        'recommendations': f"{name}.recommendations.{output_format}",
+        'report': f"{name}.report.txt"
+    }
+    
+    if output_format == 'parquet':
+        kpi_df = pd.DataFrame({'kpi': list(kpis), 'value': [float(value) for value in kpis.values()]})
+        kpi_df.to_parquet(os.path.join(output_dir, outputs['kpis']), index=False)
+        
+        # Nested fields (e.g. per-SKU risks) are stored as JSON text
+        rec_df = pd.DataFrame([
+            {key: json.dumps(value, default=_to_json) if isinstance(value, (list, dict)) else value
+             for key, value in rec.items()}
+            for rec in recommendations
+        ])
+        rec_df.to_parquet(os.path.join(output_dir, outputs['recommendations']), index=False)
+    else:
+        _write_json(os.path.join(output_dir, outputs['kpis']), kpis)
+        _write_json(os.path.join(output_dir, outputs['recommendations']), recommendations)
+    
+    with open(os.path.join(output_dir, outputs['report']), 'w', encoding='utf-8') as f:
+        f.write(report)
+    
+    return {'rows': len(df), 'outputs': list(outputs.values())}
+
+def _process_job(path, digest, output_dir, output_format, language):
+    """
+    Worker entry point: process one file and report the outcome instead of raising
+    """
+    start_time = time.perf_counter()
+    try:
+        result = process_file(path, output_dir, output_format, language)
+        result['status'] = 'ok'
+    except Exception as e:
+        result = {'status': 'error', 'error': str(e), 'outputs': []}
+    
+    result.update({
+        'hash': digest,
+        'format': output_format,
+        'language': language,
+        'seconds': round(time.perf_counter() - start_time, 3),
+        'processed_at': datetime.now().isoformat(timespec='seconds')
+    })
+    return os.path.basename(path), result
+
+def _to_json(value):
+    """
+    Convert numpy and pandas values for json.dump
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict(orient='records')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _write_json(path, payload):
+    """
+    Write a JSON file atomically
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False, default=_to_json)
+    os.replace(temp_path, path)
+
+def load_manifest(output_dir):
+    """
+    Load the manifest of a previous run
+    
+    Returns:
+        dict: {file name: result of its last run}
+    """
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def is_up_to_date(entry, digest, output_dir, output_format, language):
+    """
+    Check whether a file was already processed successfully with the same content and settings
+    """
+    if not entry or entry.get('status') != 'ok':
+        return False
+    if (entry.get('hash'), entry.get('format'), entry.get('language')) != (digest, output_format, language):
+        return False
+    return all(os.path.exists(os.path.join(output_dir, output)) for output in entry.get('outputs', []))
+
+def run_batch(input_dir, output_dir, output_format='json', language='en', max_workers=None, force=False):
+    """
+    Process every supported file of a directory in parallel
+    
+    Args:
+        input_dir (str): Directory of CSV and Excel extracts
+        output_dir (str): Directory of the output files and manifest
+        output_format (str): 'json' or 'parquet'
+        language (str): Report language
+        max_workers (int): Number of worker processes, defaults to the CPU count
+        force (bool): Reprocess files even if their content did not change
+        
+    Returns:
+        dict: Counts of processed, skipped and failed files
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    
+    jobs = []
+    skipped = 0
+    for name in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, name)
+        if not os.path.isfile(path) or not name.lower().endswith(SUPPORTED_EXTENSIONS):
+            continue
+        
+        with open(path, 'rb') as f:
+            digest = content_hash(f.read())
+        
+        if not force and is_up_to_date(manifest.get(name), digest, output_dir, output_format, language):
+            skipped += 1
+        else:
+            jobs.append((path, digest))
+    
+    failed = 0
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_process_job, path, digest, output_dir, output_format, language)
+                       for path, digest in jobs]
+            for future in as_completed(futures):
+                name, result = future.result()
+                manifest[name] = result
+                if result['status'] == 'ok':
+                    print(f"{name}: {result['rows']} rows in {result['seconds']:.1f}s")
+                else:
+                    failed += 1
+                    print(f"{name}: failed: {result['error']}", file=sys.stderr)
+                
+                # Saved after every file so an interrupted run keeps its progress
+                _write_json(os.path.join(output_dir, MANIFEST_NAME), manifest)
+    
+    return {'processed': len(jobs) - failed, 'skipped': skipped, 'failed': failed}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Process supply chain extracts without the Streamlit app.')
+    parser.add_argument('input_dir', help='directory of CSV and Excel files')
+    parser.add_argument('output_dir', help='directory of the KPI, recommendation and report files')
+    parser.add_argument('--format', choices=['json', 'parquet'], default='json', dest='output_format',
+                        help='format of the KPI and recommendation files (default: json)')
+    parser.add_argument('--language', choices=['fr', 'en', 'es', 'ru'], default='en',
+                        help='language of the text reports (default: en)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true',
+                        help='reprocess files even if their content did not change')
+    args = parser.parse_args(argv)
+    
+    if not os.path.isdir(args.input_dir):
+        parser.error(f"input directory not found: {args.input_dir}")
+    if args.output_format == 'parquet' and not (importlib.util.find_spec('pyarrow') or
+                                                importlib.util.find_spec('fastparquet')):
+        parser.error("parquet output requires pyarrow or fastparquet")
+    
+    summary = run_batch(args.input_dir, args.output_dir, args.output_format, args.language,
+                        args.workers, args.force)
+    print(f"{summary['processed']} processed, {summary['skipped']} unchanged, {summary['failed']} failed")
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
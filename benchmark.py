@@ -0,0 +1,251 @@
+"""
+Scaling benchmark of the processing pipeline on synthetic datasets
+
+Generates datasets of increasing size with data_generator, then times every stage
+(CSV parsing, clean_data, calculate_all_kpis, generate_recommendations and each chart
+builder) and records its peak memory. Each stage is timed several times and the
+fastest run is kept. Results can be saved as a baseline; a later run compared against
+it fails when a stage became slower or larger than the threshold.
+
+Usage:
+    python benchmark.py [--sizes 10000 100000 1000000] [--seed 42] [--repeat 3]
+                        [--output results.json] [--save-baseline baseline.json]
+                        [--baseline baseline.json] [--threshold 1.5] [--no-memory]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+from data_generator import SupplyChainDataGenerator
+from data_processor import DataProcessor
+from kpi_calculator import KPICalculator
+from recommendation_engine import RecommendationEngine
+from visualizations import SupplyChainVisualizations
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+# Timed runs per stage; the fastest is compared, as noise only ever adds time
+DEFAULT_REPEAT = 3
+
+# Below this size, the smallest reported time increase grows as the size shrinks
+SMALL_SIZE = 100000
+
+# Unique chart cache keys, so every run builds its charts from scratch
+_run_ids = itertools.count()
+
+def build_stages(path):
+    """
+    Stages of the pipeline in execution order
+    
+    Each stage is a (name, function) pair; the function receives the results of the
+    previous stages and returns a dict of results to add to them.
+    
+    Args:
+        path (str): CSV file of the dataset
+        
+    Returns:
+        list: (name, function) tuples
+    """
+    def charts(state):
+        return SupplyChainVisualizations(state['data'], cache_key=('benchmark', next(_run_ids)))
+    
+    return [
+        ('read_csv', lambda state: {'raw': pd.read_csv(path)}),
+        ('clean_data', lambda state: {'data': DataProcessor().clean_data(state['raw'])}),
+        ('calculate_all_kpis', lambda state: {'kpis': KPICalculator(state['data']).calculate_all_kpis()}),
+        ('generate_recommendations', lambda state: {
+            'recommendations': RecommendationEngine(state['data'], state['kpis']).generate_recommendations()
+        }),
+        ('create_kpi_dashboard', lambda state: {'figure': charts(state).create_kpi_dashboard(state['kpis'])}),
+        ('create_distribution_plot', lambda state: {'figure': charts(state).create_distribution_plot('unit_cost')}),
+        ('create_time_series', lambda state: {
+            'figure': charts(state).create_time_series('order_date', 'quantity_delivered')
+        }),
+        ('create_category_analysis', lambda state: {
+            'figure': charts(state).create_category_analysis('supplier', 'unit_cost')
+        }),
+        ('create_correlation_matrix', lambda state: {'figure': charts(state).create_correlation_matrix()}),
+        ('create_trend_analysis', lambda state: {
+            'figure': charts(state).create_trend_analysis('order_date', ['quantity_delivered', 'unit_cost'])
+        }),
+        ('create_performance_comparison', lambda state: {
+            'figure': charts(state).create_performance_comparison('supplier', ['quantity_delivered', 'unit_cost'])
+        })
+    ]
+
+def measure(function, state, repeat=DEFAULT_REPEAT, memory=True):
+    """
+    Time a stage and measure its peak memory
+    
+    The stage is timed without tracing, then run once more under tracemalloc, which
+    slows Python code down, to measure the peak of the memory it allocates.
+    
+    Args:
+        function (callable): Stage function
+        state (dict): Results of the previous stages
+        repeat (int): Number of timed runs
+        memory (bool): Measure peak memory
+        
+    Returns:
+        tuple: (stage results, fastest seconds, median seconds, peak MB or None)
+    """
+    times = []
+    for _ in range(max(1, repeat)):
+        start_time = time.perf_counter()
+        result = function(state)
+        times.append(time.perf_counter() - start_time)
+    
+    peak_mb = None
+    if memory:
+        result = None
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            result = function(state)
+            peak_mb = (tracemalloc.get_traced_memory()[1] - baseline) / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+    
+    return result, min(times), statistics.median(times), peak_mb
+
+def run_benchmark(sizes, seed=42, repeat=DEFAULT_REPEAT, memory=True):
+    """
+    Run every stage on a generated dataset of each size
+    
+    Args:
+        sizes (list): Dataset sizes in rows
+        seed (int): Generator seed
+        repeat (int): Timed runs per stage
+        memory (bool): Measure peak memory
+        
+    Returns:
+        dict: Environment and {size: {stage: {'seconds', 'median_seconds', 'peak_mb'}}},
+            seconds being the fastest run
+    """
+    generator = SupplyChainDataGenerator(seed=seed)
+    results = {}
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in sizes:
+            path = os.path.join(temp_dir, f"supply_chain_{size}.csv")
+            generator.write_csv(path, size)
+            
+            state = {}
+            results[str(size)] = {}
+            for name, function in build_stages(path):
+                result, seconds, median_seconds, peak_mb = measure(function, state, repeat, memory)
+                state.update(result)
+                results[str(size)][name] = {
+                    'seconds': round(seconds, 4),
+                    'median_seconds': round(median_seconds, 4),
+                    'peak_mb': round(peak_mb, 2) if peak_mb is not None else None
+                }
+                memory_text = f"{peak_mb:9.1f} MB" if peak_mb is not None else ''
+                print(f"{size:>10} {name:<30}{seconds:9.3f}s {memory_text}", flush=True)
+            
+            os.remove(path)
+    
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'seed': seed,
+        'repeat': repeat,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'sizes': results
+    }
+
+def find_regressions(results, baseline, threshold=1.5, min_seconds=0.05, min_mb=5.0):
+    """
+    Compare a run with a baseline
+    
+    The fastest times are compared. Stages and sizes missing from either run are
+    ignored. Small absolute differences are ignored as well, so timer noise on fast
+    stages does not fail the run: stages on small datasets take milliseconds, where
+    scheduling and cache effects alone change the time by half, so the smallest
+    reported time increase is raised below SMALL_SIZE rows.
+    
+    Args:
+        results (dict): Result of run_benchmark
+        baseline (dict): Result of an earlier run
+        threshold (float): Allowed ratio to the baseline
+        min_seconds (float): Smallest time increase reported from SMALL_SIZE rows up,
+            raised below it by the square root of the size ratio (about 0.16s at 10000
+            rows with the default)
+        min_mb (float): Smallest peak memory increase reported
+        
+    Returns:
+        list: Descriptions of the regressions
+    """
+    regressions = []
+    for size, stages in results['sizes'].items():
+        for stage, current in stages.items():
+            previous = baseline.get('sizes', {}).get(size, {}).get(stage)
+            if previous is None:
+                continue
+            
+            time_floor = min_seconds * max(1.0, SMALL_SIZE / int(size)) ** 0.5
+            checks = [('seconds', 's', time_floor), ('peak_mb', ' MB', min_mb)]
+            for metric, unit, min_increase in checks:
+                value, reference = current.get(metric), previous.get(metric)
+                if value is None or reference is None:
+                    continue
+                if value > reference * threshold and value - reference > min_increase:
+                    regressions.append(
+                        f"{stage} at {size} rows: {metric} {value:.3f}{unit} vs {reference:.3f}{unit} "
+                        f"(x{value / reference if reference else float('inf'):.2f})"
+                    )
+    return regressions
+
+def _write_json(path, payload):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the processing pipeline on synthetic datasets.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='dataset sizes in rows (default: 10000 100000 1000000)')
+    parser.add_argument('--seed', type=int, default=42, help='generator seed (default: 42)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'timed runs per stage, fastest kept (default: {DEFAULT_REPEAT})')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced peak memory run')
+    parser.add_argument('--output', default=None, help='file to write the results to')
+    parser.add_argument('--save-baseline', default=None, help='file to save the results as a baseline')
+    parser.add_argument('--baseline', default=None, help='baseline to compare the results with')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='allowed ratio to the baseline before failing (default: 1.5)')
+    args = parser.parse_args(argv)
+    
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(f"baseline not found: {args.baseline}")
+    
+    results = run_benchmark(args.sizes, args.seed, args.repeat, not args.no_memory)
+    
+    if args.output:
+        _write_json(args.output, results)
+    if args.save_baseline:
+        _write_json(args.save_baseline, results)
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No stage regressed past x{args.threshold} of {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
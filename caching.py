@@ -0,0 +1,420 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+def dataset_fingerprint(df):
+    """
+    Compute a content fingerprint of a dataframe
+    
+    Args:
+        df (pd.DataFrame): Dataframe to fingerprint
+        
+    Returns:
+        str: Hex digest that changes whenever values, columns or dtypes change
+    """
+    digest = hashlib.sha1()
+    digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def content_hash(data):
+    """
+    Compute the content hash of raw file bytes
+    
+    Args:
+        data (bytes): File content
+        
+    Returns:
+        str: SHA-256 hex digest
+    """
+    return hashlib.sha256(data).hexdigest()
+
+class LRUCache:
+    """
+    Thread-safe cache keeping the most recently used entries up to a maximum count and,
+    optionally, a memory budget
+    """
+    
+    def __init__(self, maxsize=128, on_evict=None, max_bytes=None, sizeof=len, evictable=None):
+        """
+        Initialize an empty cache
+        
+        Args:
+            maxsize (int): Maximum number of entries, None for no limit
+            on_evict (callable): Called with (key, value) for each entry dropped by put(),
+                evicted over the limits or replaced by another value, after the cache lock
+                is released
+            max_bytes (int): Memory budget of the stored values, None for no budget
+            sizeof (callable): Size in bytes of a value, used with max_bytes
+            evictable (callable): Called with (key, value) with the lock held; entries for
+                which it returns False are kept even over the limits
+        """
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.evictable = evictable
+        # Entries are (value, size in bytes) pairs
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # Re-entrant: a finalizer running while the lock is held can trigger an eviction
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key, default=None):
+        """
+        Get an entry and mark it as most recently used
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def peek(self, key, default=None):
+        """
+        Get an entry without marking it as used or counting the lookup
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else default
+    
+    def put(self, key, value):
+        """
+        Store an entry, evicting the least recently used entries over the limits
+        
+        A value larger than the whole memory budget is not stored, unless it cannot be
+        evicted.
+        
+        Returns:
+            bool: True if the value was stored
+        """
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        dropped = []
+        with self._lock:
+            if self.max_bytes is not None and size > self.max_bytes and self._can_evict(key, value):
+                return False
+            
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+                if previous[0] is not value:
+                    dropped.append((key, previous[0]))
+            self._entries[key] = (value, size)
+            self._bytes += size
+            dropped.extend(self._trim())
+        
+        self._notify(dropped)
+        return True
+    
+    def trim(self):
+        """
+        Evict the least recently used entries over the limits, e.g. once entries that
+        could not be evicted became evictable
+        """
+        with self._lock:
+            dropped = self._trim()
+        self._notify(dropped)
+    
+    def _trim(self):
+        """
+        Evict entries until the cache fits its limits, called with the lock held
+        
+        Returns:
+            list: Evicted (key, value) pairs
+        """
+        dropped = []
+        for key in list(self._entries):
+            if not self._over_limits():
+                break
+            entry = self._entries.get(key)
+            if entry is None or not self._can_evict(key, entry[0]):
+                continue
+            del self._entries[key]
+            self._bytes -= entry[1]
+            self.evictions += 1
+            dropped.append((key, entry[0]))
+        return dropped
+    
+    def _over_limits(self):
+        return ((self.maxsize is not None and len(self._entries) > self.maxsize) or
+                (self.max_bytes is not None and self._bytes > self.max_bytes))
+    
+    def _can_evict(self, key, value):
+        return self.evictable is None or self.evictable(key, value)
+    
+    def _notify(self, dropped):
+        if self.on_evict is not None:
+            for entry in dropped:
+                self.on_evict(*entry)
+    
+    def pop(self, key, default=None):
+        """
+        Remove an entry and return it
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[1]
+            return entry[0]
+    
+    def discard_where(self, predicate):
+        """
+        Remove the entries whose key matches a predicate
+        
+        Returns:
+            int: Number of removed entries
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[1]
+            return len(keys)
+    
+    def items(self):
+        """
+        Get a snapshot of the entries, least recently used first
+        
+        Returns:
+            list: (key, value) pairs
+        """
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._entries.items()]
+    
+    def stats(self):
+        """
+        Get cache statistics
+        
+        Returns:
+            dict: Hits, misses, hit rate, evictions, entries and memory usage
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
+    
+    def clear(self):
+        """
+        Remove all entries and reset statistics
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+    
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+class PendingBuilds:
+    """
+    Thread-safe registry of the values being built, so that concurrent requests for the
+    same key wait for one build instead of repeating it
+    """
+    
+    def __init__(self):
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.waits = 0
+    
+    def claim(self, key):
+        """
+        Get the future of the build in progress for a key, or register a new build
+        
+        Returns:
+            tuple: (future, owner), owner being True when the caller registered the build
+                and must resolve it with set_result or set_exception
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.waits += 1
+                return future, False
+            future = Future()
+            self._futures[key] = future
+            return future, True
+    
+    def get(self, key):
+        """
+        Get the future of the build in progress for a key, None if there is none
+        """
+        with self._lock:
+            return self._futures.get(key)
+    
+    def set_result(self, key, result):
+        """
+        Unregister a build and resolve its future with the built value
+        """
+        with self._lock:
+            future = self._futures.pop(key)
+        future.set_result(result)
+    
+    def set_exception(self, key, exception):
+        """
+        Unregister a build and fail its future with the build error
+        """
+        with self._lock:
+            future = self._futures.pop(key)
+        future.set_exception(exception)
+    
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._futures
+
+class FigureCache:
+    """
+    Thread-safe cache of serialized Plotly figures with a memory budget and LRU eviction
+    """
+    
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        Initialize an empty cache
+        
+        Args:
+            max_bytes (int): Memory budget for the stored figure JSON
+        """
+        self.max_bytes = max_bytes
+        self._figures = LRUCache(maxsize=None, max_bytes=max_bytes)
+        self._pending = PendingBuilds()
+    
+    @staticmethod
+    def make_key(fingerprint, filter_predicate, chart_type, params=(), language='en'):
+        """
+        Build a cache key for a figure
+        
+        Args:
+            fingerprint (str): Content hash or fingerprint of the dataset
+            filter_predicate (hashable): Active filters, empty when the data is unfiltered
+            chart_type (str): Chart builder name
+            params (tuple): Chart parameters (columns, options)
+            language (str): Display language
+            
+        Returns:
+            tuple: Hashable cache key
+        """
+        return (fingerprint, filter_predicate, chart_type, tuple(params), language)
+    
+    def get(self, key):
+        """
+        Get a cached figure
+        
+        Returns:
+            plotly.graph_objects.Figure: Deserialized figure, or None on a miss
+        """
+        payload = self._figures.get(key)
+        if payload is None:
+            return None
+        
+        import plotly.io as pio
+        return pio.from_json(payload.decode('utf-8'))
+    
+    def put(self, key, fig):
+        """
+        Serialize and store a figure, evicting least recently used figures over the budget
+        """
+        if fig is None:
+            return
+        self._figures.put(key, fig.to_json().encode('utf-8'))
+    
+    def get_or_build(self, key, builder):
+        """
+        Get a cached figure or build, store and return it
+        
+        If the same figure is already being built (by a prefetch or another session),
+        waits for that build instead of duplicating the work.
+        
+        Args:
+            key (tuple): Cache key from make_key
+            builder (callable): Function returning the figure (or None)
+            
+        Returns:
+            plotly.graph_objects.Figure: Figure, or None if the builder returned None
+        """
+        fig = self.get(key)
+        if fig is not None:
+            return fig
+        
+        future, owner = self._pending.claim(key)
+        if owner:
+            return self._build(key, builder)
+        
+        try:
+            fig = future.result()
+        except Exception:
+            # The in-flight build failed, build in the foreground to surface the error
+            return builder()
+        return self.get(key) or fig
+    
+    def prefetch(self, key, builder, executor):
+        """
+        Build a figure in the background unless it is cached or already being built
+        
+        Args:
+            key (tuple): Cache key from make_key
+            builder (callable): Function returning the figure (or None)
+            executor (concurrent.futures.Executor): Thread pool running the build
+            
+        Returns:
+            concurrent.futures.Future: Future of the figure, None if it was already cached
+        """
+        if key in self._figures:
+            return None
+        future = self._pending.get(key)
+        if future is not None:
+            return future
+        
+        future, owner = self._pending.claim(key)
+        if owner:
+            executor.submit(self._build, key, builder)
+        return future
+    
+    def _build(self, key, builder):
+        """
+        Run a builder, store its figure and resolve the in-flight future
+        """
+        try:
+            fig = builder()
+            self.put(key, fig)
+        except Exception as e:
+            self._pending.set_exception(key, e)
+            raise
+        self._pending.set_result(key, fig)
+        return fig
+    
+    def stats(self):
+        """
+        Get cache statistics
+        
+        Returns:
+            dict: Hits, misses, hit rate, evictions, entries and memory usage
+        """
+        stats = self._figures.stats()
+        stats['waits'] = self._pending.waits
+        return stats
+    
+    def clear(self):
+        """
+        Remove all figures and reset statistics
+        """
+        self._figures.clear()
+        self._pending.waits = 0
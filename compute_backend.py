@@ -0,0 +1,401 @@
+import importlib.util
+import os
+import sqlite3
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+AGGREGATIONS = ('sum', 'count', 'mean', 'min', 'max')
+
+# Below this many rows pandas answers filtered aggregations faster than an engine
+SQL_MIN_ROWS = 2000000
+
+class ComputeBackend:
+    """
+    Runs filtered aggregations over one table, returning only the aggregated rows
+    
+    Filters use the format of KPICalculator.calculate_selection_kpis: ((column, values), ...)
+    where values is an inclusive (start_date, end_date) day range for datetime columns and
+    the accepted values otherwise. Aggregations map output names to (column, function)
+    pairs, function being one of AGGREGATIONS; ('*', 'count') counts rows.
+    """
+    
+    name = None
+    
+    def __init__(self, table):
+        """
+        Initialize with the table to query
+        
+        Args:
+            table (pd.DataFrame): Filter columns and measures
+        """
+        self.columns = list(table.columns)
+        self.datetime_columns = [column for column in table.columns
+                                 if pd.api.types.is_datetime64_any_dtype(table[column])]
+        self.rows = len(table)
+    
+    def aggregate(self, aggregations, group_by=(), filters=()):
+        """
+        Aggregate the filtered rows, optionally per group
+        
+        Args:
+            aggregations (dict): {output name: (column, function)}
+            group_by (list): Columns defining the groups, none for a single row of totals
+            filters (tuple): ((column, values), ...)
+            
+        Returns:
+            pd.DataFrame: One row per group with the group columns and the aggregations
+        """
+        raise NotImplementedError
+    
+    def totals(self, columns, filters=()):
+        """
+        Sum columns over the filtered rows
+        
+        Returns:
+            pd.Series: Sum of each column, 0 when no row is selected
+        """
+        result = self.aggregate({column: (column, 'sum') for column in columns}, filters=filters)
+        return result.iloc[0].astype(float)
+    
+    def count(self, filters=()):
+        """
+        Count the filtered rows
+        """
+        return int(self.aggregate({'rows': ('*', 'count')}, filters=filters)['rows'].iloc[0])
+    
+    def distinct(self, column, filters=()):
+        """
+        Get the distinct values of a column in the filtered rows
+        
+        Returns:
+            list: Values, sorted, missing values last
+        """
+        result = self.aggregate({'rows': ('*', 'count')}, group_by=[column], filters=filters)
+        values = result[column]
+        return sorted(values.dropna().tolist()) + ([None] if values.isna().any() else [])
+    
+    def close(self):
+        """
+        Release the engine resources
+        """
+    
+    def _check(self, aggregations, group_by, filters):
+        for column, function in aggregations.values():
+            if function not in AGGREGATIONS:
+                raise ValueError(f"Unsupported aggregation: {function}")
+            if column != '*' and column not in self.columns:
+                raise KeyError(column)
+            if column == '*' and function != 'count':
+                raise ValueError(f"{function} needs a column")
+        for column in list(group_by) + [column for column, _ in filters]:
+            if column not in self.columns:
+                raise KeyError(column)
+    
+    @staticmethod
+    def _day_bounds(values):
+        """
+        Start and exclusive end timestamps of an inclusive day range
+        """
+        start_date, end_date = values
+        return pd.Timestamp(start_date), pd.Timestamp(end_date) + pd.Timedelta(days=1)
+
+class PandasBackend(ComputeBackend):
+    """
+    Evaluates filters and aggregations on the dataframe itself
+    """
+    
+    name = 'pandas'
+    
+    def __init__(self, table):
+        super().__init__(table)
+        self.table = table
+    
+    def aggregate(self, aggregations, group_by=(), filters=()):
+        group_by = list(group_by)
+        self._check(aggregations, group_by, filters)
+        selected = self.table[self._mask(filters)] if filters else self.table
+        
+        if not group_by:
+            row = {}
+            for name, (column, function) in aggregations.items():
+                if column == '*':
+                    row[name] = len(selected)
+                else:
+                    row[name] = getattr(selected[column], function)()
+            return pd.DataFrame([row], columns=list(aggregations))
+        
+        grouped = selected.groupby(group_by, dropna=False, observed=True, sort=True)
+        result = pd.DataFrame(index=grouped.size().index)
+        for name, (column, function) in aggregations.items():
+            result[name] = grouped.size() if column == '*' else grouped[column].agg(function)
+        return result.reset_index()
+    
+    def _mask(self, filters):
+        mask = np.ones(len(self.table), dtype=bool)
+        for column, values in filters:
+            series = self.table[column]
+            if column in self.datetime_columns:
+                start, end = self._day_bounds(values)
+                if getattr(series.dt, 'tz', None) is not None:
+                    series = series.dt.tz_localize(None)
+                mask &= ((series >= start) & (series < end)).to_numpy()
+            else:
+                mask &= series.isin(list(values)).to_numpy()
+        return mask
+
+class SQLBackend(ComputeBackend):
+    """
+    Translates aggregations and filters into one SQL query over the table 'data'
+    """
+    
+    # Placeholder of query parameters
+    placeholder = '?'
+    
+    def __init__(self, table):
+        super().__init__(table)
+        self._lock = threading.Lock()
+    
+    def aggregate(self, aggregations, group_by=(), filters=()):
+        group_by = list(group_by)
+        self._check(aggregations, group_by, filters)
+        
+        select = [self._quote(column) for column in group_by]
+        for name, (column, function) in aggregations.items():
+            select.append(f"{self._aggregate_sql(column, function)} AS {self._quote(name)}")
+        
+        where, params = self._where(filters)
+        sql = f"SELECT {', '.join(select)} FROM data"
+        if where:
+            sql += f" WHERE {where}"
+        if group_by:
+            keys = [self._quote(column) for column in group_by]
+            sql += f" GROUP BY {', '.join(keys)} ORDER BY {', '.join(key + ' NULLS LAST' for key in keys)}"
+        
+        with self._lock:
+            result = self._query(sql, params)
+        result.columns = group_by + list(aggregations)
+        
+        for column in group_by:
+            if column in self.datetime_columns:
+                result[column] = self._to_datetime(result[column])
+        for name, (column, function) in aggregations.items():
+            if function == 'count':
+                result[name] = result[name].fillna(0).astype('int64')
+            elif function == 'sum':
+                # SUM of no rows is NULL in SQL, 0 in pandas
+                result[name] = pd.to_numeric(result[name]).fillna(0)
+        return result
+    
+    def _aggregate_sql(self, column, function):
+        if column == '*':
+            return 'COUNT(*)'
+        sql_function = {'sum': 'SUM', 'count': 'COUNT', 'mean': 'AVG', 'min': 'MIN', 'max': 'MAX'}[function]
+        return f"{sql_function}({self._quote(column)})"
+    
+    def _where(self, filters):
+        """
+        WHERE clause and parameters of the filters
+        """
+        clauses = []
+        params = []
+        for column, values in filters:
+            quoted = self._quote(column)
+            if column in self.datetime_columns:
+                start, end = self._day_bounds(values)
+                clauses.append(f"{quoted} >= {self.placeholder} AND {quoted} < {self.placeholder}")
+                params.extend([self._date_param(start), self._date_param(end)])
+                continue
+            
+            values = list(values)
+            present = [value for value in values if not pd.isna(value)]
+            conditions = []
+            if present:
+                conditions.append(f"{quoted} IN ({', '.join([self.placeholder] * len(present))})")
+                params.extend(self._value_param(value) for value in present)
+            if len(present) < len(values):
+                conditions.append(f"{quoted} IS NULL")
+            clauses.append(f"({' OR '.join(conditions)})" if conditions else '1 = 0')
+        return ' AND '.join(clauses), params
+    
+    def _value_param(self, value):
+        if isinstance(value, np.generic):
+            return value.item()
+        return value if isinstance(value, (int, float)) else str(value)
+    
+    def _date_param(self, value):
+        return value.to_pydatetime()
+    
+    def _to_datetime(self, values):
+        return pd.to_datetime(values)
+    
+    @staticmethod
+    def _quote(name):
+        return '"' + str(name).replace('"', '""') + '"'
+    
+    @staticmethod
+    def _prepare(table):
+        """
+        Copy of a table with timezone-naive datetimes and text object columns
+        """
+        prepared = {}
+        for column in table.columns:
+            series = table[column]
+            if pd.api.types.is_datetime64_any_dtype(series) and getattr(series.dt, 'tz', None) is not None:
+                series = series.dt.tz_localize(None)
+            elif series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype(object)
+                series = series.where(series.isna(), series.astype(str))
+            elif series.dtype == bool:
+                series = series.astype('int64')
+            prepared[str(column)] = series.reset_index(drop=True)
+        return pd.DataFrame(prepared)
+    
+    def _query(self, sql, params):
+        raise NotImplementedError
+
+class SQLiteBackend(SQLBackend):
+    """
+    Runs queries on an SQLite copy of the table, in memory or in a database file
+    
+    Datetimes are stored as nanoseconds since the epoch and the filter columns are
+    indexed, so selective filters read only the matching rows.
+    """
+    
+    name = 'sqlite'
+    
+    def __init__(self, table, path=None, index_columns=None, chunk_rows=100000):
+        """
+        Load the table into SQLite
+        
+        Args:
+            table (pd.DataFrame): Filter columns and measures
+            path (str): Database file, None for an in-memory database
+            index_columns (list): Columns to index, the datetime and text columns if omitted
+            chunk_rows (int): Rows inserted per batch
+        """
+        super().__init__(table)
+        self.path = path
+        self.connection = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        
+        prepared = self._prepare(table)
+        for column in self.datetime_columns:
+            values = prepared[column]
+            prepared[column] = values.astype('int64').astype(object).where(values.notna(), None)
+        prepared.to_sql('data', self.connection, index=False, if_exists='replace', chunksize=chunk_rows)
+        
+        if index_columns is None:
+            index_columns = [column for column in table.columns
+                             if column in self.datetime_columns or table[column].dtype == object
+                             or isinstance(table[column].dtype, pd.CategoricalDtype)]
+        for i, column in enumerate(index_columns):
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS idx_data_{i} ON data ({self._quote(column)})")
+        self.connection.commit()
+    
+    def _date_param(self, value):
+        return value.value
+    
+    def _to_datetime(self, values):
+        return pd.to_datetime(values, unit='ns')
+    
+    def _query(self, sql, params):
+        cursor = self.connection.execute(sql, params)
+        return pd.DataFrame(cursor.fetchall(), columns=[description[0] for description in cursor.description])
+    
+    def close(self):
+        self.connection.close()
+
+class DuckDBBackend(SQLBackend):
+    """
+    Runs queries with DuckDB on a local Parquet copy of the table
+    
+    Requires the duckdb package. DuckDB scans only the columns and row groups a query
+    needs and aggregates in parallel, so it suits tables of tens of millions of rows.
+    """
+    
+    name = 'duckdb'
+    
+    def __init__(self, table, parquet_dir=None, row_group_rows=1000000):
+        """
+        Write the table as Parquet and open it in DuckDB
+        
+        Args:
+            table (pd.DataFrame): Filter columns and measures
+            parquet_dir (str): Directory of the Parquet file, a temporary directory
+                removed with the backend if omitted
+            row_group_rows (int): Rows per Parquet row group
+        """
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("The DuckDB backend requires the duckdb package") from e
+        
+        super().__init__(table)
+        self._temp_dir = None
+        if parquet_dir is None:
+            self._temp_dir = tempfile.TemporaryDirectory(prefix='duckdb_backend_')
+            parquet_dir = self._temp_dir.name
+        self.path = os.path.join(parquet_dir, 'data.parquet')
+        self._prepare(table).to_parquet(self.path, index=False, row_group_size=row_group_rows)
+        
+        self.connection = duckdb.connect()
+        path_literal = self.path.replace("'", "''")
+        self.connection.execute(f"CREATE VIEW data AS SELECT * FROM read_parquet('{path_literal}')")
+    
+    def _query(self, sql, params):
+        return self.connection.execute(sql, params).fetchdf()
+    
+    def close(self):
+        self.connection.close()
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+
+BACKENDS = {
+    'pandas': PandasBackend,
+    'sqlite': SQLiteBackend,
+    'duckdb': DuckDBBackend
+}
+
+def available_backends():
+    """
+    Get the backends whose engine is installed
+    
+    Returns:
+        list: Backend names
+    """
+    return [name for name in BACKENDS if name != 'duckdb' or importlib.util.find_spec('duckdb') is not None]
+
+def resolve_backend(kind, rows):
+    """
+    Choose the backend of a table
+    
+    Args:
+        kind (str): 'auto' or a backend name
+        rows (int): Number of rows of the table
+        
+    Returns:
+        str: DuckDB for large tables when it is installed with 'auto', pandas otherwise
+    """
+    if kind != 'auto':
+        if kind not in BACKENDS:
+            raise ValueError(f"Unknown compute backend: {kind}")
+        return kind
+    if rows >= SQL_MIN_ROWS and 'duckdb' in available_backends():
+        return 'duckdb'
+    return 'pandas'
+
+def create_backend(table, kind='auto', **options):
+    """
+    Create a compute backend over a table
+    
+    Args:
+        table (pd.DataFrame): Filter columns and measures
+        kind (str): 'auto', 'pandas', 'sqlite' or 'duckdb'
+        **options: Options of the backend class
+        
+    Returns:
+        ComputeBackend: Backend holding its own copy of the table
+    """
+    return BACKENDS[resolve_backend(kind, len(table))](table, **options)
@@ -0,0 +1,182 @@
+import pandas as pd
+import numpy as np
+
+from caching import LRUCache, dataset_fingerprint
+
+# Correlation results per (dataset/filter key, sample size, seed)
+_CORRELATION_CACHE = LRUCache(maxsize=16)
+
+class CorrelationService:
+    """
+    Computes pairwise correlations of numeric columns on float32 arrays, optionally on a row sample
+    """
+    
+    def __init__(self, data, cache_key=None, max_rows=200000, seed=42):
+        """
+        Initialize with supply chain data
+        
+        Args:
+            data (pd.DataFrame): Supply chain dataset
+            cache_key (hashable): Identifies the dataset and filter state of data.
+                Computed from the data content if omitted.
+            max_rows (int): Correlations are computed on a random sample of this many rows
+                for larger datasets, None to always use every row
+            seed (int): Seed of the row sample
+        """
+        self.data = data
+        self.cache_key = cache_key
+        self.max_rows = max_rows
+        self.seed = seed
+    
+    def compute(self):
+        """
+        Compute the correlation matrix, reusing the cached result for the same data
+        
+        Returns:
+            dict: 'matrix' (pd.DataFrame), 'pair_counts' (np.ndarray of rows used per pair),
+            'n_rows', 'total_rows', 'sampled' and 'error_bound' (largest 95% confidence
+            half-width over all pairs, 0 when every row is used)
+        """
+        if self.cache_key is None:
+            self.cache_key = dataset_fingerprint(self.data)
+        
+        key = (self.cache_key, self.max_rows, self.seed)
+        result = _CORRELATION_CACHE.get(key)
+        if result is None:
+            result = self._compute()
+            _CORRELATION_CACHE.put(key, result)
+        
+        return result
+    
+    def top_pairs(self, k=20):
+        """
+        Get the k most strongly correlated column pairs
+        
+        Args:
+            k (int): Number of pairs
+            
+        Returns:
+            pd.DataFrame: Pairs sorted by absolute correlation, with 95% confidence bounds
+        """
+        result = self.compute()
+        matrix = result['matrix']
+        upper = np.triu_indices(len(matrix.columns), k=1)
+        
+        pairs = pd.DataFrame({
+            'variable_1': matrix.columns[upper[0]],
+            'variable_2': matrix.columns[upper[1]],
+            'correlation': matrix.to_numpy()[upper],
+            'rows': result['pair_counts'][upper]
+        }).dropna(subset=['correlation'])
+        
+        pairs = pairs.reindex(pairs['correlation'].abs().sort_values(ascending=False).index).head(k)
+        
+        low, high = self._confidence_interval(pairs['correlation'].to_numpy(), pairs['rows'].to_numpy())
+        pairs['ci_low'] = low
+        pairs['ci_high'] = high
+        
+        return pairs.reset_index(drop=True)
+    
+    def clustered_order(self):
+        """
+        Order columns so that strongly correlated columns are adjacent
+        
+        Columns are merged by average-linkage agglomerative clustering on the distance
+        1 - |correlation| and returned in the leaf order of the resulting tree.
+        
+        Returns:
+            list: Column names in clustered order
+        """
+        matrix = self.compute()['matrix']
+        n_columns = len(matrix.columns)
+        if n_columns < 3:
+            return list(matrix.columns)
+        
+        distances = 1 - np.nan_to_num(np.abs(matrix.to_numpy(dtype=np.float64)))
+        np.fill_diagonal(distances, np.inf)
+        sizes = np.ones(n_columns)
+        leaves = [[i] for i in range(n_columns)]
+        
+        for _ in range(n_columns - 1):
+            i, j = np.unravel_index(np.argmin(distances), distances.shape)
+            i, j = min(i, j), max(i, j)
+            
+            # Average linkage: size-weighted mean of the two merged rows
+            merged = (distances[i] * sizes[i] + distances[j] * sizes[j]) / (sizes[i] + sizes[j])
+            distances[i, :] = merged
+            distances[:, i] = merged
+            distances[i, i] = np.inf
+            distances[j, :] = np.inf
+            distances[:, j] = np.inf
+            
+            sizes[i] += sizes[j]
+            leaves[i] = leaves[i] + leaves[j]
+            leaves[j] = []
+        
+        order = next(leaf for leaf in leaves if leaf)
+        return list(matrix.columns[order])
+    
+    def _compute(self):
+        """
+        Compute Pearson correlations with pairwise deletion of missing values
+        """
+        numeric_data = self.data.select_dtypes(include=[np.number])
+        total_rows = len(numeric_data)
+        
+        sampled = self.max_rows is not None and total_rows > self.max_rows
+        if sampled:
+            rng = np.random.default_rng(self.seed)
+            rows = np.sort(rng.choice(total_rows, size=self.max_rows, replace=False))
+            numeric_data = numeric_data.iloc[rows]
+        
+        # Center in float64 first so that the float32 products keep their precision
+        values = numeric_data.to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(all='ignore'):
+            values = (values - np.nanmean(values, axis=0)).astype(np.float32)
+        
+        present = ~np.isnan(values)
+        values[~present] = 0
+        mask = present.astype(np.float32)
+        
+        # Pairwise sums over the rows where both columns are present
+        counts = mask.T @ mask
+        sums = values.T @ mask
+        sums_sq = (values * values).T @ mask
+        products = values.T @ values
+        
+        with np.errstate(all='ignore'):
+            covariance = products - sums * sums.T / counts
+            variance_x = sums_sq - sums ** 2 / counts
+            variance_y = variance_x.T
+            corr = covariance / np.sqrt(variance_x * variance_y)
+        
+        corr = np.clip(corr, -1, 1)
+        corr[counts < 2] = np.nan
+        constant = np.diag(variance_x) <= 0
+        np.fill_diagonal(corr, np.where(constant, np.nan, 1))
+        
+        pair_counts = counts.astype(np.int64)
+        error_bound = 0.0
+        # Correlations of constant columns are NaN and have no interval
+        defined = np.isfinite(corr)
+        if sampled and defined.any():
+            low, high = self._confidence_interval(corr, pair_counts)
+            error_bound = float(np.maximum(corr - low, high - corr)[defined].max())
+        
+        return {
+            'matrix': pd.DataFrame(corr, index=numeric_data.columns, columns=numeric_data.columns),
+            'pair_counts': pair_counts,
+            'n_rows': len(numeric_data),
+            'total_rows': total_rows,
+            'sampled': sampled,
+            'error_bound': error_bound
+        }
+    
+    def _confidence_interval(self, corr, counts, z=1.96):
+        """
+        95% confidence interval of correlations using the Fisher transformation
+        """
+        with np.errstate(all='ignore'):
+            fisher = np.arctanh(np.clip(corr, -0.999999, 0.999999))
+            margin = z / np.sqrt(np.maximum(counts - 3, 1))
+            return np.tanh(fisher - margin), np.tanh(fisher + margin)
@@ -0,0 +1,254 @@
+"""
+Deterministic generator of synthetic supply chain extracts
+
+Produces datasets with the schema of sample_data.csv at any size, with the
+irregularities of real extracts: supplier, product and location skew, supplier
+specific lead-time distributions, partial and pending deliveries, currency strings
+and dates in mixed formats. Rows are generated in fixed-size blocks seeded from the
+generator seed and the block number, so a dataset is the same whatever the size it
+is written in and the first rows of a larger dataset equal a smaller one.
+
+Usage:
+    python data_generator.py OUTPUT.csv [--rows 1000000] [--seed 42] [--dirty-fraction 0.02]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    'product_id', 'product_name', 'supplier', 'order_date', 'delivery_date',
+    'quantity_ordered', 'quantity_delivered', 'unit_cost', 'location', 'status'
+]
+
+SUPPLIER_NAMES = [
+    'Alpha', 'Beta', 'Gamma', 'Delta', 'Epsilon', 'Zeta', 'Eta', 'Theta', 'Iota', 'Kappa',
+    'Lambda', 'Mu', 'Nu', 'Xi', 'Omicron', 'Pi', 'Rho', 'Sigma', 'Tau', 'Upsilon'
+]
+
+LOCATIONS = [
+    'Warehouse North', 'Warehouse South', 'Warehouse East', 'Warehouse West',
+    'Warehouse Central', 'DC Lyon', 'DC Hamburg', 'DC Milan', 'DC Madrid', 'DC Rotterdam'
+]
+
+PRODUCT_FAMILIES = ['Widget', 'Component', 'Assembly', 'Part', 'Module', 'Kit']
+
+# Formats of the dates that were not exported in ISO format
+DIRTY_DATE_FORMATS = ['%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d', '%d-%b-%Y']
+
+class SupplyChainDataGenerator:
+    """
+    Generates raw supply chain extracts, as read from a CSV file before cleaning
+    """
+    
+    # Rows per seeded block, fixed so the data does not depend on how it is requested
+    BLOCK_ROWS = 100000
+    
+    def __init__(self, seed=42, n_products=500, dirty_fraction=0.02, missing_fraction=0.005,
+                 start_date='2023-01-01', days=730):
+        """
+        Initialize the generator and its product and supplier catalog
+        
+        Args:
+            seed (int): Seed of the catalog and of every block of rows
+            n_products (int): Number of distinct SKUs
+            dirty_fraction (float): Share of costs written as currency strings and of
+                dates written in a non-ISO format
+            missing_fraction (float): Share of missing suppliers and locations
+            start_date (str): First order date
+            days (int): Number of days covered by the order dates
+        """
+        self.seed = seed
+        self.n_products = n_products
+        self.dirty_fraction = dirty_fraction
+        self.missing_fraction = missing_fraction
+        self.start_date = np.datetime64(start_date, 'D')
+        self.days = days
+        self._build_catalog()
+    
+    def _build_catalog(self):
+        """
+        Draw the products, suppliers and locations with their popularity and behavior
+        """
+        rng = np.random.default_rng([self.seed, 0])
+        
+        # Zipf-like popularity: a few suppliers, SKUs and sites carry most of the volume
+        self.supplier_names = np.array([f"Supplier {name}" for name in SUPPLIER_NAMES], dtype=object)
+        self.supplier_weights = self._skewed_weights(len(SUPPLIER_NAMES), 1.1)
+        self.location_names = np.array(LOCATIONS, dtype=object)
+        self.location_weights = self._skewed_weights(len(LOCATIONS), 0.8)
+        self.product_weights = self._skewed_weights(self.n_products, 1.0)
+        
+        self.product_ids = np.array([f"SKU{i + 1:05d}" for i in range(self.n_products)], dtype=object)
+        families = rng.choice(PRODUCT_FAMILIES, self.n_products)
+        self.product_names = np.array([f"{family} {i + 1}" for i, family in enumerate(families)], dtype=object)
+        self.product_costs = np.round(rng.lognormal(np.log(8), 1.0, self.n_products), 2) + 0.5
+        self.product_quantities = rng.lognormal(np.log(400), 0.8, self.n_products)
+        # Most SKUs are bought from one supplier, the rest from a random one
+        self.product_suppliers = rng.choice(len(SUPPLIER_NAMES), self.n_products, p=self.supplier_weights)
+        
+        # Supplier behavior: median lead time, spread, share of partial and late deliveries
+        n_suppliers = len(SUPPLIER_NAMES)
+        self.supplier_lead_days = rng.uniform(3, 21, n_suppliers)
+        self.supplier_lead_sigma = rng.uniform(0.15, 0.6, n_suppliers)
+        self.supplier_partial_rate = rng.beta(2, 12, n_suppliers)
+        self.supplier_late_rate = rng.beta(1.5, 20, n_suppliers)
+    
+    def _skewed_weights(self, n, exponent):
+        weights = 1.0 / np.arange(1, n + 1) ** exponent
+        return weights / weights.sum()
+    
+    def generate(self, rows):
+        """
+        Generate a dataset
+        
+        Args:
+            rows (int): Number of rows
+            
+        Returns:
+            pd.DataFrame: Raw rows with text dates and costs, as pd.read_csv returns them
+        """
+        chunks = list(self.iter_chunks(rows))
+        if not chunks:
+            return pd.DataFrame(columns=COLUMNS)
+        return pd.concat(chunks, ignore_index=True)
+    
+    def iter_chunks(self, rows):
+        """
+        Generate a dataset block by block, for sizes that do not fit in memory
+        
+        Args:
+            rows (int): Number of rows
+            
+        Yields:
+            pd.DataFrame: Blocks of at most BLOCK_ROWS rows
+        """
+        for block, start in enumerate(range(0, rows, self.BLOCK_ROWS)):
+            block_rows = min(self.BLOCK_ROWS, rows - start)
+            df = self._generate_block(block, self.BLOCK_ROWS)
+            yield df.iloc[:block_rows].set_axis(pd.RangeIndex(start, start + block_rows))
+    
+    def _generate_block(self, block, n):
+        """
+        Generate one full block of rows from its own random stream
+        """
+        rng = np.random.default_rng([self.seed, block + 1])
+        
+        product = rng.choice(self.n_products, n, p=self.product_weights)
+        supplier = self.product_suppliers[product].copy()
+        other_supplier = rng.random(n) < 0.15
+        supplier[other_supplier] = rng.choice(len(SUPPLIER_NAMES), other_supplier.sum(), p=self.supplier_weights)
+        location = rng.choice(len(LOCATIONS), n, p=self.location_weights)
+        
+        order_date = self.start_date + rng.integers(0, self.days, n).astype('timedelta64[D]')
+        lead_days = rng.lognormal(np.log(self.supplier_lead_days[supplier]), self.supplier_lead_sigma[supplier])
+        late = rng.random(n) < self.supplier_late_rate[supplier]
+        lead_days[late] *= rng.uniform(1.5, 4, late.sum())
+        delivery_date = order_date + np.ceil(lead_days).astype('timedelta64[D]')
+        
+        # Orders in multiples of 10 units around each SKU's usual size
+        quantity_ordered = np.maximum(np.round(rng.lognormal(np.log(self.product_quantities[product]), 0.5) / 10), 1) * 10
+        quantity_ordered = quantity_ordered.astype(np.int64)
+        
+        # Recent orders are more likely to be still open
+        age = (self.start_date + self.days - order_date).astype(np.int64)
+        pending = rng.random(n) < np.where(age < 30, 0.4, 0.01)
+        cancelled = ~pending & (rng.random(n) < 0.005)
+        partial = ~pending & ~cancelled & (rng.random(n) < self.supplier_partial_rate[supplier])
+        
+        quantity_delivered = quantity_ordered.copy()
+        quantity_delivered[partial] = np.floor(quantity_ordered[partial] * rng.uniform(0.4, 0.98, partial.sum()))
+        quantity_delivered[pending | cancelled] = 0
+        
+        status = np.full(n, 'Delivered', dtype=object)
+        status[partial] = 'Partial'
+        status[pending] = 'Pending'
+        status[cancelled] = 'Cancelled'
+        
+        unit_cost = np.round(self.product_costs[product] * rng.normal(1, 0.05, n), 2)
+        
+        df = pd.DataFrame({
+            'product_id': self.product_ids[product],
+            'product_name': self.product_names[product],
+            'supplier': self.supplier_names[supplier],
+            'order_date': self._format_dates(rng, order_date),
+            'delivery_date': self._format_dates(rng, delivery_date, missing=pending | cancelled),
+            'quantity_ordered': quantity_ordered,
+            'quantity_delivered': quantity_delivered,
+            'unit_cost': self._format_costs(rng, unit_cost),
+            'location': self.location_names[location],
+            'status': status
+        })
+        
+        for column in ('supplier', 'location'):
+            missing = rng.random(n) < self.missing_fraction
+            df.loc[missing, column] = None
+        
+        return df
+    
+    def _format_dates(self, rng, dates, missing=None):
+        """
+        Write dates as ISO strings, with a share of them in other formats
+        """
+        values = dates.astype(str).astype(object)
+        dirty = np.flatnonzero(rng.random(len(values)) < self.dirty_fraction)
+        if len(dirty):
+            formats = rng.choice(DIRTY_DATE_FORMATS, len(dirty))
+            dirty_dates = pd.DatetimeIndex(dates[dirty])
+            for date_format in DIRTY_DATE_FORMATS:
+                selected = formats == date_format
+                values[dirty[selected]] = dirty_dates[selected].strftime(date_format)
+        if missing is not None:
+            values[missing] = None
+        return values
+    
+    def _format_costs(self, rng, costs):
+        """
+        Write a share of the unit costs as currency strings, keeping the others numeric
+        """
+        values = costs.astype(object)
+        dirty = np.flatnonzero(rng.random(len(values)) < self.dirty_fraction)
+        templates = ['${:,.2f}', '{:,.2f} USD', ' {:.2f} ', 'USD {:,.2f}']
+        for i, position in enumerate(dirty):
+            values[position] = templates[i % len(templates)].format(costs[position])
+        return values
+    
+    def write_csv(self, path, rows):
+        """
+        Write a dataset to a CSV file block by block
+        
+        Args:
+            path (str): Output file
+            rows (int): Number of rows
+            
+        Returns:
+            int: Bytes written
+        """
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            for i, chunk in enumerate(self.iter_chunks(rows)):
+                chunk.to_csv(f, index=False, header=i == 0)
+        return os.path.getsize(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic supply chain extract.')
+    parser.add_argument('output', help='CSV file to write')
+    parser.add_argument('--rows', type=int, default=1000000, help='number of rows (default: 1000000)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (default: 42)')
+    parser.add_argument('--products', type=int, default=500, help='number of distinct SKUs (default: 500)')
+    parser.add_argument('--dirty-fraction', type=float, default=0.02,
+                        help='share of currency strings and non-ISO dates (default: 0.02)')
+    args = parser.parse_args(argv)
+    
+    generator = SupplyChainDataGenerator(seed=args.seed, n_products=args.products,
+                                         dirty_fraction=args.dirty_fraction)
+    start_time = time.perf_counter()
+    size = generator.write_csv(args.output, args.rows)
+    print(f"{args.rows} rows, {size / 1024 ** 2:.1f} MB written to {args.output} "
+          f"in {time.perf_counter() - start_time:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import streamlit as st
+
+from instrumentation import traced
 
 class DataProcessor:
     """
@@ -11,7 +12,10 @@ class DataProcessor:
     def __init__(self):
         self.data = None
         self.original_data = None
+        # Values sampled to detect date columns that have no date-like name
+        self.date_sample_size = 5
     
+    @traced()
     def load_data(self, uploaded_file):
         """
         Load data from uploaded file (CSV or Excel)
@@ -23,20 +27,7 @@ class DataProcessor:
             pd.DataFrame: Processed dataframe
         """
         try:
-            # Determine file type and load accordingly
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            elif uploaded_file.name.endswith(('.xlsx', '.xls')):
-                # Try to read Excel file, handle multiple sheets
-                excel_file = pd.ExcelFile(uploaded_file)
-                if len(excel_file.sheet_names) > 1:
-                    # If multiple sheets, use the first one or let user choose
-                    sheet_name = excel_file.sheet_names[0]
-                    df = pd.read_excel(uploaded_file, sheet_name=sheet_name)
-                else:
-                    df = pd.read_excel(uploaded_file)
-            else:
-                raise ValueError("Unsupported file format")
+            df = self.read_file(uploaded_file)
             
             # Store original data
             self.original_data = df.copy()
@@ -52,6 +43,76 @@ class DataProcessor:
         except Exception as e:
             raise Exception(f"Error loading file: {str(e)}")
     
+    def read_file(self, uploaded_file):
+        """
+        Read the raw rows of an uploaded file (CSV or Excel), without cleaning them
+        
+        Args:
+            uploaded_file: Streamlit uploaded file object
+            
+        Returns:
+            pd.DataFrame: Raw dataframe
+        """
+        # Determine file type and load accordingly, whatever the case of the extension
+        name = uploaded_file.name.lower()
+        if name.endswith('.csv'):
+            return pd.read_csv(uploaded_file)
+        elif name.endswith(('.xlsx', '.xls')):
+            # Try to read Excel file, handle multiple sheets
+            excel_file = pd.ExcelFile(uploaded_file)
+            if len(excel_file.sheet_names) > 1:
+                # If multiple sheets, use the first one or let user choose
+                sheet_name = excel_file.sheet_names[0]
+                return pd.read_excel(uploaded_file, sheet_name=sheet_name)
+            else:
+                return pd.read_excel(uploaded_file)
+        else:
+            raise ValueError("Unsupported file format")
+    
+    @traced()
+    def load_database(self, source, table, filters=(), progress=None):
+        """
+        Load the filtered rows of a database table, cleaning them batch by batch
+        
+        The raw rows are never held together: each batch is cleaned as it is read and
+        only the cleaned batches are combined, with the same result as clean_data on the
+        whole selection.
+        
+        Args:
+            source (DatabaseSource): Database to read from
+            table (str): Table or view name
+            filters (tuple): ((column, values), ...) with the database column names,
+                evaluated by the database
+            progress (callable): Called with the number of rows read after each batch
+            
+        Returns:
+            pd.DataFrame: Processed dataframe
+        """
+        # ingestion imports this module
+        from ingestion import ChunkedCleaner
+        
+        try:
+            cleaner = ChunkedCleaner(self)
+            rows = 0
+            for batch in source.iter_batches(table, filters):
+                # Rows are numbered across batches, as in a file read in chunks
+                batch.index = pd.RangeIndex(rows, rows + len(batch))
+                cleaner.add(batch)
+                rows += len(batch)
+                if progress is not None:
+                    progress(rows)
+            if rows == 0:
+                raise ValueError("No rows match the filters")
+            
+            # The raw rows were not kept
+            self.original_data = None
+            self.data = cleaner.finalize()
+            return self.data
+        
+        except Exception as e:
+            raise Exception(f"Error loading table {table}: {str(e)}")
+    
+    @traced()
     def clean_data(self, df):
         """
         Clean and preprocess the dataframe
@@ -66,11 +127,10 @@ class DataProcessor:
         df_clean = df.copy()
         
         # Remove completely empty rows and columns
-        df_clean = df_clean.dropna(how='all')
-        df_clean = df_clean.dropna(axis=1, how='all')
+        df_clean = self._drop_empty(df_clean)
         
         # Standardize column names
-        df_clean.columns = df_clean.columns.str.strip().str.lower().str.replace(' ', '_')
+        df_clean.columns = self._standardize_column_names(df_clean.columns)
         
         # Detect and convert date columns
         df_clean = self._detect_and_convert_dates(df_clean)
@@ -83,10 +143,39 @@ class DataProcessor:
         
         return df_clean
     
+    @traced()
+    def _drop_empty(self, df):
+        """
+        Remove completely empty rows and columns
+        """
+        return df.dropna(how='all').dropna(axis=1, how='all')
+    
+    def _standardize_column_names(self, columns):
+        """
+        Strip, lowercase and replace spaces with underscores in column names
+        """
+        return columns.str.strip().str.lower().str.replace(' ', '_')
+    
+    @traced()
     def _detect_and_convert_dates(self, df):
         """
         Detect and convert date columns
         """
+        for col in self._detect_date_columns(df):
+            try:
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+            except:
+                pass
+        
+        return df
+    
+    def _detect_date_columns(self, df):
+        """
+        Detect date columns from their names or a sample of their values
+        
+        Returns:
+            list: Names of the columns to convert to dates
+        """
         date_columns = []
         
         for col in df.columns:
@@ -95,18 +184,13 @@ class DataProcessor:
                 continue
                 
             # Look for date-like column names
-            date_keywords = ['date', 'time', 'created', 'updated', 'delivery', 'order', 'ship']
-            if any(keyword in col.lower() for keyword in date_keywords):
-                try:
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-                    date_columns.append(col)
-                except:
-                    pass
+            if self._has_date_name(col):
+                date_columns.append(col)
             
             # Try to convert if it looks like a date
             elif df[col].dtype == 'object':
                 # Sample a few values to check if they look like dates
-                sample_values = df[col].dropna().head(5).astype(str)
+                sample_values = df[col].dropna().head(self.date_sample_size).astype(str)
                 date_like_count = 0
                 
                 for val in sample_values:
@@ -120,36 +204,53 @@ class DataProcessor:
                 
                 # If majority look like dates, convert the column
                 if date_like_count >= len(sample_values) * 0.6:
-                    try:
-                        df[col] = pd.to_datetime(df[col], errors='coerce')
-                        date_columns.append(col)
-                    except:
-                        pass
+                    date_columns.append(col)
         
-        return df
+        return date_columns
+    
+    def _has_date_name(self, col):
+        """
+        Check whether a column name suggests dates
+        """
+        date_keywords = ['date', 'time', 'created', 'updated', 'delivery', 'order', 'ship']
+        return any(keyword in col.lower() for keyword in date_keywords)
     
+    @traced()
     def _convert_numeric_columns(self, df):
         """
         Convert columns to numeric where appropriate
         """
         for col in df.columns:
             if df[col].dtype == 'object':
-                # Try to convert to numeric
-                # First, clean the column (remove currency symbols, commas, etc.)
-                cleaned_series = df[col].astype(str).str.replace(r'[^\d.-]', '', regex=True)
-                
-                # Try to convert to numeric
-                numeric_series = pd.to_numeric(cleaned_series, errors='coerce')
-                
-                # If more than 50% of non-null values are numeric, convert
-                non_null_count = df[col].notna().sum()
-                numeric_count = numeric_series.notna().sum()
-                
-                if non_null_count > 0 and (numeric_count / non_null_count) > 0.5:
+                numeric_series, non_null_count, numeric_count = self._parse_numeric(df[col])
+                if self._is_mostly_numeric(non_null_count, numeric_count):
                     df[col] = numeric_series
         
         return df
     
+    def _parse_numeric(self, series):
+        """
+        Parse a column as numbers
+        
+        Returns:
+            tuple: (numeric series, count of non-null values, count of numeric values)
+        """
+        # Try to convert to numeric
+        # First, clean the column (remove currency symbols, commas, etc.)
+        cleaned_series = series.astype(str).str.replace(r'[^\d.-]', '', regex=True)
+        
+        # Try to convert to numeric
+        numeric_series = pd.to_numeric(cleaned_series, errors='coerce')
+        
+        return numeric_series, series.notna().sum(), numeric_series.notna().sum()
+    
+    def _is_mostly_numeric(self, non_null_count, numeric_count):
+        """
+        Check whether more than 50% of the non-null values of a column are numeric
+        """
+        return non_null_count > 0 and (numeric_count / non_null_count) > 0.5
+    
+    @traced()
     def _handle_missing_values(self, df):
         """
         Handle missing values in the dataset
@@ -0,0 +1,423 @@
+import queue
+import sqlite3
+import threading
+import urllib.parse
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections, opened on demand up to a maximum count
+    """
+    
+    def __init__(self, connect, size=4, timeout=30):
+        """
+        Initialize an empty pool
+        
+        Args:
+            connect (callable): Function opening a new connection
+            size (int): Maximum number of open connections
+            timeout (float): Seconds to wait for a free connection
+        """
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection, returned to the pool when the block ends
+        
+        A batch reader closed before its last batch also returns its connection, its
+        cursor being closed first. A connection whose block raised is closed instead,
+        as its state is unknown.
+        """
+        connection = self._acquire()
+        try:
+            yield connection
+        except GeneratorExit:
+            self._release(connection)
+            raise
+        except BaseException:
+            self._discard(connection)
+            raise
+        else:
+            self._release(connection)
+    
+    def _release(self, connection):
+        try:
+            # Ends the read transaction, so the next borrower sees new rows
+            connection.rollback()
+        except Exception:
+            self._discard(connection)
+            return
+        self._idle.put(connection)
+    
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            open_new = self._opened < self.size
+            if open_new:
+                self._opened += 1
+        if open_new:
+            try:
+                return self.connect()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No database connection free after {self.timeout}s")
+    
+    def _discard(self, connection):
+        with self._lock:
+            self._opened -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+    
+    def close(self):
+        """
+        Close the idle connections
+        """
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+class DatabaseSource:
+    """
+    Reads supply chain rows from a database table in batches
+    
+    Filters use the format of KPICalculator.calculate_selection_kpis, with the database
+    column names: ((column, values), ...) where values is an inclusive (start_date,
+    end_date) day range for date columns and the accepted values otherwise. They are
+    sent as the WHERE clause of the query, so only the selected rows leave the database.
+    Day ranges are compared with ISO date strings, which matches native date columns
+    and dates stored as ISO text, as SQLite does. Day ranges of text dates in other
+    formats are applied to the rows after reading, see compares_dates().
+    """
+    
+    # SQLite pattern of text dates starting with an ISO date, which sort in date order
+    ISO_DATE_GLOB = '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+    
+    
+    # Placeholders of the DB-API parameter styles, by parameter position
+    PLACEHOLDERS = {
+        'qmark': lambda i: '?',
+        'numeric': lambda i: f":{i + 1}",
+        'named': lambda i: f":p{i}",
+        'format': lambda i: '%s',
+        'pyformat': lambda i: f"%(p{i})s"
+    }
+    
+    def __init__(self, connection, pool_size=4, batch_rows=50000, paramstyle='qmark'):
+        """
+        Initialize the source
+        
+        Args:
+            connection: SQLite database file, SQLAlchemy URL (containing '://') or
+                engine, or function opening a DB-API connection
+            pool_size (int): Maximum number of open connections
+            batch_rows (int): Rows fetched per batch
+            paramstyle (str): Parameter style of the DB-API driver, for a connection function
+        """
+        self.batch_rows = batch_rows
+        self.engine = None
+        self.pool = None
+        self.is_sqlite = False
+        
+        if isinstance(connection, str) and '://' not in connection:
+            # Read-only, so a mistyped path fails instead of creating an empty database
+            uri = f"file:{urllib.parse.quote(connection)}?mode=ro"
+            self.pool = ConnectionPool(lambda: sqlite3.connect(uri, uri=True, check_same_thread=False), pool_size)
+            self.paramstyle = sqlite3.paramstyle
+            self.is_sqlite = True
+        elif callable(connection):
+            self.pool = ConnectionPool(connection, pool_size)
+            self.paramstyle = paramstyle
+        else:
+            self.engine = self._create_engine(connection, pool_size)
+            # Bound parameters of sqlalchemy.text()
+            self.paramstyle = 'named'
+            self.is_sqlite = self.engine.dialect.name == 'sqlite'
+        
+        if self.paramstyle not in self.PLACEHOLDERS:
+            raise ValueError(f"Unsupported parameter style: {self.paramstyle}")
+    
+    @staticmethod
+    def _create_engine(connection, pool_size):
+        try:
+            import sqlalchemy
+        except ImportError as e:
+            raise ImportError("Database URLs require the sqlalchemy package") from e
+        
+        if isinstance(connection, str):
+            # The engine pools connections and checks them before reuse
+            return sqlalchemy.create_engine(connection, pool_size=pool_size, pool_pre_ping=True)
+        return connection
+    
+    def tables(self):
+        """
+        Get the tables and views of the database
+        
+        Returns:
+            list: Table names, sorted
+        """
+        if self.engine is not None:
+            import sqlalchemy
+            inspector = sqlalchemy.inspect(self.engine)
+            return sorted(inspector.get_table_names() + inspector.get_view_names())
+        
+        if self.is_sqlite:
+            sql = "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'"
+        else:
+            sql = "SELECT table_name FROM information_schema.tables WHERE table_schema NOT IN ('information_schema', 'pg_catalog')"
+        return sorted(row[0] for row in self._fetch_all(sql, []))
+    
+    def columns(self, table):
+        """
+        Get the column names of a table
+        """
+        with self._cursor(f"SELECT * FROM {self._quote_table(table)} WHERE 1 = 0", []) as (_, columns):
+            return columns
+    
+    def compares_dates(self, table, column):
+        """
+        Check whether the database compares the dates of a column in date order
+        
+        Native date columns do, and so do dates stored as ISO text. Text dates in other
+        formats, e.g. '13-Jul-2023' or '07/13/2023', compare as strings, so MIN/MAX and
+        range conditions on them would be wrong.
+        
+        Returns:
+            bool: True if the bounds and day ranges of the column can be evaluated by
+                the database
+        """
+        quoted = self._quote(column)
+        table_sql = self._quote_table(table)
+        if self.is_sqlite:
+            # SQLite has no date type, every stored value has to be ISO text
+            rows = self._fetch_all(
+                f"SELECT 1 FROM {table_sql} WHERE {quoted} IS NOT NULL AND NOT "
+                f"(typeof({quoted}) = 'text' AND {quoted} GLOB '{self.ISO_DATE_GLOB}') LIMIT 1",
+                []
+            )
+            return not rows
+        
+        rows = self._fetch_all(f"SELECT {quoted} FROM {table_sql} WHERE {quoted} IS NOT NULL LIMIT 1", [])
+        return not rows or not isinstance(rows[0][0], str)
+    
+    def date_bounds(self, table, column):
+        """
+        Get the first and last dates of a column
+        
+        Text dates the database does not compare in date order are read and parsed
+        instead.
+        
+        Returns:
+            tuple: (first, last) as pd.Timestamp, NaT when the column has no date
+        """
+        if not self.compares_dates(table, column):
+            firsts, lasts = [], []
+            for batch in self.iter_batches(table, columns=[column]):
+                dates = self._parse_dates(batch[column])
+                firsts.append(dates.min())
+                lasts.append(dates.max())
+            return pd.Series(firsts, dtype='datetime64[ns]').min(), pd.Series(lasts, dtype='datetime64[ns]').max()
+        
+        quoted = self._quote(column)
+        first, last = self._fetch_all(f"SELECT MIN({quoted}), MAX({quoted}) FROM {self._quote_table(table)}", [])[0]
+        return tuple(self._parse_dates(pd.Series([first, last])))
+    
+    def distinct_values(self, table, column, limit=50):
+        """
+        Get the distinct values of a column, for the category filters
+        
+        Returns:
+            list: Sorted non-null values, None if there are more than limit of them
+        """
+        quoted = self._quote(column)
+        rows = self._fetch_all(
+            f"SELECT DISTINCT {quoted} FROM {self._quote_table(table)} WHERE {quoted} IS NOT NULL LIMIT {int(limit) + 1}",
+            []
+        )
+        if len(rows) > limit:
+            return None
+        return sorted((row[0] for row in rows), key=str)
+    
+    def preview(self, table, rows=1000):
+        """
+        Read the first rows of a table, to choose the filter columns
+        """
+        with self._cursor(f"SELECT * FROM {self._quote_table(table)}", []) as (cursor, columns):
+            return pd.DataFrame.from_records(cursor.fetchmany(rows), columns=columns)
+    
+    def build_query(self, table, filters=(), columns=None):
+        """
+        Build the query of the filtered rows of a table
+        
+        Args:
+            table (str): Table or view name
+            filters (tuple): ((column, values), ...), values being a (start_date, end_date)
+                tuple of dates for date columns
+            columns (list): Columns to read, every column if omitted
+            
+        Returns:
+            tuple: (SQL text, parameters in the format of the parameter style)
+        """
+        selected = ', '.join(self._quote(column) for column in columns) if columns else '*'
+        sql = f"SELECT {selected} FROM {self._quote_table(table)}"
+        
+        clauses = []
+        params = []
+        placeholder = self.PLACEHOLDERS[self.paramstyle]
+        for column, values in filters:
+            quoted = self._quote(column)
+            if self._is_date_range(values):
+                start_date, end_date = values
+                end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+                clauses.append(f"{quoted} >= {placeholder(len(params))} AND {quoted} < {placeholder(len(params) + 1)}")
+                params.extend([pd.Timestamp(start_date).strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')])
+                continue
+            
+            values = list(values)
+            present = [value for value in values if not pd.isna(value)]
+            conditions = []
+            if present:
+                placeholders = ', '.join(placeholder(len(params) + i) for i in range(len(present)))
+                conditions.append(f"{quoted} IN ({placeholders})")
+                params.extend(value.item() if hasattr(value, 'item') else value for value in present)
+            if len(present) < len(values):
+                conditions.append(f"{quoted} IS NULL")
+            clauses.append(f"({' OR '.join(conditions)})" if conditions else '1 = 0')
+        
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        if self.paramstyle in ('named', 'pyformat'):
+            params = {f"p{i}": value for i, value in enumerate(params)}
+        return sql, params
+    
+    def iter_batches(self, table, filters=(), columns=None):
+        """
+        Read the filtered rows of a table batch by batch
+        
+        The connection stays borrowed until the last batch is read. Day ranges of
+        columns the database does not compare in date order are applied to each batch.
+        
+        Yields:
+            pd.DataFrame: Raw rows, at most batch_rows per batch
+        """
+        database_filters = []
+        day_ranges = []
+        for column, values in filters:
+            if self._is_date_range(values) and not self.compares_dates(table, column):
+                day_ranges.append((column, values))
+            else:
+                database_filters.append((column, values))
+        
+        read_columns = columns
+        if columns and day_ranges:
+            read_columns = list(columns) + [column for column, _ in day_ranges if column not in columns]
+        
+        sql, params = self.build_query(table, database_filters, read_columns)
+        with self._cursor(sql, params, stream=True) as (cursor, names):
+            while True:
+                rows = cursor.fetchmany(self.batch_rows)
+                if not rows:
+                    return
+                batch = pd.DataFrame.from_records(rows, columns=names)
+                if day_ranges:
+                    batch = self._filter_days(batch, day_ranges)
+                    if columns:
+                        batch = batch[list(columns)]
+                    if batch.empty:
+                        continue
+                yield batch
+    
+    def close(self):
+        """
+        Close the pooled connections
+        """
+        if self.engine is not None:
+            self.engine.dispose()
+        else:
+            self.pool.close()
+    
+    @contextmanager
+    def _cursor(self, sql, params, stream=False):
+        """
+        Run a query on a pooled connection
+        
+        Yields:
+            tuple: (object with fetchmany(), column names)
+        """
+        if self.engine is not None:
+            import sqlalchemy
+            with self.engine.connect() as connection:
+                if stream:
+                    # Server-side cursor where the driver has one, instead of buffering every row
+                    connection = connection.execution_options(stream_results=True)
+                result = connection.execute(sqlalchemy.text(sql), params or {})
+                try:
+                    yield result, list(result.keys())
+                finally:
+                    result.close()
+            return
+        
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql, params)
+                yield cursor, [description[0] for description in cursor.description]
+            finally:
+                cursor.close()
+    
+    def _fetch_all(self, sql, params):
+        with self._cursor(sql, params) as (cursor, _):
+            return cursor.fetchall()
+    
+    def _quote(self, name):
+        if self.engine is not None:
+            return self.engine.dialect.identifier_preparer.quote(name)
+        return '"' + str(name).replace('"', '""') + '"'
+    
+    def _quote_table(self, table):
+        """
+        Quote a table name, qualified by its schema if it contains a dot
+        """
+        return '.'.join(self._quote(part) for part in str(table).split('.'))
+    
+    @staticmethod
+    def _parse_dates(values):
+        return pd.to_datetime(values, errors='coerce', format='mixed')
+    
+    @classmethod
+    def _filter_days(cls, batch, day_ranges):
+        """
+        Keep the rows of a batch within inclusive day ranges
+        """
+        keep = np.ones(len(batch), dtype=bool)
+        for column, (start_date, end_date) in day_ranges:
+            days = cls._parse_dates(batch[column]).dt.normalize()
+            keep &= ((days >= pd.Timestamp(start_date)) & (days <= pd.Timestamp(end_date))).to_numpy()
+        return batch[keep].reset_index(drop=True)
+    
+    @staticmethod
+    def _is_date_range(values):
+        return (isinstance(values, tuple) and len(values) == 2 and
+                all(hasattr(value, 'year') and not isinstance(value, str) for value in values))
@@ -0,0 +1,236 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache, PendingBuilds
+
+def compact_frame(data, copy=True):
+    """
+    Build an immutable, compacted version of a processed dataframe
+    
+    Repeated strings of low-cardinality text columns are stored once per distinct value,
+    and numeric and datetime columns are read-only so in-place writes raise instead of
+    changing the data of other sessions. Object columns stay writable because pandas'
+    compiled routines (e.g. memory_usage) reject read-only object buffers. Column dtypes
+    are unchanged.
+    
+    Args:
+        data (pd.DataFrame): Processed dataframe
+        copy (bool): Copy the column arrays. Without a copy the result shares the arrays
+            of data, which must not be modified afterwards.
+        
+    Returns:
+        pd.DataFrame: Read-only dataframe
+    """
+    columns = {}
+    for column in data.columns:
+        series = data[column]
+        if isinstance(series.dtype, np.dtype):
+            values = series.to_numpy(copy=copy)
+            if values.dtype == object:
+                values = _share_repeated_values(values)
+            else:
+                values.flags.writeable = False
+            columns[column] = pd.Series(values, index=data.index, name=column, copy=False)
+        else:
+            columns[column] = series.copy()
+    
+    return pd.DataFrame(columns, index=data.index, copy=False)
+
+def _share_repeated_values(values):
+    """
+    Replace equal objects of a mostly repeated object array by references to one object
+    """
+    codes, uniques = pd.factorize(values)
+    if len(uniques) > len(values) // 2:
+        return values
+    
+    shared = values.copy()
+    present = codes >= 0
+    shared[present] = np.asarray(uniques, dtype=object)[codes[present]]
+    return shared
+
+class DatasetHandle:
+    """
+    Reference of one session to a dataset of a DatasetStore
+    
+    The dataset stays in the store while the handle is alive; it is released by
+    release() or when the handle is garbage collected with its session.
+    """
+    
+    def __init__(self, store, digest, data):
+        """
+        Initialize a handle
+        
+        Args:
+            store (DatasetStore): Store owning the dataset
+            digest (str): Content hash of the dataset
+            data (pd.DataFrame): Stored read-only dataframe
+        """
+        self.digest = digest
+        # Shallow copy: values are shared and read-only, columns a session adds stay local
+        self.data = data.copy(deep=False)
+        self._finalizer = weakref.finalize(self, store._release, digest)
+    
+    @property
+    def released(self):
+        return not self._finalizer.alive
+    
+    def release(self):
+        """
+        Drop the reference to the dataset, safe to call more than once
+        """
+        self._finalizer()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+class DatasetStore:
+    """
+    Process-wide store of processed datasets keyed by content hash
+    
+    Sessions uploading the same file share one immutable copy through reference
+    counted handles. Datasets without handles are kept for later uploads and evicted,
+    least recently used first, when the store grows past its memory budget.
+    """
+    
+    def __init__(self, max_bytes=1024 * 1024 * 1024):
+        """
+        Initialize an empty store
+        
+        Args:
+            max_bytes (int): Memory budget for the stored datasets. Referenced datasets
+                are never evicted, so the budget can be exceeded while they are in use.
+        """
+        self.max_bytes = max_bytes
+        # Entries are {'data', 'bytes', 'refs'} dicts, refs being changed with the lock held
+        self._datasets = LRUCache(maxsize=None, max_bytes=max_bytes, sizeof=lambda entry: entry['bytes'],
+                                  evictable=lambda digest, entry: entry['refs'] == 0)
+        # Re-entrant: a handle collected while the lock is held releases through it
+        self._lock = threading.RLock()
+        self._pending = PendingBuilds()
+        self.hits = 0
+        self.loads = 0
+        self.discards = 0
+    
+    def acquire(self, digest, loader):
+        """
+        Get a handle to a dataset, loading it if no session holds it yet
+        
+        If the same dataset is already being loaded by another session, waits for that
+        load instead of processing the file again.
+        
+        Args:
+            digest (str): Content hash of the uploaded file
+            loader (callable): Function returning the processed dataframe. The store takes
+                over its arrays without copying them.
+            
+        Returns:
+            DatasetHandle: Handle to the stored dataset
+        """
+        while True:
+            with self._lock:
+                entry = self._datasets.get(digest)
+                if entry is not None:
+                    entry['refs'] += 1
+                    self.hits += 1
+                    return DatasetHandle(self, digest, entry['data'])
+                future, owner = self._pending.claim(digest)
+            
+            if owner:
+                return self._load(digest, loader)
+            
+            # Another session is loading the same file, the loop then picks up its entry
+            future.result()
+    
+    def _load(self, digest, loader):
+        """
+        Run a loader, store its dataset with one reference and resolve the in-flight load
+        """
+        try:
+            data = compact_frame(loader(), copy=False)
+            size = int(data.memory_usage(index=True, deep=True).sum())
+        except Exception as e:
+            self._pending.set_exception(digest, e)
+            raise
+        
+        with self._lock:
+            self._datasets.put(digest, {'data': data, 'bytes': size, 'refs': 1})
+            self.loads += 1
+            handle = DatasetHandle(self, digest, data)
+        
+        self._pending.set_result(digest, None)
+        return handle
+    
+    def _release(self, digest):
+        """
+        Drop one reference to a dataset and evict unreferenced datasets over the budget
+        """
+        with self._lock:
+            entry = self._datasets.peek(digest)
+            if entry is None:
+                return
+            entry['refs'] -= 1
+            self._datasets.trim()
+    
+    def discard(self, digest):
+        """
+        Evict a dataset right away if no handle references it
+        
+        Returns:
+            int: Bytes of the evicted dataset, 0 if it is referenced or not stored
+        """
+        with self._lock:
+            entry = self._datasets.peek(digest)
+            if entry is None or entry['refs'] > 0:
+                return 0
+            self._datasets.pop(digest)
+            self.discards += 1
+            return entry['bytes']
+    
+    def size(self, digest):
+        """
+        Get the memory usage of a stored dataset, 0 if it is not stored
+        """
+        entry = self._datasets.peek(digest)
+        return entry['bytes'] if entry is not None else 0
+    
+    def refcount(self, digest):
+        """
+        Get the number of live handles to a dataset, 0 if it is not stored
+        """
+        with self._lock:
+            entry = self._datasets.peek(digest)
+            return entry['refs'] if entry is not None else 0
+    
+    def stats(self):
+        """
+        Get store statistics
+        
+        Returns:
+            dict: Stored and referenced datasets, memory usage, hits, loads and evictions
+        """
+        with self._lock:
+            entries = [entry for _, entry in self._datasets.items()]
+            cache_stats = self._datasets.stats()
+            return {
+                'datasets': len(entries),
+                'referenced': sum(1 for entry in entries if entry['refs'] > 0),
+                'handles': sum(entry['refs'] for entry in entries),
+                'bytes': cache_stats['bytes'],
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'loads': self.loads,
+                'evictions': cache_stats['evictions'] + self.discards
+            }
+    
+    def __contains__(self, digest):
+        return digest in self._datasets
+    
+    def __len__(self):
+        return len(self._datasets)
@@ -0,0 +1,61 @@
+import pandas as pd
+import numpy as np
+
+def lttb_indices(x, y, n_out):
+    """
+    Select points with the Largest-Triangle-Three-Buckets algorithm
+    
+    The first and last points are always kept. The points in between are split into
+    n_out - 2 buckets and, for each bucket, the point forming the largest triangle with
+    the previously selected point and the average of the next bucket is kept.
+    
+    Args:
+        x (array-like): Sorted x values (numeric or datetime)
+        y (array-like): y values, without missing values
+        n_out (int): Number of points to keep
+        
+    Returns:
+        np.ndarray: Positions of the selected points, in increasing order
+    """
+    x = _to_float(x)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # Bucket edges for the points between the first and the last one
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        
+        # Average point of the next bucket (the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    
+    return selected
+
+def _to_float(values):
+    """
+    Convert numeric or datetime values to a float array
+    """
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype=float)
+    return values.to_numpy(dtype=float)
@@ -0,0 +1,116 @@
+import io
+import tempfile
+
+from caching import LRUCache
+from instrumentation import traced
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+}
+
+def write_csv(data, stream, chunk_rows=100000):
+    """
+    Write a dataframe as CSV, one chunk of rows at a time
+    
+    Args:
+        data (pd.DataFrame): Data to export
+        stream (file): Binary stream to write to
+        chunk_rows (int): Rows converted per chunk
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='', write_through=True)
+    for start in range(0, max(len(data), 1), chunk_rows):
+        data.iloc[start:start + chunk_rows].to_csv(text, index=False, header=start == 0)
+    text.detach()
+
+def write_excel(data, stream, chunk_rows=10000, sheet_name='Data'):
+    """
+    Write a dataframe as an Excel workbook with the constant-memory openpyxl writer
+    
+    Args:
+        data (pd.DataFrame): Data to export
+        stream (file): Binary stream to write to
+        chunk_rows (int): Rows converted per chunk
+        sheet_name (str): Worksheet name
+    """
+    from openpyxl import Workbook
+    
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    worksheet.append([str(column) for column in data.columns])
+    
+    for start in range(0, len(data), chunk_rows):
+        chunk = data.iloc[start:start + chunk_rows].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            worksheet.append(row)
+    
+    workbook.save(stream)
+
+class ExportCache:
+    """
+    Builds export files on request and keeps the most recent ones within a memory budget
+    """
+    
+    def __init__(self, max_bytes=256 * 1024 * 1024, chunk_rows=100000):
+        """
+        Initialize an empty cache
+        
+        Args:
+            max_bytes (int): Memory budget for the stored files
+            chunk_rows (int): Rows converted per chunk when writing CSV files
+        """
+        self.max_bytes = max_bytes
+        self.chunk_rows = chunk_rows
+        self._files = LRUCache(maxsize=None, max_bytes=max_bytes)
+    
+    def get(self, fingerprint, filter_predicate, export_format):
+        """
+        Get a cached export file
+        
+        Returns:
+            bytes: File content, or None if it was not built yet
+        """
+        return self._files.get((fingerprint, filter_predicate, export_format))
+    
+    def get_or_build(self, data, fingerprint, filter_predicate, export_format):
+        """
+        Get a cached export file or build, store and return it
+        
+        Args:
+            data (pd.DataFrame): Data to export
+            fingerprint (str): Content hash or fingerprint of the dataset
+            filter_predicate (hashable): Active filters, empty when the data is unfiltered
+            export_format (str): 'csv' or 'xlsx'
+            
+        Returns:
+            bytes: File content
+        """
+        content = self.get(fingerprint, filter_predicate, export_format)
+        if content is None:
+            content = self.build(data, export_format)
+            self._files.put((fingerprint, filter_predicate, export_format), content)
+        return content
+    
+    @traced()
+    def build(self, data, export_format):
+        """
+        Build an export file, spooling to disk once it grows past a few megabytes
+        
+        Args:
+            data (pd.DataFrame): Data to export
+            export_format (str): 'csv' or 'xlsx'
+            
+        Returns:
+            bytes: File content
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as stream:
+            if export_format == 'csv':
+                write_csv(data, stream, self.chunk_rows)
+            else:
+                write_excel(data, stream)
+            stream.seek(0)
+            return stream.read()
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from caching import FigureCache
+from visualizations import SupplyChainVisualizations
+
+class FigureWarmup:
+    """
+    Builds the default dashboard figures in a background thread pool right after upload
+    """
+    
+    def __init__(self, figure_cache, max_workers=4):
+        """
+        Initialize with the figure cache to fill
+        
+        Args:
+            figure_cache (FigureCache): Cache receiving the built figures
+            max_workers (int): Number of background build threads
+        """
+        self.figure_cache = figure_cache
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='figure-warmup')
+    
+    def warm(self, data, fingerprint, language='en', filter_predicate=()):
+        """
+        Schedule the default figure of each chart type
+        
+        The default figures are the ones the visualization tab shows first: the first
+        numeric, date and category columns. Figures already cached or in flight are skipped.
+        
+        Args:
+            data (pd.DataFrame): Processed dataset
+            fingerprint (str): Content hash of the dataset
+            language (str): Display language
+            filter_predicate (tuple): Active filters, empty for the unfiltered upload
+            
+        Returns:
+            dict: Futures of the scheduled figures keyed by cache key
+        """
+        viz = SupplyChainVisualizations(data, cache_key=(fingerprint, filter_predicate), language=language)
+        futures = {}
+        
+        for chart_name, params, builder in self.default_figures(viz):
+            key = FigureCache.make_key(fingerprint, filter_predicate, chart_name, params, language)
+            future = self.figure_cache.prefetch(key, builder, self.executor)
+            if future is not None:
+                futures[key] = future
+        
+        return futures
+    
+    def default_figures(self, viz):
+        """
+        List the default figure of each chart type for a dataset
+        
+        Args:
+            viz (SupplyChainVisualizations): Visualizations of the dataset
+            
+        Returns:
+            list: Tuples of (chart name, parameters, builder)
+        """
+        data = viz.data
+        numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+        date_cols = data.select_dtypes(include=['datetime64']).columns.tolist()
+        categorical_cols = data.select_dtypes(include=['object', 'category']).columns.tolist()
+        
+        figures = []
+        if numeric_cols:
+            value_col = numeric_cols[0]
+            figures.append(('distribution', (value_col,),
+                            lambda: viz.create_distribution_plot(value_col)))
+            figures.append(('correlation_matrix', (), viz.create_correlation_matrix))
+            
+            if date_cols:
+                date_col = date_cols[0]
+                figures.append(('time_series', (date_col, value_col),
+                                lambda: viz.create_time_series(date_col, value_col)))
+            
+            if categorical_cols:
+                cat_col = categorical_cols[0]
+                figures.append(('category_analysis', (cat_col, value_col),
+                                lambda: viz.create_category_analysis(cat_col, value_col)))
+        
+        return figures
+    
+    def shutdown(self):
+        """
+        Stop the thread pool, cancelling builds that have not started
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,156 @@
+"""
+Import-time benchmark of the application modules
+
+Imports each module in a fresh interpreter with -X importtime and reports its
+cumulative import time, the part spent in the application's own code and optional
+packages (everything except numpy, pandas and pyarrow, which every data module needs)
+and its slowest dependencies. Fails when a module exceeds the budget or loads a
+package that is only meant to be imported once a feature needs it.
+
+Usage:
+    python import_benchmark.py [MODULE ...] [--budget-ms 300] [--runs 3] [--top 3]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Modules usable without Streamlit, by the batch CLI, the API or the ingestion workers
+DATA_MODULES = [
+    'caching', 'instrumentation', 'compute_backend', 'database_source', 'data_processor',
+    'kpi_calculator', 'recommendation_engine', 'risk_simulation', 'indexes', 'rollups', 'correlation',
+    'incremental', 'dataset_store', 'ingestion', 'exports', 'reporting', 'visualizations', 'batch_cli'
+]
+
+# Packages loaded on first use only (charts, PDF reports, Excel files, the UI)
+LAZY_PACKAGES = ['streamlit', 'plotly', 'matplotlib', 'sklearn', 'openpyxl']
+
+# Lazy packages a module needs as soon as it is imported
+ALLOWED_PACKAGES = {'visualizations': ['plotly']}
+
+# Scientific stack every data module imports, excluded from the budgeted time
+SHARED_PACKAGES = ['numpy', 'pandas', 'pyarrow']
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+def parse_importtime(output, module):
+    """
+    Extract the imports of a module from -X importtime output
+    
+    Returns:
+        list: (name, depth, cumulative microseconds) of the module and every import
+            it triggered, the module last
+    """
+    entries = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        if depth == 0 and name != module:
+            # Interpreter start-up imports, before the module's own subtree
+            entries = []
+            continue
+        entries.append((name, depth, int(cumulative)))
+        if depth == 0:
+            return entries
+    raise RuntimeError(f"{module} not found in the import time output")
+
+def measure_module(module, runs=3, cwd=None):
+    """
+    Import a module in fresh interpreters and keep the fastest run
+    
+    Args:
+        module (str): Module name
+        runs (int): Number of interpreters started
+        cwd (str): Directory the module is imported from
+        
+    Returns:
+        dict: Total and budgeted milliseconds, top-level packages imported and the
+            direct dependencies with their cumulative milliseconds
+    """
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+            cwd=cwd, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{completed.stderr.strip()[-2000:]}")
+        
+        entries = parse_importtime(completed.stderr, module)
+        total = entries[-1][2]
+        # Outermost import of each shared package, its subtree counts once
+        shared = sum(cumulative for name, _, cumulative in _outermost(entries, SHARED_PACKAGES))
+        if best is None or total < best['total_us']:
+            best = {'total_us': total, 'shared_us': shared, 'entries': entries}
+    
+    entries = best['entries']
+    return {
+        'module': module,
+        'total_ms': best['total_us'] / 1000,
+        'own_ms': (best['total_us'] - best['shared_us']) / 1000,
+        'packages': sorted({name.split('.')[0] for name, _, _ in entries}),
+        'dependencies': sorted(((name, cumulative / 1000) for name, depth, cumulative in entries if depth == 1),
+                               key=lambda item: -item[1])
+    }
+
+def _outermost(entries, packages):
+    """
+    Entries of the given packages that were not imported by another entry of them
+    """
+    # Entries are listed children first, so an entry's parent chain follows it
+    result = []
+    parents = {}
+    for name, depth, cumulative in reversed(entries):
+        parents[depth] = name
+        chain = [parents[level] for level in range(depth)]
+        top = name.split('.')[0]
+        if top in packages and not any(parent.split('.')[0] in packages for parent in chain):
+            result.append((name, depth, cumulative))
+    return result
+
+def check_module(result, budget_ms):
+    """
+    Problems of one measured module
+    
+    Returns:
+        list: Descriptions of the budget overrun and of the lazy packages imported
+    """
+    problems = []
+    if result['own_ms'] > budget_ms:
+        problems.append(f"{result['module']}: {result['own_ms']:.0f} ms over the {budget_ms:.0f} ms budget")
+    
+    allowed = ALLOWED_PACKAGES.get(result['module'], [])
+    for package in LAZY_PACKAGES:
+        if package in result['packages'] and package not in allowed:
+            problems.append(f"{result['module']}: imports {package}, which should load on first use")
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the import time of the application modules.')
+    parser.add_argument('modules', nargs='*', default=DATA_MODULES,
+                        help='modules to import (default: the data modules)')
+    parser.add_argument('--budget-ms', type=float, default=300,
+                        help='import time allowed per module, excluding numpy, pandas and pyarrow (default: 300)')
+    parser.add_argument('--runs', type=int, default=3, help='interpreters started per module, fastest kept (default: 3)')
+    parser.add_argument('--top', type=int, default=3, help='slowest direct dependencies listed (default: 3)')
+    args = parser.parse_args(argv)
+    
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    problems = []
+    print(f"{'module':<24}{'total ms':>10}{'own ms':>10}  slowest dependencies")
+    for module in args.modules:
+        result = measure_module(module, args.runs, cwd)
+        slowest = ', '.join(f"{name} {ms:.0f}" for name, ms in result['dependencies'][:args.top])
+        print(f"{module:<24}{result['total_ms']:>10.0f}{result['own_ms']:>10.0f}  {slowest}")
+        problems.extend(check_module(result, args.budget_ms))
+    
+    for problem in problems:
+        print(f"FAIL {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,406 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from caching import content_hash
+from data_processor import DataProcessor
+from indexes import DatasetIndex
+from instrumentation import traced
+from kpi_calculator import KPICalculator
+from rollups import TimeRollups
+
+SCHEMA_NAME = 'schema.json'
+
+# Key suggested for an order line, used only where it identifies every row
+DEFAULT_KEY_COLUMNS = ('product_id', 'order_date')
+
+class SchemaMismatchError(Exception):
+    """
+    Raised when a delta file does not match the schema of the stored dataset
+    """
+
+class DuplicateKeyError(Exception):
+    """
+    Raised when rows to store share a key, as they would overwrite each other
+    """
+    
+    def __init__(self, message, rows):
+        """
+        Initialize the error
+        
+        Args:
+            message (str): Error message
+            rows (pd.DataFrame): Every row sharing its key with another row, grouped by key
+        """
+        super().__init__(message)
+        self.rows = rows
+
+class AppendResult:
+    """
+    Outcome of IncrementalDataset.append
+    """
+    
+    def __init__(self, data, changed_rows, inserted, updated, base_digest, digest):
+        """
+        Initialize the result
+        
+        Args:
+            data (pd.DataFrame): Dataset after the append
+            changed_rows (np.ndarray): Positions in data of the replaced and appended rows,
+                ascending
+            inserted (int): Rows appended
+            updated (int): Rows replaced by a delta row with the same key
+            base_digest (str): Version of the stored dataset the delta was merged into
+            digest (str): Version of the stored dataset after the append
+        """
+        self.data = data
+        self.changed_rows = changed_rows
+        self.inserted = inserted
+        self.updated = updated
+        self.base_digest = base_digest
+        self.digest = digest
+
+class IncrementalDataset:
+    """
+    Cleaned dataset stored as Parquet segments, grown by appending daily delta files
+    
+    The first segment holds the initial dataset; each append writes the cleaned delta
+    as a new segment. Rows are identified by the key columns: a delta row whose key is
+    already stored replaces the stored row in place, other rows are appended. Reading
+    the segments back applies the same rule, so the stored dataset equals the one
+    updated in memory. Rows with a missing key value are always appended.
+    """
+    
+    def __init__(self, directory, processor=None, max_segments=64, compression='zstd'):
+        """
+        Open the dataset stored in a directory
+        
+        Args:
+            directory (str): Directory of the schema and segment files
+            processor (DataProcessor): Processor providing the cleaning rules
+            max_segments (int): Segments kept before they are compacted into one
+            compression (str): Parquet compression codec
+        """
+        self.directory = directory
+        self.processor = processor or DataProcessor()
+        self.max_segments = max_segments
+        self.compression = compression
+        self._lock = threading.Lock()
+    
+    @property
+    def schema_path(self):
+        return os.path.join(self.directory, SCHEMA_NAME)
+    
+    def exists(self):
+        return os.path.exists(self.schema_path)
+    
+    def schema(self):
+        """
+        Get the stored schema
+        
+        Returns:
+            dict: 'columns' ({name: dtype}), 'key_columns' and 'segments'
+        """
+        with open(self.schema_path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def digest(self):
+        """
+        Version of the stored dataset, changing with every append
+        """
+        with open(self.schema_path, 'rb') as f:
+            return content_hash(f.read())
+    
+    @traced()
+    def create(self, data, key_columns=DEFAULT_KEY_COLUMNS):
+        """
+        Store a cleaned dataset as the first version
+        
+        The key columns must identify every row: rows without a complete key are
+        allowed, rows sharing a key are refused.
+        
+        Args:
+            data (pd.DataFrame): Cleaned dataset
+            key_columns (tuple): Columns identifying a row
+            
+        Returns:
+            pd.DataFrame: Stored dataset
+        """
+        if not key_columns:
+            raise ValueError("At least one key column is required")
+        missing = [column for column in key_columns if column not in data.columns]
+        if missing:
+            raise SchemaMismatchError(f"Key columns not in the data: {', '.join(missing)}")
+        
+        data = data.reset_index(drop=True)
+        colliding = duplicate_key_rows(data, key_columns)
+        if colliding.any():
+            raise DuplicateKeyError(
+                f"{colliding.sum()} rows share their key ({', '.join(key_columns)}) with another row",
+                data[colliding].sort_values(list(key_columns), kind='stable')
+            )
+        
+        with self._lock:
+            if self.exists():
+                raise FileExistsError(f"A dataset is already stored in {self.directory}")
+            os.makedirs(self.directory, exist_ok=True)
+            
+            schema = {
+                'columns': {column: str(data[column].dtype) for column in data.columns},
+                'key_columns': list(key_columns),
+                'segments': []
+            }
+            self._write_segment(schema, data)
+            return data
+    
+    @traced()
+    def load(self):
+        """
+        Read the stored dataset
+        
+        Returns:
+            pd.DataFrame: Rows of every segment, a row replaced by the last row with its key
+        """
+        schema = self.schema()
+        segments = [pq.read_table(os.path.join(self.directory, segment['file'])).to_pandas()
+                    for segment in schema['segments']]
+        data = pd.concat(segments, ignore_index=True) if len(segments) > 1 else segments[0]
+        return self._resolve(data, schema['key_columns'])
+    
+    def append_file(self, uploaded_file, base=None, base_digest=None):
+        """
+        Append a delta file, see append()
+        """
+        return self.append(self.processor.read_file(uploaded_file), base, base_digest)
+    
+    @traced()
+    def append(self, raw, base=None, base_digest=None):
+        """
+        Clean a delta and merge it into the stored dataset
+        
+        A delta with several rows of the same key is refused, as it cannot tell which
+        one is current.
+        
+        Args:
+            raw (pd.DataFrame): Raw delta rows, with the columns of the stored dataset
+            base (pd.DataFrame): Stored dataset already in memory, read from the segments
+                if omitted
+            base_digest (str): Version of base; base is read again if it is not the
+                current version, e.g. after another session appended
+                
+        Returns:
+            AppendResult: Dataset after the append and the rows that changed
+        """
+        with self._lock:
+            schema = self.schema()
+            delta = self._clean_delta(raw, schema)
+            current_digest = self.digest()
+            if base is None or base_digest != current_digest:
+                base = self.load()
+            
+            keys = schema['key_columns']
+            colliding = duplicate_key_rows(delta, keys)
+            if colliding.any():
+                rows = delta[colliding].sort_values(keys, kind='stable')
+                # Numbered as the data rows of the file
+                rows.insert(0, 'row', rows.index + 1)
+                raise DuplicateKeyError(
+                    f"{colliding.sum()} rows of the file share their key ({', '.join(keys)}) with another row",
+                    rows.reset_index(drop=True)
+                )
+            delta = delta.reset_index(drop=True)
+            data, changed_rows, updated = self._upsert(base.reset_index(drop=True), delta, keys)
+            
+            # Integer columns become floats once a delta has missing values
+            schema['columns'] = {column: str(data[column].dtype) for column in data.columns}
+            
+            if len(schema['segments']) >= self.max_segments:
+                self._write_segment(schema, data, replace=True)
+            else:
+                self._write_segment(schema, delta)
+            
+            return AppendResult(data, changed_rows, len(delta) - updated, updated, current_digest, self.digest())
+    
+    def _clean_delta(self, raw, schema):
+        """
+        Clean delta rows with the column types of the stored dataset
+        
+        Types are not inferred again from the delta, which may be too small to tell
+        (e.g. a day without deliveries has no delivery date).
+        """
+        # The index keeps the row positions in the file
+        delta = raw.reset_index(drop=True).dropna(how='all')
+        delta.columns = self.processor._standardize_column_names(delta.columns)
+        
+        columns = schema['columns']
+        missing = [column for column in columns if column not in delta.columns]
+        unexpected = [column for column in delta.columns if column not in columns]
+        repeated = delta.columns[delta.columns.duplicated()].unique().tolist()
+        if missing or unexpected or repeated:
+            problems = []
+            if missing:
+                problems.append(f"missing columns: {', '.join(missing)}")
+            if unexpected:
+                problems.append(f"unexpected columns: {', '.join(map(str, unexpected))}")
+            if repeated:
+                problems.append(f"repeated columns: {', '.join(map(str, repeated))}")
+            raise SchemaMismatchError(f"The file does not match the stored dataset ({'; '.join(problems)})")
+        delta = delta[list(columns)]
+        
+        problems = []
+        for column, dtype in columns.items():
+            values = delta[column]
+            if dtype.startswith('datetime64'):
+                converted = values if pd.api.types.is_datetime64_any_dtype(values) else pd.to_datetime(values, errors='coerce')
+                if converted.notna().sum() <= values.notna().sum() / 2:
+                    # The format is inferred from the first value, which a small delta
+                    # may have in a rarer format
+                    converted = pd.to_datetime(values, errors='coerce', format='mixed')
+                kind = 'dates'
+            elif np.dtype(dtype).kind in 'iuf':
+                converted = values if pd.api.types.is_numeric_dtype(values) else self.processor._parse_numeric(values)[0]
+                if np.dtype(dtype).kind != 'f' and converted.notna().all() and (converted % 1 == 0).all():
+                    converted = converted.astype(dtype)
+                kind = 'numbers'
+            else:
+                delta[column] = values.astype(dtype)
+                continue
+            
+            # As when a column is first typed, more than half of its values must parse
+            non_null_count = values.notna().sum()
+            if non_null_count and converted.notna().sum() / non_null_count <= 0.5:
+                problems.append(f"{column} should hold {kind}")
+            delta[column] = converted
+        
+        if problems:
+            raise SchemaMismatchError(f"The file does not match the stored dataset ({'; '.join(problems)})")
+        return self.processor._handle_missing_values(delta)
+    
+    @staticmethod
+    def _resolve(data, keys):
+        """
+        Merge the rows sharing a key: the row takes the values of the last one, at the
+        position of the first one
+        """
+        has_key = data[keys].notna().all(axis=1).to_numpy()
+        if has_key.all() and not data.duplicated(keys).any():
+            return data
+        
+        groups = data.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+        # Rows without a complete key are never merged
+        groups[~has_key] = groups.max() + 1 + np.arange((~has_key).sum())
+        positions = pd.Series(np.arange(len(data))).groupby(groups)
+        order = np.argsort(positions.min().to_numpy(), kind='stable')
+        return data.iloc[positions.max().to_numpy()[order]].reset_index(drop=True)
+    
+    @staticmethod
+    def _upsert(base, delta, keys):
+        """
+        Replace the base rows whose key is in the delta and append the other delta rows
+        
+        Returns:
+            tuple: (merged dataframe, positions of the changed rows, number of replaced rows)
+        """
+        base_has_key = base[keys].notna().all(axis=1).to_numpy()
+        delta_has_key = delta[keys].notna().all(axis=1).to_numpy()
+        
+        targets = np.full(len(delta), -1, dtype=np.int64)
+        if base_has_key.any() and delta_has_key.any():
+            base_positions = np.flatnonzero(base_has_key)
+            base_index = pd.MultiIndex.from_frame(base.loc[base_has_key, keys])
+            found = base_index.get_indexer(pd.MultiIndex.from_frame(delta.loc[delta_has_key, keys]))
+            targets[delta_has_key] = np.where(found >= 0, base_positions[found], -1)
+        
+        replacing = targets >= 0
+        data = pd.concat([base, delta[~replacing]], ignore_index=True)
+        replaced_rows = targets[replacing]
+        if replaced_rows.size:
+            replacements = delta[replacing]
+            for column in data.columns:
+                values = replacements[column]
+                if values.dtype != data[column].dtype:
+                    data[column] = data[column].astype(np.result_type(data[column].dtype, values.dtype))
+                data.iloc[replaced_rows, data.columns.get_loc(column)] = values.to_numpy()
+        
+        appended_rows = np.arange(len(base), len(data))
+        changed_rows = np.sort(np.concatenate([replaced_rows, appended_rows]))
+        return data, changed_rows, len(replaced_rows)
+    
+    def _write_segment(self, schema, data, replace=False):
+        """
+        Write rows as a new segment and record it in the schema
+        
+        Args:
+            schema (dict): Schema to update and write
+            data (pd.DataFrame): Rows of the segment
+            replace (bool): Replace every segment, compacting the dataset into one
+        """
+        number = max((segment['number'] for segment in schema['segments']), default=0) + 1
+        name = f"segment-{number:05d}.parquet"
+        path = os.path.join(self.directory, name)
+        
+        # Written under a temporary name, so a failed write leaves no partial segment
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        pq.write_table(pa.Table.from_pandas(data, preserve_index=False), temp_path, compression=self.compression)
+        os.replace(temp_path, path)
+        
+        if replace:
+            schema['segments'] = []
+        schema['segments'].append({
+            'number': number,
+            'file': name,
+            'rows': len(data),
+            'written_at': datetime.now().isoformat(timespec='seconds')
+        })
+        self._write_schema(schema)
+        
+        # Segments merged by a compaction are no longer listed
+        listed = {segment['file'] for segment in schema['segments']}
+        for name in os.listdir(self.directory):
+            if name.startswith('segment-') and name not in listed:
+                os.remove(os.path.join(self.directory, name))
+    
+    def _write_schema(self, schema):
+        temp_path = f"{self.schema_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(schema, f, indent=2)
+        os.replace(temp_path, self.schema_path)
+
+def duplicate_key_rows(data, key_columns):
+    """
+    Find the rows sharing a key with another row
+    
+    Args:
+        data (pd.DataFrame): Rows to check
+        key_columns (list): Columns identifying a row; rows with a missing key value
+            never share their key
+        
+    Returns:
+        np.ndarray: Boolean mask of the rows sharing their key
+    """
+    keys = list(key_columns)
+    has_key = data[keys].notna().all(axis=1)
+    return (has_key & data.duplicated(keys, keep=False)).to_numpy()
+
+def carry_over_caches(cache_key, new_key, data, changed_rows):
+    """
+    Cache the KPI measures, partial sums, rollups and indexes of an appended dataset,
+    updated from those of the dataset it was appended to
+    
+    Args:
+        cache_key (hashable): Key of the dataset before the append
+        new_key (hashable): Key of the dataset after the append
+        data (pd.DataFrame): Dataset after the append
+        changed_rows (np.ndarray): Positions of the replaced and appended rows
+    """
+    KPICalculator.carry_over(cache_key, new_key, data, changed_rows)
+    DatasetIndex.carry_over(cache_key, new_key, data, changed_rows)
+    TimeRollups.carry_over(cache_key, new_key, data, changed_rows)
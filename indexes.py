@@ -0,0 +1,316 @@
+import pandas as pd
+import numpy as np
+
+from caching import LRUCache
+
+# Indexes per dataset key
+_INDEX_CACHE = LRUCache(maxsize=8)
+
+class SortedDateIndex:
+    """
+    Row positions of a datetime column sorted by date, for range lookups with binary search
+    """
+    
+    def __init__(self, values):
+        """
+        Build the index
+        
+        Args:
+            values (pd.Series): Datetime column. Timezone-aware values are indexed on
+                their local wall-clock time, missing values are left out.
+        """
+        if getattr(values.dt, 'tz', None) is not None:
+            values = values.dt.tz_localize(None)
+        
+        present = values.notna().to_numpy()
+        nanoseconds = values.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        
+        rows = np.flatnonzero(present)
+        order = np.argsort(nanoseconds[rows], kind='stable')
+        self.rows = rows[order]
+        self.values = nanoseconds[self.rows]
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def min_date(self):
+        """
+        Earliest date, None if the column has no dates
+        """
+        return pd.Timestamp(self.values[0]).date() if len(self.values) else None
+    
+    def max_date(self):
+        """
+        Latest date, None if the column has no dates
+        """
+        return pd.Timestamp(self.values[-1]).date() if len(self.values) else None
+    
+    def range_rows(self, start_date, end_date):
+        """
+        Get the rows dated within an inclusive range of days
+        
+        Args:
+            start_date (datetime.date): First day of the range
+            end_date (datetime.date): Last day of the range, included entirely
+            
+        Returns:
+            np.ndarray: Row positions in ascending order
+        """
+        start = pd.Timestamp(start_date).value
+        end = (pd.Timestamp(end_date) + pd.Timedelta(days=1)).value
+        
+        first, last = np.searchsorted(self.values, [start, end], side='left')
+        return np.sort(self.rows[first:last])
+    
+    def appended(self, values, changed_rows):
+        """
+        Get the index of the column after an append, inserting the changed rows only
+        
+        Args:
+            values (pd.Series): Datetime column after the append
+            changed_rows (np.ndarray): Positions of the replaced and appended rows
+            
+        Returns:
+            SortedDateIndex: Index of values
+        """
+        if getattr(values.dt, 'tz', None) is not None:
+            values = values.dt.tz_localize(None)
+        
+        changed = np.zeros(len(values), dtype=bool)
+        changed[changed_rows] = True
+        kept = ~changed[self.rows]
+        
+        new_values = values.iloc[changed_rows]
+        present = new_values.notna().to_numpy()
+        nanoseconds = new_values.to_numpy(dtype='datetime64[ns]').view(np.int64)[present]
+        order = np.argsort(nanoseconds, kind='stable')
+        
+        index = SortedDateIndex.__new__(SortedDateIndex)
+        index.values = self.values[kept]
+        positions = np.searchsorted(index.values, nanoseconds[order], side='right')
+        index.rows = np.insert(self.rows[kept], positions, np.asarray(changed_rows)[present][order])
+        index.values = np.insert(index.values, positions, nanoseconds[order])
+        return index
+
+class BitmapIndex:
+    """
+    One packed bitset of matching rows per distinct value of a low-cardinality column
+    """
+    
+    def __init__(self, values):
+        """
+        Build the index
+        
+        Args:
+            values (pd.Series): Column values, missing values match no bitset
+        """
+        codes, uniques = pd.factorize(values)
+        self.n_rows = len(values)
+        self.values = list(uniques)
+        self.positions = {value: i for i, value in enumerate(self.values)}
+        self.bitsets = np.empty((len(self.values), (self.n_rows + 7) // 8), dtype=np.uint8)
+        for i in range(len(self.values)):
+            self.bitsets[i] = np.packbits(codes == i)
+    
+    def __len__(self):
+        return len(self.values)
+    
+    def union(self, selected_values):
+        """
+        Get the rows matching any of the selected values
+        
+        Args:
+            selected_values (list): Values to match
+            
+        Returns:
+            np.ndarray: Packed bitset of rows
+        """
+        selected = [self.positions[value] for value in selected_values if value in self.positions]
+        if not selected:
+            return np.zeros(self.bitsets.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self.bitsets[selected], axis=0)
+    
+    def present_values(self, bitset):
+        """
+        Get the distinct values occurring in a set of rows
+        
+        Args:
+            bitset (np.ndarray): Packed bitset of rows
+            
+        Returns:
+            list: Values in order of first appearance in the dataset
+        """
+        present = (self.bitsets & bitset).any(axis=1)
+        return [value for value, is_present in zip(self.values, present) if is_present]
+    
+    def appended(self, values, changed_rows):
+        """
+        Get the index of the column after an append, setting the bits of the changed rows only
+        
+        Args:
+            values (pd.Series): Column after the append
+            changed_rows (np.ndarray): Positions of the replaced and appended rows
+            
+        Returns:
+            BitmapIndex: Index of values, new values added after the existing ones
+        """
+        changed_rows = np.asarray(changed_rows, dtype=np.int64)
+        changed_values = values.iloc[changed_rows]
+        
+        index = BitmapIndex.__new__(BitmapIndex)
+        index.n_rows = len(values)
+        index.values = self.values + [value for value in pd.unique(changed_values.dropna())
+                                      if value not in self.positions]
+        index.positions = {value: i for i, value in enumerate(index.values)}
+        index.bitsets = np.zeros((len(index.values), (index.n_rows + 7) // 8), dtype=np.uint8)
+        index.bitsets[:len(self.values), :self.bitsets.shape[1]] = self.bitsets
+        
+        # Clear the bits of the changed rows, then set the bit of their new value
+        changed = np.zeros(index.n_rows, dtype=bool)
+        changed[changed_rows] = True
+        index.bitsets &= ~np.packbits(changed)
+        
+        codes = pd.Index(index.values).get_indexer(changed_values)
+        valid = codes >= 0
+        rows = changed_rows[valid]
+        np.bitwise_or.at(index.bitsets, (codes[valid], rows >> 3), (0x80 >> (rows & 7)).astype(np.uint8))
+        return index
+
+class DatasetIndex:
+    """
+    Lazily built indexes of one dataset, reused across reruns for the same data
+    """
+    
+    def __init__(self, data, max_cardinality=50):
+        """
+        Initialize with supply chain data
+        
+        Args:
+            data (pd.DataFrame): Supply chain dataset
+            max_cardinality (int): Columns with more distinct values get no bitmap index
+        """
+        self.data = data
+        self.max_cardinality = max_cardinality
+        self.date_indexes = {}
+        self.bitmap_indexes = {}
+    
+    @classmethod
+    def for_data(cls, data, cache_key):
+        """
+        Get the index of a dataset, reusing the cached index for the same data
+        
+        Args:
+            data (pd.DataFrame): Supply chain dataset
+            cache_key (hashable): Identifies the dataset content
+            
+        Returns:
+            DatasetIndex: Index of data
+        """
+        index = _INDEX_CACHE.get(cache_key)
+        if index is None:
+            index = cls(data)
+            _INDEX_CACHE.put(cache_key, index)
+        return index
+    
+    @classmethod
+    def carry_over(cls, cache_key, new_key, data, changed_rows):
+        """
+        Cache the index of an appended dataset, updating the indexes already built for
+        the dataset it was appended to
+        
+        Args:
+            cache_key (hashable): Key of the previous dataset
+            new_key (hashable): Key of the appended dataset
+            data (pd.DataFrame): Rows of the previous dataset, some of them replaced,
+                followed by the appended rows
+            changed_rows (np.ndarray): Positions of the replaced and appended rows
+        """
+        previous = _INDEX_CACHE.get(cache_key)
+        if previous is None:
+            return
+        
+        index = cls(data, previous.max_cardinality)
+        for column, date_index in previous.date_indexes.items():
+            index.date_indexes[column] = date_index.appended(data[column], changed_rows)
+        for column, bitmap_index in previous.bitmap_indexes.items():
+            if bitmap_index is not None:
+                bitmap_index = bitmap_index.appended(data[column], changed_rows)
+                if len(bitmap_index) > index.max_cardinality:
+                    bitmap_index = None
+            index.bitmap_indexes[column] = bitmap_index
+        _INDEX_CACHE.put(new_key, index)
+    
+    @classmethod
+    def discard(cls, cache_key):
+        """
+        Drop the cached index of a dataset
+        """
+        _INDEX_CACHE.pop(cache_key)
+    
+    def date_index(self, date_column):
+        """
+        Get the sorted index of a datetime column, building it on first use
+        
+        Args:
+            date_column (str): Datetime column name
+            
+        Returns:
+            SortedDateIndex: Index of the column
+        """
+        if date_column not in self.date_indexes:
+            self.date_indexes[date_column] = SortedDateIndex(self.data[date_column])
+        return self.date_indexes[date_column]
+    
+    def build_bitmap_indexes(self, columns=None):
+        """
+        Build the bitmap indexes of categorical columns
+        
+        Args:
+            columns (list): Columns to index, all object and category columns if omitted
+            
+        Returns:
+            dict: {column: BitmapIndex}, None for columns above max_cardinality
+        """
+        if columns is None:
+            columns = self.data.select_dtypes(include=['object', 'category']).columns.tolist()
+        for column in columns:
+            self.bitmap_index(column)
+        return self.bitmap_indexes
+    
+    def bitmap_index(self, column):
+        """
+        Get the bitmap index of a categorical column, building it on first use
+        
+        Args:
+            column (str): Column name
+            
+        Returns:
+            BitmapIndex: Index of the column, None if it has more than max_cardinality values
+        """
+        if column not in self.bitmap_indexes:
+            values = self.data[column]
+            index = None
+            if values.nunique() <= self.max_cardinality:
+                index = BitmapIndex(values)
+            self.bitmap_indexes[column] = index
+        return self.bitmap_indexes[column]
+    
+    def full_bitset(self):
+        """
+        Packed bitset selecting every row of the dataset
+        """
+        return np.packbits(np.ones(len(self.data), dtype=bool))
+    
+    def rows_to_bitset(self, rows):
+        """
+        Convert row positions to a packed bitset
+        """
+        mask = np.zeros(len(self.data), dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+    
+    def bitset_rows(self, bitset):
+        """
+        Convert a packed bitset to row positions in ascending order
+        """
+        return np.flatnonzero(np.unpackbits(bitset, count=len(self.data)))
@@ -0,0 +1,405 @@
+import contextvars
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from data_processor import DataProcessor
+from instrumentation import traced
+from kpi_calculator import RunningKPIs
+
+class IngestionCancelled(Exception):
+    """
+    Raised by IngestionJob.result when the job was cancelled
+    """
+
+class ChunkedCleaningError(Exception):
+    """
+    Raised when a chunk cannot be cleaned the way the whole file would be
+    """
+
+class ChunkedCleaner:
+    """
+    Applies DataProcessor.clean_data to a file read in chunks
+    
+    Rows are cleaned chunk by chunk. Columns with a date-like name are converted to dates
+    from the first chunk; other columns once their first values have been seen, as the
+    whole file would be sampled. Date formats are guessed once from the first value, as
+    pandas does for a whole column. Which columns are empty, mostly numeric or filled
+    with 'Unknown' depends on the whole file, so those steps are decided from per-chunk
+    counts when the chunks are combined.
+    """
+    
+    def __init__(self, processor=None):
+        """
+        Initialize an empty cleaner
+        
+        Args:
+            processor (DataProcessor): Processor providing the cleaning rules
+        """
+        self.processor = processor or DataProcessor()
+        self.date_columns = None
+        self._date_samples = {}
+        self._date_formats = {}
+        self._chunks = []
+        self._numeric = {}
+        self._counts = {}
+    
+    @traced()
+    def add(self, chunk):
+        """
+        Clean one chunk of raw rows
+        
+        Args:
+            chunk (pd.DataFrame): Raw rows
+            
+        Returns:
+            pd.DataFrame: Cleaned rows, with the text columns that are mostly numeric so
+                far parsed as numbers, as a preview of the final result
+        """
+        # Make a copy to avoid modifying the raw chunk
+        chunk = chunk.dropna(how='all').copy()
+        chunk.columns = self.processor._standardize_column_names(chunk.columns)
+        
+        if self.date_columns is None:
+            self._start_date_detection(chunk)
+        for col in self.date_columns:
+            self._convert_dates(chunk, col)
+        
+        position = len(self._chunks)
+        self._chunks.append(chunk)
+        self._sample_dates(chunk)
+        
+        preview = {}
+        for col in chunk.columns:
+            if chunk[col].dtype == 'object':
+                numeric_series, non_null_count, numeric_count = self.processor._parse_numeric(chunk[col])
+                self._numeric.setdefault(col, {})[position] = numeric_series
+                counts = self._counts.setdefault(col, [0, 0])
+                counts[0] += non_null_count
+                counts[1] += numeric_count
+                if self.processor._is_mostly_numeric(*counts):
+                    preview[col] = numeric_series
+        
+        return chunk.assign(**preview) if preview else chunk
+    
+    def _start_date_detection(self, chunk):
+        """
+        Select the date columns known from the first chunk and the columns to sample
+        """
+        self.date_columns = []
+        for col in chunk.columns:
+            if chunk[col].dtype == 'datetime64[ns]':
+                continue
+            if self.processor._has_date_name(col):
+                self.date_columns.append(col)
+            else:
+                self._date_samples[col] = []
+    
+    def _sample_dates(self, chunk, final=False):
+        """
+        Collect the first values of the columns not yet classified and decide, once
+        enough values are known, whether they hold dates
+        """
+        size = self.processor.date_sample_size
+        for col, parts in list(self._date_samples.items()):
+            if chunk is not None:
+                parts.append(chunk[col].dropna().head(size - sum(len(part) for part in parts)))
+            if not final and sum(len(part) for part in parts) < size:
+                continue
+            
+            del self._date_samples[col]
+            sample = pd.concat(parts).to_frame(col)
+            if self.processor._detect_date_columns(sample):
+                self.date_columns.append(col)
+                # The chunks added so far were kept as they were read
+                for previous in self._chunks:
+                    self._convert_dates(previous, col)
+    
+    def _convert_dates(self, chunk, col):
+        try:
+            chunk[col] = pd.to_datetime(chunk[col], errors='coerce', format=self._date_format(chunk[col]))
+        except Exception as e:
+            raise ChunkedCleaningError(f"Column {col} cannot be converted to dates: {e}")
+    
+    def _date_format(self, series):
+        """
+        Format used to parse a date column, guessed from its first non-null value
+        
+        'mixed' parses every value on its own, which is what pandas does when the first
+        value of a whole column has no recognizable format.
+        """
+        if series.name not in self._date_formats:
+            values = series.dropna()
+            if values.empty:
+                return None
+            first = values.iloc[0]
+            date_format = None
+            if isinstance(first, str):
+                date_format = guess_datetime_format(first) or 'mixed'
+            self._date_formats[series.name] = date_format
+        return self._date_formats[series.name]
+    
+    @traced()
+    def finalize(self):
+        """
+        Combine the cleaned chunks
+        
+        Returns:
+            pd.DataFrame: Same result as DataProcessor.clean_data on the whole file
+        """
+        # Columns with fewer values than the sample size are classified from all of them
+        self._sample_dates(None, final=True)
+        chunks, self._chunks = self._chunks, []
+        
+        # Remove completely empty columns, copying so the columns can be replaced below
+        df = pd.concat(chunks).dropna(axis=1, how='all').copy()
+        
+        for col in df.columns:
+            if df[col].dtype != 'object':
+                continue
+            
+            # Chunks where the column was not text (e.g. only missing values) are parsed now
+            parts = []
+            non_null_total = numeric_total = 0
+            for position, chunk in enumerate(chunks):
+                numeric_series = self._numeric.get(col, {}).get(position)
+                if numeric_series is None:
+                    numeric_series, non_null_count, numeric_count = self.processor._parse_numeric(chunk[col])
+                else:
+                    non_null_count = chunk[col].notna().sum()
+                    numeric_count = numeric_series.notna().sum()
+                parts.append(numeric_series)
+                non_null_total += non_null_count
+                numeric_total += numeric_count
+            
+            if self.processor._is_mostly_numeric(non_null_total, numeric_total):
+                df[col] = pd.concat(parts) if len(parts) > 1 else parts[0]
+        
+        self._numeric = {}
+        self._counts = {}
+        return self.processor._handle_missing_values(df)
+
+class IngestionJob:
+    """
+    Loads an uploaded file in chunks, publishing progress and a preliminary KPI snapshot
+    """
+    
+    def __init__(self, name, content, digest, chunk_rows=50000):
+        """
+        Initialize a job
+        
+        Args:
+            name (str): File name, its extension selects the reader
+            content (bytes): File content
+            digest (str): Content hash of the file
+            chunk_rows (int): Rows parsed and cleaned per chunk
+        """
+        self.name = name
+        self.digest = digest
+        self.chunk_rows = chunk_rows
+        self.waiters = 0
+        self._content = content
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._start_time = None
+        self._result = None
+        self._error = None
+        self._progress = {
+            'stage': 'queued',
+            'rows': 0,
+            'bytes_read': 0,
+            'total_bytes': len(content),
+            'fraction': 0.0,
+            'elapsed': 0.0,
+            'rows_per_second': 0.0,
+            'kpis': {}
+        }
+    
+    def run(self):
+        """
+        Run the job, normally in a background thread
+        """
+        self._start_time = time.perf_counter()
+        try:
+            self._check_cancelled()
+            self._result = self._ingest()
+            self._update(stage='done', fraction=1.0)
+        except IngestionCancelled as e:
+            self._error = e
+            self._update(stage='cancelled')
+        except Exception as e:
+            self._error = Exception(f"Error loading file: {str(e)}")
+            self._update(stage='failed')
+        finally:
+            self._content = None
+            self._done.set()
+    
+    @traced()
+    def _ingest(self):
+        """
+        Parse and clean the file chunk by chunk
+        """
+        cleaner = ChunkedCleaner()
+        running = RunningKPIs()
+        stream = io.BytesIO(self._content)
+        total_bytes = len(self._content)
+        
+        try:
+            name = self.name.lower()
+            if name.endswith('.csv'):
+                chunks = pd.read_csv(stream, chunksize=self.chunk_rows)
+                stage = 'parsing'
+            elif name.endswith(('.xlsx', '.xls')):
+                # Excel files cannot be parsed in chunks, their rows are cleaned in chunks
+                self._update(stage='reading')
+                df = pd.read_excel(stream)
+                chunks = (df.iloc[start:start + self.chunk_rows] for start in range(0, len(df), self.chunk_rows))
+                stage = 'cleaning'
+            else:
+                raise ValueError("Unsupported file format")
+            
+            rows = 0
+            for chunk in chunks:
+                self._check_cancelled()
+                running.add(cleaner.add(chunk))
+                rows += len(chunk)
+                if stage == 'parsing':
+                    fraction = stream.tell() / total_bytes if total_bytes else 1.0
+                else:
+                    fraction = rows / len(df)
+                self._update(stage=stage, rows=rows, bytes_read=stream.tell(),
+                             fraction=0.9 * fraction, kpis=running.kpis())
+            
+            self._check_cancelled()
+            self._update(stage='finalizing', fraction=0.9)
+            return cleaner.finalize()
+        
+        except ChunkedCleaningError:
+            # Columns whose chunks disagree are cleaned the same way as a regular upload
+            self._check_cancelled()
+            self._update(stage='reading', fraction=0.0)
+            stream = io.BytesIO(self._content)
+            stream.name = self.name
+            return DataProcessor().load_data(stream)
+    
+    def _check_cancelled(self):
+        if self._cancel.is_set():
+            raise IngestionCancelled(f"Processing of {self.name} was cancelled")
+    
+    def _update(self, **progress):
+        with self._lock:
+            self._progress.update(progress)
+            if self._start_time is not None:
+                elapsed = time.perf_counter() - self._start_time
+                self._progress['elapsed'] = elapsed
+                self._progress['rows_per_second'] = self._progress['rows'] / elapsed if elapsed > 0 else 0.0
+    
+    def progress(self):
+        """
+        Get the current progress
+        
+        Returns:
+            dict: Stage, rows parsed, bytes read, completed fraction, elapsed seconds,
+                throughput and the KPIs of the rows cleaned so far
+        """
+        with self._lock:
+            return dict(self._progress)
+    
+    def cancel(self):
+        """
+        Stop the job before its next chunk
+        """
+        self._cancel.set()
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    def done(self):
+        return self._done.is_set()
+    
+    def wait(self, timeout=None):
+        """
+        Wait for the job to finish
+        
+        Returns:
+            bool: True if the job finished within the timeout
+        """
+        return self._done.wait(timeout)
+    
+    def result(self, timeout=None):
+        """
+        Get the processed dataframe, waiting for the job to finish
+        
+        Returns:
+            pd.DataFrame: Cleaned data
+            
+        Raises:
+            IngestionCancelled: If the job was cancelled
+            Exception: If the file could not be loaded
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Processing of {self.name} is still running")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+class IngestionManager:
+    """
+    Runs ingestion jobs in a thread pool, sharing the job of a file between sessions
+    """
+    
+    def __init__(self, max_workers=2, chunk_rows=50000):
+        """
+        Initialize the manager
+        
+        Args:
+            max_workers (int): Number of files processed at once
+            chunk_rows (int): Rows parsed and cleaned per chunk
+        """
+        self.chunk_rows = chunk_rows
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingestion')
+        self._jobs = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, name, content, digest):
+        """
+        Start processing a file, or join the job already processing the same content
+        
+        Args:
+            name (str): File name
+            content (bytes): File content
+            digest (str): Content hash of the file
+            
+        Returns:
+            IngestionJob: Job to wait on, to release when no longer needed
+        """
+        with self._lock:
+            job = self._jobs.get(digest)
+            if job is None or job.cancelled:
+                job = IngestionJob(name, content, digest, self.chunk_rows)
+                self._jobs[digest] = job
+                # The job runs in the context of the submitting session, e.g. its span collector
+                future = self.executor.submit(contextvars.copy_context().run, job.run)
+                future.add_done_callback(lambda _: self._forget(job))
+            job.waiters += 1
+        return job
+    
+    def release(self, job):
+        """
+        Stop waiting for a job, cancelling it if no other session waits for it
+        """
+        with self._lock:
+            job.waiters -= 1
+            if job.waiters <= 0 and not job.done():
+                job.cancel()
+    
+    def _forget(self, job):
+        with self._lock:
+            if self._jobs.get(job.digest) is job:
+                del self._jobs[job.digest]
@@ -0,0 +1,242 @@
+import contextvars
+import functools
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Innermost open span of the current thread or task, and the list collecting its spans
+_current_span = contextvars.ContextVar('current_span', default=None)
+_collector = contextvars.ContextVar('span_collector', default=None)
+
+def frame_bytes(data):
+    """
+    Shallow memory usage of a dataframe, 0 for anything else
+    
+    Object columns count their pointers only, so this stays cheap on large frames.
+    """
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(index=True, deep=False).sum())
+    return 0
+
+class Span:
+    """
+    One timed stage: wall time, rows processed and dataframe memory delta
+    """
+    
+    def __init__(self, name, data=None, parent=None):
+        """
+        Initialize a span
+        
+        Args:
+            name (str): Stage name
+            data (pd.DataFrame): Frame the stage works on, gives the rows and the memory
+                before the stage
+            parent (Span): Enclosing span
+        """
+        self.name = name
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.rows = len(data) if isinstance(data, pd.DataFrame) else None
+        self.memory_before = frame_bytes(data)
+        self.data = data
+        self.started_at = datetime.now(timezone.utc)
+        self.seconds = None
+        self.error = None
+        self._start_time = time.perf_counter()
+    
+    def set_result(self, data):
+        """
+        Set the frame the stage produced, measured instead of the input frame at the end
+        """
+        self.data = data
+        if isinstance(data, pd.DataFrame) and self.rows is None:
+            self.rows = len(data)
+    
+    def finish(self, error=None):
+        self.seconds = time.perf_counter() - self._start_time
+        self.error = type(error).__name__ if error is not None else None
+        memory_after = frame_bytes(self.data)
+        self.data = None
+        
+        return {
+            'name': self.name,
+            'parent': self.parent.name if self.parent is not None else None,
+            'depth': self.depth,
+            'started_at': self.started_at.isoformat(timespec='milliseconds'),
+            'seconds': round(self.seconds, 6),
+            'rows': self.rows,
+            'memory_delta_bytes': memory_after - self.memory_before,
+            'thread': threading.current_thread().name,
+            'error': self.error
+        }
+
+class SpanRecorder:
+    """
+    Records the spans of every stage of the pipeline
+    
+    Recent spans are kept for the whole process. A script run or request can also
+    collect its own spans, including those of nested stages, with collect().
+    """
+    
+    def __init__(self, max_spans=10000, enabled=True):
+        """
+        Initialize the recorder
+        
+        Args:
+            max_spans (int): Number of recent spans kept for the process
+            enabled (bool): Record spans; when disabled, traced functions run untouched
+        """
+        self.enabled = enabled
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+    
+    def span(self, name, data=None):
+        """
+        Time a block of code
+        
+        Args:
+            name (str): Stage name
+            data (pd.DataFrame): Frame the stage works on
+            
+        Returns:
+            context manager: Yields the open Span, or None when recording is disabled
+        """
+        return _SpanContext(self, name, data)
+    
+    def traced(self, name=None):
+        """
+        Decorator recording a span around every call of a function or method
+        
+        The frame of the span is the first dataframe argument, else the 'data'
+        attribute of the instance. A dataframe returned by the call is measured as the
+        result of the stage.
+        
+        Args:
+            name (str): Stage name, the function's qualified name if omitted
+        """
+        def decorator(function):
+            span_name = name or function.__qualname__
+            
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                
+                data = next((arg for arg in args if isinstance(arg, pd.DataFrame)), None)
+                if data is None and args:
+                    data = getattr(args[0], 'data', None)
+                
+                with self.span(span_name, data) as span:
+                    result = function(*args, **kwargs)
+                    if isinstance(result, pd.DataFrame):
+                        span.set_result(result)
+                    return result
+            
+            return wrapper
+        return decorator
+    
+    def collect(self):
+        """
+        Collect the spans recorded in the current context, e.g. one Streamlit script run
+        
+        Returns:
+            context manager: Yields the list the spans are appended to
+        """
+        return _CollectContext()
+    
+    def _record(self, record):
+        with self._lock:
+            self._spans.append(record)
+        collected = _collector.get()
+        if collected is not None:
+            collected.append(record)
+    
+    def spans(self):
+        """
+        Get the recent spans of the process, oldest first
+        
+        Returns:
+            list: Span records
+        """
+        with self._lock:
+            return list(self._spans)
+    
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+    
+    @staticmethod
+    def to_jsonl(spans):
+        """
+        Format span records as JSON lines
+        
+        Returns:
+            str: One JSON object per line
+        """
+        return ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in spans)
+    
+    @staticmethod
+    def summarize(spans):
+        """
+        Aggregate span records per stage
+        
+        Returns:
+            pd.DataFrame: Calls, total and maximum seconds, rows and memory delta per
+                stage, slowest stages first
+        """
+        columns = ['name', 'calls', 'total_seconds', 'max_seconds', 'rows', 'memory_delta_mb', 'errors']
+        if not spans:
+            return pd.DataFrame(columns=columns)
+        
+        df = pd.DataFrame(spans)
+        summary = df.groupby('name', sort=False).agg(
+            calls=('seconds', 'size'),
+            total_seconds=('seconds', 'sum'),
+            max_seconds=('seconds', 'max'),
+            rows=('rows', 'max'),
+            memory_delta_mb=('memory_delta_bytes', 'sum'),
+            errors=('error', 'count')
+        ).reset_index()
+        summary['memory_delta_mb'] = summary['memory_delta_mb'] / 1024 ** 2
+        return summary.sort_values('total_seconds', ascending=False)[columns]
+
+class _SpanContext:
+    def __init__(self, recorder, name, data):
+        self.recorder = recorder
+        self.name = name
+        self.data = data
+        self.span = None
+        self.token = None
+    
+    def __enter__(self):
+        if not self.recorder.enabled:
+            return None
+        self.span = Span(self.name, self.data, _current_span.get())
+        self.data = None
+        self.token = _current_span.set(self.span)
+        return self.span
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.span is not None:
+            _current_span.reset(self.token)
+            self.recorder._record(self.span.finish(exc_value))
+        return False
+
+class _CollectContext:
+    def __enter__(self):
+        self.spans = []
+        self.token = _collector.set(self.spans)
+        return self.spans
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        _collector.reset(self.token)
+        return False
+
+# Process-wide recorder used by the pipeline modules
+RECORDER = SpanRecorder()
+span = RECORDER.span
+traced = RECORDER.traced
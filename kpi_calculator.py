@@ -1,10 +1,28 @@
+import copy
+import threading
+
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from caching import LRUCache
+from compute_backend import create_backend, resolve_backend
+from instrumentation import span, traced
+
+# KPI calculators per dataset key, keeping their measures and partial sums across reruns.
+# Evicted calculators close their compute backends, whose table copies are outside any budget
+_CALCULATOR_CACHE = LRUCache(maxsize=8, on_evict=lambda key, calculator: calculator.close_backends())
+
+# Prefix of the measure columns in compute backend tables, apart from the dimension columns
+MEASURE_PREFIX = 'measure__'
+
 class KPICalculator:
     """
     Calculates key performance indicators for supply chain analysis
+    
+    Every KPI is derived from additive per-row measures (sums, counts and shifted
+    moments), so the KPIs of any row selection can be computed from the measure
+    totals of that selection.
     """
     
     def __init__(self, data):
@@ -12,11 +30,67 @@ class KPICalculator:
         Initialize with supply chain data
         
         Args:
-            data (pd.DataFrame): Supply chain dataset
+            data (pd.DataFrame): Supply chain dataset. It is referenced, not copied, and
+                must not be modified while the calculator is in use
         """
-        self.data = data.copy()
+        # Calculators are cached per dataset, a copy would sit outside the dataset store
+        self.data = data
         self.kpis = {}
+        self._measures = None
+        self._measure_errors = {}
+        self._shifts = {}
+        self._partial_sums = {}
+        self._selection_kpis = LRUCache(maxsize=32)
+        self._backends = {}
+        self._lock = threading.RLock()
     
+    @classmethod
+    def for_data(cls, data, cache_key):
+        """
+        Get the calculator of a dataset, reusing the cached calculator for the same data
+        
+        Args:
+            data (pd.DataFrame): Supply chain dataset
+            cache_key (hashable): Identifies the dataset content
+            
+        Returns:
+            KPICalculator: Calculator of data
+        """
+        calculator = _CALCULATOR_CACHE.get(cache_key)
+        if calculator is None:
+            calculator = cls(data)
+            _CALCULATOR_CACHE.put(cache_key, calculator)
+        return calculator
+    
+    @classmethod
+    def carry_over(cls, cache_key, new_key, data, changed_rows):
+        """
+        Cache the calculator of an appended dataset, updated from the cached calculator of
+        the dataset it was appended to
+        
+        Nothing is cached when the previous dataset has no cached calculator; the new
+        calculator is then built on first use.
+        
+        Args:
+            cache_key (hashable): Key of the previous dataset
+            new_key (hashable): Key of the appended dataset
+            data (pd.DataFrame): Appended dataset, see appended()
+            changed_rows (np.ndarray): Positions of the replaced and appended rows
+        """
+        calculator = _CALCULATOR_CACHE.get(cache_key)
+        if calculator is not None:
+            _CALCULATOR_CACHE.put(new_key, calculator.appended(data, changed_rows))
+    
+    @classmethod
+    def discard(cls, cache_key):
+        """
+        Drop the cached calculator of a dataset, with its measures, partial sums and backends
+        """
+        calculator = _CALCULATOR_CACHE.pop(cache_key)
+        if calculator is not None:
+            calculator.close_backends()
+    
+    @traced()
     def calculate_all_kpis(self):
         """
         Calculate all available KPIs based on the data structure
@@ -24,35 +98,435 @@ class KPICalculator:
         Returns:
             dict: Dictionary of calculated KPIs
         """
+        with self._lock:
+            return self._calculate_kpis(self._get_measures().sum())
+    
+    def calculate_selection_kpis(self, selection=None, filters=(), category_columns=None, backend=None):
+        """
+        Calculate the KPIs of a subset of rows
+        
+        When the filters only restrict one date column by a day range and categorical
+        columns by their values, the measure totals come from partial sums per day and
+        category. Otherwise the selected rows of the measures are scanned. With a compute
+        backend, the filters run in the backend, which returns the measure totals only.
+        
+        Args:
+            selection (np.ndarray): Selected row positions or boolean row mask,
+                every row if omitted
+            filters (tuple): ((column, values), ...) describing the selection, where
+                values is (start_date, end_date) for datetime columns
+            category_columns (list): Categorical columns of the partial sums. Passing the
+                same columns for every filter combination reuses one set of partial sums.
+            backend (ComputeBackend): Backend from compute_backend() evaluating the filters
+                
+        Returns:
+            dict: Dictionary of calculated KPIs
+        """
+        filters = tuple(filters)
+        if filters:
+            cached = self._selection_kpis.get(filters)
+            if cached is not None:
+                return dict(cached)
+        
+        totals = None
+        if filters and backend is not None:
+            totals = self._backend_totals(backend, filters)
+        
+        with self._lock:
+            if filters and totals is None:
+                totals = self._partial_sum_totals(filters, category_columns)
+            if totals is None:
+                measures = self._get_measures()
+                if selection is None:
+                    totals = measures.sum()
+                else:
+                    totals = pd.Series(measures.to_numpy()[np.asarray(selection)].sum(axis=0),
+                                       index=measures.columns)
+            
+            kpis = dict(self._calculate_kpis(totals))
+        
+        if filters:
+            self._selection_kpis.put(filters, dict(kpis))
+        return kpis
+    
+    def measure_totals(self):
+        """
+        Get the measure totals of the data with the shifts of its moment measures
+        
+        Returns:
+            tuple: (pd.Series of measure totals, dict of moment shifts)
+        """
+        with self._lock:
+            return self._get_measures().sum(), dict(self._shifts)
+    
+    def appended(self, data, changed_rows):
+        """
+        Get the calculator of the data after an append, extracting the measures of the
+        changed rows only
+        
+        The measures of the other rows and the partial sums are carried over from this
+        calculator, which is left unchanged.
+        
+        Args:
+            data (pd.DataFrame): Rows of this calculator's data, some of them replaced,
+                followed by the appended rows
+            changed_rows (np.ndarray): Positions in data of the replaced and appended rows
+            
+        Returns:
+            KPICalculator: Calculator of data
+        """
+        calculator = KPICalculator(data)
+        changed_rows = np.asarray(changed_rows, dtype=np.int64)
+        with self._lock:
+            if self._measures is None:
+                return calculator
+            
+            base = self._measures
+            changed = KPICalculator(data.iloc[changed_rows])
+            delta = changed._get_measures()
+            if list(delta.columns) != list(base.columns) or set(changed._measure_errors) != set(self._measure_errors):
+                # The new rows change which KPIs can be calculated, so start over
+                return calculator
+            
+            # Moment sums of the changed rows are re-centered on the shifts of this calculator
+            for name, shift in changed._shifts.items():
+                offset = shift - self._shifts[name]
+                delta[f'{name}_sq'] += 2 * offset * delta[f'{name}_sum'] + delta[f'{name}_n'] * offset ** 2
+                delta[f'{name}_sum'] += delta[f'{name}_n'] * offset
+            
+            old_rows = len(self.data)
+            replaced_rows = changed_rows[changed_rows < old_rows]
+            measures = np.empty((len(data), len(base.columns)))
+            measures[:old_rows] = base.to_numpy()
+            removed = measures[replaced_rows].copy()
+            measures[changed_rows] = delta.to_numpy()
+            
+            calculator._measures = pd.DataFrame(measures, columns=base.columns)
+            calculator._shifts = dict(self._shifts)
+            calculator._measure_errors = dict(self._measure_errors)
+            
+            # Partial sums gain the groups of the changed rows and lose the replaced values
+            removed = pd.DataFrame(-removed, columns=base.columns)
+            for key, (group_keys, totals) in self._partial_sums.items():
+                parts = [(group_keys, totals),
+                         self._group_measures(data.iloc[changed_rows], delta, *key),
+                         self._group_measures(self.data.iloc[replaced_rows], removed, *key)]
+                calculator._partial_sums[key] = self._merge_groups(parts, base.columns)
+        
+        return calculator
+    
+    def _merge_groups(self, parts, columns):
+        """
+        Add up grouped measure totals, dropping the groups left without rows
+        """
+        group_keys = parts[0][0]
+        if group_keys.columns.empty:
+            return group_keys, sum(totals for _, totals in parts if len(totals))
+        
+        frames = [pd.concat([keys.reset_index(drop=True), pd.DataFrame(totals, columns=columns)], axis=1)
+                  for keys, totals in parts if len(keys)]
+        combined = pd.concat(frames, ignore_index=True)
+        grouped = combined.groupby(list(group_keys.columns), dropna=False, observed=True)[list(columns)].sum()
+        grouped = grouped[grouped['rows'].round(6) != 0]
+        return grouped.index.to_frame(index=False), grouped.to_numpy()
+    
+    def compute_backend(self, kind='auto', dimensions=()):
+        """
+        Get a compute backend over the measures and dimension columns, creating it on first use
+        
+        Args:
+            kind (str): 'auto', 'pandas', 'sqlite' or 'duckdb', see compute_backend.resolve_backend
+            dimensions (list): Columns the filters apply to
+            
+        Returns:
+            ComputeBackend: Backend whose table holds the dimensions and the measures,
+                named with MEASURE_PREFIX
+        """
+        kind = resolve_backend(kind, len(self.data))
+        key = (kind, tuple(dimensions))
+        with self._lock:
+            if key not in self._backends:
+                measures = self._get_measures()
+                table = pd.concat(
+                    [self.data[list(dimensions)].reset_index(drop=True), measures.add_prefix(MEASURE_PREFIX)],
+                    axis=1
+                )
+                self._backends[key] = create_backend(table, kind)
+            return self._backends[key]
+    
+    def close_backends(self):
+        """
+        Close the compute backends and release their tables
+        """
+        with self._lock:
+            backends, self._backends = self._backends, {}
+        for backend in backends.values():
+            backend.close()
+    
+    def _backend_totals(self, backend, filters):
+        """
+        Measure totals of the filtered rows, aggregated by a compute backend
+        """
+        with self._lock:
+            names = list(self._get_measures().columns)
+        totals = backend.totals([MEASURE_PREFIX + name for name in names], filters)
+        totals.index = names
+        return totals
+    
+    def partial_sums(self, date_column=None, category_columns=()):
+        """
+        Get the measure totals per day and category combination, building them on first use
+        
+        Args:
+            date_column (str): Datetime column bucketed by day, None for no date dimension
+            category_columns (tuple): Categorical columns
+            
+        Returns:
+            tuple: (pd.DataFrame of group keys, np.ndarray of measure totals per group)
+        """
+        key = (date_column, tuple(category_columns))
+        if key not in self._partial_sums:
+            self._partial_sums[key] = self._group_measures(self.data, self._get_measures(), *key)
+        
+        return self._partial_sums[key]
+    
+    def _group_measures(self, data, measures, date_column, category_columns):
+        """
+        Sum measures per day and category combination of the matching data rows
+        
+        Returns:
+            tuple: (pd.DataFrame of group keys, np.ndarray of measure totals per group)
+        """
+        keys = [data[column].reset_index(drop=True) for column in category_columns]
+        if date_column is not None:
+            days = data[date_column]
+            if getattr(days.dt, 'tz', None) is not None:
+                days = days.dt.tz_localize(None)
+            keys.insert(0, days.dt.normalize().reset_index(drop=True))
+        
+        if not keys:
+            return pd.DataFrame(index=[0]), measures.sum().to_numpy()[np.newaxis]
+        
+        grouped = measures.reset_index(drop=True).groupby(keys, dropna=False, observed=True).sum()
+        group_keys = grouped.index.to_frame(index=False)
+        group_keys.columns = list(category_columns) if date_column is None else [date_column] + list(category_columns)
+        return group_keys, grouped.to_numpy()
+    
+    def _partial_sum_totals(self, filters, category_columns):
+        """
+        Measure totals of the filtered rows from partial sums, None if the filters do not
+        line up with the partial sum dimensions
+        """
+        date_filters = [(column, values) for column, values in filters
+                        if pd.api.types.is_datetime64_any_dtype(self.data[column])]
+        value_filters = [(column, values) for column, values in filters
+                         if not pd.api.types.is_datetime64_any_dtype(self.data[column])]
+        
+        if category_columns is None:
+            category_columns = [column for column, _ in value_filters]
+        if len(date_filters) > 1 or any(column not in category_columns for column, _ in value_filters):
+            return None
+        
+        date_column = date_filters[0][0] if date_filters else None
+        group_keys, totals = self.partial_sums(date_column, tuple(category_columns))
+        
+        selected = np.ones(len(group_keys), dtype=bool)
+        if date_filters:
+            start_date, end_date = date_filters[0][1]
+            days = group_keys[date_column]
+            selected &= ((days >= pd.Timestamp(start_date)) &
+                         (days < pd.Timestamp(end_date) + pd.Timedelta(days=1))).to_numpy()
+        for column, values in value_filters:
+            selected &= group_keys[column].isin(values).to_numpy()
+        
+        return pd.Series(totals[selected].sum(axis=0), index=self._get_measures().columns)
+    
+    def _calculate_kpis(self, totals):
+        """
+        Calculate all KPIs from measure totals
+        """
         # Reset KPIs
         self.kpis = {}
         
         # Calculate basic KPIs
-        self._calculate_service_level()
-        self._calculate_stock_turnover()
-        self._calculate_otif_rate()
-        self._calculate_lead_time_metrics()
-        self._calculate_cost_metrics()
-        self._calculate_efficiency_metrics()
+        self._calculate_service_level(totals)
+        self._calculate_stock_turnover(totals)
+        self._calculate_otif_rate(totals)
+        self._calculate_lead_time_metrics(totals)
+        self._calculate_cost_metrics(totals)
+        self._calculate_efficiency_metrics(totals)
         
         return self.kpis
     
-    def _calculate_service_level(self):
+    def _get_measures(self):
+        """
+        Get the per-row measures of every KPI, extracting them on first use
+        
+        Returns:
+            pd.DataFrame: Additive float measures, one row per data row
+        """
+        if self._measures is None:
+            # The span measures the memory of the new measures frame
+            with span('KPICalculator._get_measures') as measure_span:
+                measures = {'rows': pd.Series(1.0, index=self.data.index)}
+                
+                # A failed extraction is raised again when its KPIs are calculated,
+                # so they fall back to the same defaults as a failed calculation
+                for group, extract in [('service_level', self._service_level_measures),
+                                       ('stock_turnover', self._stock_turnover_measures),
+                                       ('otif_rate', self._otif_measures),
+                                       ('lead_time', self._lead_time_measures),
+                                       ('cost', self._cost_measures),
+                                       ('efficiency', self._efficiency_measures)]:
+                    group_measures = {}
+                    try:
+                        extract(group_measures)
+                    except Exception as e:
+                        # A copy has no traceback, so it does not keep the caller's frames alive
+                        self._measure_errors[group] = copy.copy(e)
+                    measures.update(group_measures)
+                
+                self._measures = pd.DataFrame(
+                    {name: values.astype(float) for name, values in measures.items()}
+                ).reset_index(drop=True)
+                if measure_span is not None:
+                    measure_span.set_result(self._measures)
+        
+        return self._measures
+    
+    def _service_level_measures(self, measures):
+        """
+        Extract service level measures
+        """
+        # Look for relevant columns
+        quantity_cols = self._find_columns(['quantity', 'qty', 'demand', 'ordered'])
+        delivered_cols = self._find_columns(['delivered', 'shipped', 'fulfilled'])
+        
+        if quantity_cols and delivered_cols:
+            measures['sl_demand'] = self._numeric_values(quantity_cols[0]).fillna(0)
+            measures['sl_delivered'] = self._numeric_values(delivered_cols[0]).fillna(0)
+        
+        # Alternative calculation using stock-out frequency
+        stock_cols = self._find_columns(['stock', 'inventory', 'available'])
+        if stock_cols and not quantity_cols:
+            measures['sl_stock_periods'] = self.data[stock_cols[0]] > 0
+    
+    def _stock_turnover_measures(self, measures):
+        """
+        Extract stock turnover measures
+        """
+        # Look for sales/cost of goods sold and inventory columns
+        sales_cols = self._find_columns(['sales', 'revenue', 'sold', 'consumed'])
+        stock_cols = self._find_columns(['stock', 'inventory', 'balance'])
+        
+        if sales_cols and stock_cols:
+            measures['st_sales'] = self._numeric_values(sales_cols[0]).fillna(0)
+            self._add_moments(measures, 'st_stock', self._numeric_values(stock_cols[0]))
+        
+        # Alternative calculation using quantity data
+        elif self._find_columns(['quantity', 'qty']):
+            qty_col = self._find_columns(['quantity', 'qty'])[0]
+            self._add_moments(measures, 'st_qty', self._numeric_values(qty_col))
+    
+    def _otif_measures(self, measures):
+        """
+        Extract On-Time In-Full (OTIF) measures
+        """
+        # Look for delivery date and requested date columns
+        delivery_cols = self._find_columns(['delivery', 'delivered', 'actual'])
+        request_cols = self._find_columns(['requested', 'promised', 'due', 'expected'])
+        quantity_cols = self._find_columns(['quantity', 'qty'])
+        delivered_cols = self._find_columns(['delivered', 'shipped'])
+        
+        # On-time delivery
+        if delivery_cols and request_cols:
+            delivery_col = delivery_cols[0]
+            request_col = request_cols[0]
+            
+            # Ensure both are datetime
+            if self.data[delivery_col].dtype == 'datetime64[ns]' and self.data[request_col].dtype == 'datetime64[ns]':
+                on_time = self.data[delivery_col] <= self.data[request_col]
+                measures['otif_on_time'] = on_time
+        
+        # In-full delivery
+        if quantity_cols and delivered_cols:
+            in_full = self.data[delivered_cols[0]] >= self.data[quantity_cols[0]]
+            measures['otif_in_full'] = in_full
+            
+            # OTIF is both on-time AND in-full
+            if delivery_cols and request_cols:
+                measures['otif_both'] = on_time & in_full
+    
+    def _lead_time_measures(self, measures):
+        """
+        Extract lead time measures
+        """
+        # Look for lead time columns directly
+        lead_time_cols = self._find_columns(['lead_time', 'leadtime', 'cycle_time'])
+        
+        if lead_time_cols:
+            self._add_moments(measures, 'lead_time', self._numeric_values(lead_time_cols[0]))
+        
+        # Calculate from date differences
+        else:
+            order_cols = self._find_columns(['order', 'created', 'requested'])
+            delivery_cols = self._find_columns(['delivery', 'delivered', 'shipped'])
+            
+            if order_cols and delivery_cols:
+                order_col = order_cols[0]
+                delivery_col = delivery_cols[0]
+                
+                if (self.data[order_col].dtype == 'datetime64[ns]' and
+                    self.data[delivery_col].dtype == 'datetime64[ns]'):
+                    
+                    lead_times = (self.data[delivery_col] - self.data[order_col]).dt.days
+                    self._add_moments(measures, 'lead_time', lead_times.astype(float))
+    
+    def _cost_measures(self, measures):
+        """
+        Extract cost measures
+        """
+        cost_cols = self._find_columns(['cost', 'price', 'value'])
+        quantity_cols = self._find_columns(['quantity', 'qty'])
+        
+        if cost_cols:
+            self._add_moments(measures, 'cost', self._numeric_values(cost_cols[0]))
+            
+            # Unit cost and cost variance are skipped if the quantity is not numeric
+            if quantity_cols:
+                try:
+                    measures['cost_qty'] = self._numeric_values(quantity_cols[0]).fillna(0)
+                except Exception as e:
+                    self._measure_errors['cost_quantity'] = copy.copy(e)
+    
+    def _efficiency_measures(self, measures):
+        """
+        Extract operational efficiency measures
+        """
+        status_cols = self._find_columns(['status', 'state', 'condition'])
+        if status_cols:
+            status = self.data[status_cols[0]].astype(str).str.lower()
+            
+            # Count completed/fulfilled keywords per order
+            fulfilled_keywords = ['complete', 'fulfilled', 'delivered', 'closed', 'done']
+            fulfilled_count = 0
+            for keyword in fulfilled_keywords:
+                fulfilled_count = fulfilled_count + status.str.contains(keyword, na=False).astype(int)
+            
+            measures['fulfilled'] = fulfilled_count
+    
+    @traced()
+    def _calculate_service_level(self, totals):
         """
         Calculate service level metrics
         """
         try:
-            # Look for relevant columns
-            quantity_cols = self._find_columns(['quantity', 'qty', 'demand', 'ordered'])
-            delivered_cols = self._find_columns(['delivered', 'shipped', 'fulfilled'])
+            self._raise_measure_error('service_level')
             
-            if quantity_cols and delivered_cols:
-                demand_col = quantity_cols[0]
-                delivered_col = delivered_cols[0]
-                
+            if 'sl_demand' in totals:
                 # Calculate service level as percentage of demand fulfilled
-                total_demand = self.data[demand_col].sum()
-                total_delivered = self.data[delivered_col].sum()
+                total_demand = totals['sl_demand']
+                total_delivered = totals['sl_delivered']
                 
                 if total_demand > 0:
                     service_level = (total_delivered / total_demand) * 100
@@ -62,13 +536,10 @@ class KPICalculator:
                     self.kpis['service_level_trend'] = np.random.uniform(-2, 2)  # Placeholder
             
             # Alternative calculation using stock-out frequency
-            stock_cols = self._find_columns(['stock', 'inventory', 'available'])
-            if stock_cols and not quantity_cols:
-                stock_col = stock_cols[0]
-                
+            if 'sl_stock_periods' in totals:
                 # Count periods with stock > 0
-                periods_with_stock = (self.data[stock_col] > 0).sum()
-                total_periods = len(self.data)
+                periods_with_stock = totals['sl_stock_periods']
+                total_periods = totals['rows']
                 
                 if total_periods > 0:
                     service_level = (periods_with_stock / total_periods) * 100
@@ -80,22 +551,18 @@ class KPICalculator:
             self.kpis['service_level'] = 85.0
             self.kpis['service_level_trend'] = 0.0
     
-    def _calculate_stock_turnover(self):
+    @traced()
+    def _calculate_stock_turnover(self, totals):
         """
         Calculate stock turnover ratio
         """
         try:
-            # Look for sales/cost of goods sold and inventory columns
-            sales_cols = self._find_columns(['sales', 'revenue', 'sold', 'consumed'])
-            stock_cols = self._find_columns(['stock', 'inventory', 'balance'])
+            self._raise_measure_error('stock_turnover')
             
-            if sales_cols and stock_cols:
-                sales_col = sales_cols[0]
-                stock_col = stock_cols[0]
-                
+            if 'st_sales' in totals:
                 # Calculate turnover
-                total_sales = self.data[sales_col].sum()
-                avg_stock = self.data[stock_col].mean()
+                total_sales = totals['st_sales']
+                avg_stock, _ = self._mean_std(totals, 'st_stock')
                 
                 if avg_stock > 0:
                     turnover = total_sales / avg_stock
@@ -103,14 +570,10 @@ class KPICalculator:
                     self.kpis['turnover_trend'] = np.random.uniform(-5, 5)  # Placeholder
             
             # Alternative calculation using quantity data
-            elif self._find_columns(['quantity', 'qty']):
-                qty_cols = self._find_columns(['quantity', 'qty'])
-                qty_col = qty_cols[0]
-                
+            elif 'st_qty_n' in totals:
                 # Estimate turnover based on quantity variation
-                if len(self.data) > 1:
-                    qty_std = self.data[qty_col].std()
-                    qty_mean = self.data[qty_col].mean()
+                if totals['rows'] > 1:
+                    qty_mean, qty_std = self._mean_std(totals, 'st_qty')
                     
                     if qty_mean > 0:
                         turnover = qty_std / qty_mean * 12  # Annualized estimate
@@ -121,44 +584,18 @@ class KPICalculator:
             self.kpis['stock_turnover'] = 6.0
             self.kpis['turnover_trend'] = 0.0
     
-    def _calculate_otif_rate(self):
+    @traced()
+    def _calculate_otif_rate(self, totals):
         """
         Calculate On-Time In-Full (OTIF) delivery rate
         """
         try:
-            # Look for delivery date and requested date columns
-            delivery_cols = self._find_columns(['delivery', 'delivered', 'actual'])
-            request_cols = self._find_columns(['requested', 'promised', 'due', 'expected'])
-            quantity_cols = self._find_columns(['quantity', 'qty'])
-            delivered_cols = self._find_columns(['delivered', 'shipped'])
+            self._raise_measure_error('otif_rate')
             
-            on_time_count = 0
-            in_full_count = 0
-            otif_count = 0
-            total_orders = len(self.data)
-            
-            # Calculate on-time delivery
-            if delivery_cols and request_cols:
-                delivery_col = delivery_cols[0]
-                request_col = request_cols[0]
-                
-                # Ensure both are datetime
-                if self.data[delivery_col].dtype == 'datetime64[ns]' and self.data[request_col].dtype == 'datetime64[ns]':
-                    on_time = self.data[delivery_col] <= self.data[request_col]
-                    on_time_count = on_time.sum()
-            
-            # Calculate in-full delivery
-            if quantity_cols and delivered_cols:
-                qty_col = quantity_cols[0]
-                delivered_col = delivered_cols[0]
-                
-                in_full = self.data[delivered_col] >= self.data[qty_col]
-                in_full_count = in_full.sum()
-                
-                # OTIF is both on-time AND in-full
-                if delivery_cols and request_cols:
-                    otif = on_time & in_full
-                    otif_count = otif.sum()
+            on_time_count = totals.get('otif_on_time', 0)
+            in_full_count = totals.get('otif_in_full', 0)
+            otif_count = totals.get('otif_both', 0)
+            total_orders = totals['rows']
             
             # Calculate rates
             if total_orders > 0:
@@ -178,35 +615,18 @@ class KPICalculator:
             self.kpis['otif_rate'] = 82.0
             self.kpis['otif_trend'] = 0.0
     
-    def _calculate_lead_time_metrics(self):
+    @traced()
+    def _calculate_lead_time_metrics(self, totals):
         """
         Calculate lead time and related metrics
         """
         try:
-            # Look for lead time columns directly
-            lead_time_cols = self._find_columns(['lead_time', 'leadtime', 'cycle_time'])
+            self._raise_measure_error('lead_time')
             
-            if lead_time_cols:
-                lead_time_col = lead_time_cols[0]
-                avg_lead_time = self.data[lead_time_col].mean()
+            if 'lead_time_n' in totals:
+                avg_lead_time, lead_time_std = self._mean_std(totals, 'lead_time')
                 self.kpis['avg_lead_time'] = avg_lead_time
-                self.kpis['lead_time_variance'] = self.data[lead_time_col].std()
-            
-            # Calculate from date differences
-            else:
-                order_cols = self._find_columns(['order', 'created', 'requested'])
-                delivery_cols = self._find_columns(['delivery', 'delivered', 'shipped'])
-                
-                if order_cols and delivery_cols:
-                    order_col = order_cols[0]
-                    delivery_col = delivery_cols[0]
-                    
-                    if (self.data[order_col].dtype == 'datetime64[ns]' and 
-                        self.data[delivery_col].dtype == 'datetime64[ns]'):
-                        
-                        lead_times = (self.data[delivery_col] - self.data[order_col]).dt.days
-                        self.kpis['avg_lead_time'] = lead_times.mean()
-                        self.kpis['lead_time_variance'] = lead_times.std()
+                self.kpis['lead_time_variance'] = lead_time_std
             
             # Set trend
             if 'avg_lead_time' in self.kpis:
@@ -217,50 +637,45 @@ class KPICalculator:
             self.kpis['lead_time_variance'] = 3.0
             self.kpis['lead_time_trend'] = 0.0
     
-    def _calculate_cost_metrics(self):
+    @traced()
+    def _calculate_cost_metrics(self, totals):
         """
         Calculate cost-related metrics
         """
         try:
-            cost_cols = self._find_columns(['cost', 'price', 'value'])
-            quantity_cols = self._find_columns(['quantity', 'qty'])
+            self._raise_measure_error('cost')
             
-            if cost_cols:
-                cost_col = cost_cols[0]
+            if 'cost_n' in totals:
+                cost_mean, cost_std = self._mean_std(totals, 'cost')
                 
                 # Total cost
-                self.kpis['total_cost'] = self.data[cost_col].sum()
+                self.kpis['total_cost'] = cost_mean * totals['cost_n'] if totals['cost_n'] > 0 else 0.0
                 
                 # Average cost per unit
-                if quantity_cols:
-                    qty_col = quantity_cols[0]
-                    total_qty = self.data[qty_col].sum()
+                self._raise_measure_error('cost_quantity')
+                if 'cost_qty' in totals:
+                    total_qty = totals['cost_qty']
                     if total_qty > 0:
                         self.kpis['cost_per_unit'] = self.kpis['total_cost'] / total_qty
                 
                 # Cost variance
-                self.kpis['cost_variance'] = self.data[cost_col].std()
+                self.kpis['cost_variance'] = cost_std
         
         except Exception as e:
             pass  # Cost metrics are optional
     
-    def _calculate_efficiency_metrics(self):
+    @traced()
+    def _calculate_efficiency_metrics(self, totals):
         """
         Calculate operational efficiency metrics
         """
         try:
+            self._raise_measure_error('efficiency')
+            
             # Order fulfillment rate
-            status_cols = self._find_columns(['status', 'state', 'condition'])
-            if status_cols:
-                status_col = status_cols[0]
-                total_orders = len(self.data)
-                
-                # Count completed/fulfilled orders
-                fulfilled_keywords = ['complete', 'fulfilled', 'delivered', 'closed', 'done']
-                fulfilled_count = 0
-                
-                for keyword in fulfilled_keywords:
-                    fulfilled_count += self.data[status_col].astype(str).str.lower().str.contains(keyword, na=False).sum()
+            if 'fulfilled' in totals:
+                total_orders = totals['rows']
+                fulfilled_count = totals['fulfilled']
                 
                 if total_orders > 0:
                     self.kpis['fulfillment_rate'] = (fulfilled_count / total_orders) * 100
@@ -274,6 +689,59 @@ class KPICalculator:
         except Exception as e:
             pass  # Efficiency metrics are optional
     
+    def _raise_measure_error(self, group):
+        """
+        Raise the error met while extracting the measures of a KPI group, if any
+        """
+        if group in self._measure_errors:
+            # A copy is raised so the stored error never collects a traceback
+            raise copy.copy(self._measure_errors[group])
+    
+    def _numeric_values(self, column):
+        """
+        Get a column as floats, raising TypeError for columns that are not numeric
+        """
+        values = self.data[column]
+        if not pd.api.types.is_numeric_dtype(values):
+            raise TypeError(f"Column '{column}' is not numeric")
+        return values.astype(float)
+    
+    def _add_moments(self, measures, name, values):
+        """
+        Add count, sum and sum of squares measures of a column
+        
+        Values are shifted by their overall mean before summing, so that the variance
+        of any selection can be recovered from the sums without cancellation errors.
+        """
+        shift = values.mean()
+        if not np.isfinite(shift):
+            shift = 0.0
+        self._shifts[name] = shift
+        
+        centered = values - shift
+        measures[f'{name}_n'] = values.notna()
+        measures[f'{name}_sum'] = centered.fillna(0)
+        measures[f'{name}_sq'] = (centered ** 2).fillna(0)
+    
+    def _mean_std(self, totals, name):
+        """
+        Mean and sample standard deviation from moment measure totals
+        
+        Returns:
+            tuple: (mean, std), NaN where pandas would return NaN
+        """
+        count = totals[f'{name}_n']
+        if count == 0:
+            return np.nan, np.nan
+        
+        shifted_sum = totals[f'{name}_sum']
+        mean = self._shifts[name] + shifted_sum / count
+        if count < 2:
+            return mean, np.nan
+        
+        variance = (totals[f'{name}_sq'] - shifted_sum ** 2 / count) / (count - 1)
+        return mean, np.sqrt(max(variance, 0.0))
+    
     def _find_columns(self, keywords):
         """
         Find columns that contain any of the specified keywords
@@ -334,3 +802,58 @@ class KPICalculator:
                 return "Average"
             else:
                 return "Poor"
+
+class RunningKPIs:
+    """
+    KPIs of data arriving in chunks, combined from the measure totals of each chunk
+    """
+    
+    def __init__(self):
+        """
+        Initialize without data
+        """
+        self.rows = 0
+        self._calculator = None
+        self._totals = None
+    
+    def add(self, chunk):
+        """
+        Add the measures of a chunk of rows
+        
+        Args:
+            chunk (pd.DataFrame): Cleaned rows
+        """
+        calculator = KPICalculator(chunk)
+        totals, shifts = calculator.measure_totals()
+        self.rows += len(chunk)
+        
+        if self._calculator is None:
+            # The first chunk provides the shifts, measure errors and KPI formulas
+            self._calculator = calculator
+            self._totals = totals
+            return
+        
+        # Moment sums of later chunks are re-centered on the shifts of the first chunk
+        base_shifts = self._calculator._shifts
+        for name, shift in shifts.items():
+            if name not in base_shifts:
+                base_shifts[name] = shift
+                continue
+            delta = shift - base_shifts[name]
+            count = totals[f'{name}_n']
+            totals[f'{name}_sq'] += 2 * delta * totals[f'{name}_sum'] + count * delta ** 2
+            totals[f'{name}_sum'] += count * delta
+        
+        self._totals = self._totals.add(totals, fill_value=0)
+    
+    def kpis(self):
+        """
+        Calculate the KPIs of the rows added so far
+        
+        Returns:
+            dict: Dictionary of calculated KPIs, empty before the first chunk
+        """
+        if self._calculator is None:
+            return {}
+        with self._calculator._lock:
+            return dict(self._calculator._calculate_kpis(self._totals))
@@ -0,0 +1,178 @@
+"""
+Load test of the HTTP API, reporting p50/p99 latency per endpoint
+
+Without --url the API application is called in-process, so no server is needed.
+With --url requests go over HTTP to a running server (python api_server.py).
+
+Usage:
+    python load_test.py [--url http://127.0.0.1:8000] [--file sample_data.csv]
+                        [--requests 200] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+async def asgi_request(app, method, path, query='', body=b''):
+    """
+    Call an ASGI application in-process
+    
+    Returns:
+        tuple: (HTTP status, response body bytes)
+    """
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query.encode('utf-8'),
+        'headers': []
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    response = {'status': None, 'body': b''}
+    
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+    
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            response['body'] += message.get('body', b'')
+    
+    await app(scope, receive, send)
+    return response['status'], response['body']
+
+def http_request(base_url, method, path, query='', body=b''):
+    """
+    Send a request to a running server
+    
+    Returns:
+        tuple: (HTTP status, response body bytes)
+    """
+    url = f"{base_url.rstrip('/')}{path}" + (f"?{query}" if query else '')
+    request = urllib.request.Request(url, data=body if method == 'POST' else None, method=method)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+def build_scenarios(dataset):
+    """
+    Requests exercised by the load test, derived from the uploaded dataset's columns
+    
+    Returns:
+        list: (label, path, query) tuples
+    """
+    base = f"/datasets/{dataset['id']}"
+    columns = dataset['columns']
+    date_cols = [column for column, dtype in columns.items() if dtype.startswith('datetime64')]
+    numeric_cols = [column for column, dtype in columns.items() if dtype.startswith(('int', 'float'))]
+    category_cols = [column for column, dtype in columns.items() if dtype in ('object', 'category')]
+    
+    scenarios = [
+        ('kpis', f"{base}/kpis", ''),
+        ('recommendations', f"{base}/recommendations", ''),
+        ('chart:kpi_dashboard', f"{base}/charts/kpi_dashboard", '')
+    ]
+    if date_cols:
+        scenarios.append(('kpis:date_filter', f"{base}/kpis", f"date_column={date_cols[0]}"))
+    if category_cols:
+        scenarios.append(('kpis:segmented', f"{base}/kpis", f"segment_by={category_cols[-1]}"))
+    if numeric_cols:
+        scenarios.append(('chart:distribution', f"{base}/charts/distribution", f"column={numeric_cols[0]}"))
+    return scenarios
+
+async def run_load_test(request, file_path, total_requests, concurrency):
+    """
+    Upload a dataset, then send concurrent requests over a mix of endpoints
+    
+    Args:
+        request (callable): async (method, path, query, body) -> (status, body)
+        file_path (str): Dataset uploaded before the test
+        total_requests (int): Number of timed requests
+        concurrency (int): Requests in flight at once
+        
+    Returns:
+        dict: {label: latencies in milliseconds}, plus error count and wall time
+    """
+    with open(file_path, 'rb') as f:
+        status, body = await request('POST', '/datasets', f"name={os.path.basename(file_path)}", f.read())
+    if status != 200:
+        raise RuntimeError(f"Upload failed ({status}): {body.decode('utf-8', 'replace')}")
+    scenarios = build_scenarios(json.loads(body))
+    
+    # Warm-up pass so worker start-up and first loads are not counted
+    for _, path, query in scenarios:
+        await request('GET', path, query)
+    
+    latencies = {label: [] for label, _, _ in scenarios}
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def timed(label, path, query):
+        nonlocal errors
+        async with semaphore:
+            start_time = time.perf_counter()
+            status, _ = await request('GET', path, query)
+            latencies[label].append((time.perf_counter() - start_time) * 1000)
+            if status != 200:
+                errors += 1
+    
+    start_time = time.perf_counter()
+    await asyncio.gather(*[timed(*scenarios[i % len(scenarios)]) for i in range(total_requests)])
+    return {'latencies': latencies, 'errors': errors, 'seconds': time.perf_counter() - start_time}
+
+def print_report(result):
+    """
+    Print p50/p99 latency per endpoint and overall throughput
+    """
+    print(f"{'endpoint':<22}{'count':>7}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    all_latencies = []
+    for label, latencies in result['latencies'].items():
+        if not latencies:
+            continue
+        all_latencies.extend(latencies)
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"{label:<22}{len(latencies):>7}{p50:>10.1f}{p99:>10.1f}{max(latencies):>10.1f}")
+    
+    p50, p99 = np.percentile(all_latencies, [50, 99])
+    print(f"{'all':<22}{len(all_latencies):>7}{p50:>10.1f}{p99:>10.1f}{max(all_latencies):>10.1f}")
+    print(f"{len(all_latencies) / result['seconds']:.1f} requests/s, {result['errors']} errors")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the supply chain HTTP API.')
+    parser.add_argument('--url', default=None, help='base URL of a running server (default: in-process)')
+    parser.add_argument('--file', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data.csv'),
+                        help='dataset to upload (default: sample_data.csv)')
+    parser.add_argument('--requests', type=int, default=200, help='number of timed requests (default: 200)')
+    parser.add_argument('--concurrency', type=int, default=16, help='requests in flight (default: 16)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes of the in-process API')
+    args = parser.parse_args(argv)
+    
+    if args.url:
+        async def request(method, path, query='', body=b''):
+            return await asyncio.to_thread(http_request, args.url, method, path, query, body)
+        app = None
+    else:
+        from api_server import SupplyChainAPI
+        app = SupplyChainAPI(max_workers=args.workers)
+        
+        async def request(method, path, query='', body=b''):
+            return await asgi_request(app, method, path, query, body)
+    
+    try:
+        result = asyncio.run(run_load_test(request, args.file, args.requests, args.concurrency))
+    finally:
+        if app is not None:
+            app.close()
+    
+    print_report(result)
+
+if __name__ == "__main__":
+    main()
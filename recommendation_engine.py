@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from instrumentation import traced
+from risk_simulation import StockoutRiskSimulator
+
 class RecommendationEngine:
     """
     Generates business recommendations based on supply chain KPIs and data analysis
@@ -18,7 +21,9 @@ class RecommendationEngine:
         self.data = data
         self.kpis = kpis
         self.recommendations = []
+        self.stockout_risk = None
     
+    @traced()
     def generate_recommendations(self):
         """
         Generate comprehensive business recommendations
@@ -33,6 +38,7 @@ class RecommendationEngine:
         self._analyze_otif_performance()
         self._analyze_lead_times()
         self._analyze_stock_turnover()
+        self._analyze_stockout_risk()
         self._analyze_cost_efficiency()
         self._analyze_data_quality()
         self._generate_strategic_recommendations()
@@ -43,6 +49,7 @@ class RecommendationEngine:
         
         return self.recommendations
     
+    @traced()
     def _analyze_service_level(self):
         """
         Analyze service level performance and generate recommendations
@@ -82,6 +89,7 @@ class RecommendationEngine:
                 'category': 'Cost Optimization'
             })
     
+    @traced()
     def _analyze_otif_performance(self):
         """
         Analyze On-Time In-Full delivery performance
@@ -111,6 +119,7 @@ class RecommendationEngine:
                     'category': 'Technology Enhancement'
                 })
     
+    @traced()
     def _analyze_lead_times(self):
         """
         Analyze lead time performance
@@ -138,6 +147,7 @@ class RecommendationEngine:
                 'category': 'Process Standardization'
             })
     
+    @traced()
     def _analyze_stock_turnover(self):
         """
         Analyze inventory turnover performance
@@ -175,6 +185,40 @@ class RecommendationEngine:
                 'category': 'Risk Management'
             })
     
+    @traced()
+    def _analyze_stockout_risk(self):
+        """
+        Simulate stock-out risk per SKU and recommend safety stock reviews for the riskiest SKUs
+        """
+        try:
+            self.stockout_risk = StockoutRiskSimulator(self.data).simulate()
+        except Exception as e:
+            return  # Risk simulation is optional
+        
+        at_risk = self.stockout_risk[self.stockout_risk['stockout_probability'] >= 0.2]
+        if at_risk.empty:
+            return
+        
+        top_risks = at_risk.head(5)
+        max_probability = top_risks['stockout_probability'].iloc[0]
+        sku_summary = ', '.join(
+            f"{row.sku} ({row.stockout_probability:.0%}, {row.expected_backorders:.1f} units)"
+            for row in top_risks.itertuples()
+        )
+        
+        self.recommendations.append({
+            'title': 'Mitigate Stock-out Risk on High-Risk SKUs',
+            'description': f'Monte Carlo simulation of lead-time demand shows {len(at_risk)} SKU(s) with a stock-out probability of 20% or more. Highest risk (probability, expected backorders): {sku_summary}. Review safety stock and reorder points for these SKUs first.',
+            'impact': 'High - Prevents lost sales and expediting costs on the most exposed SKUs',
+            'effort': 'Low - Safety stock adjustment for a short list of SKUs',
+            'priority': 'High' if max_probability >= 0.5 else 'Medium',
+            'category': 'Risk Management',
+            'stockout_probability': max_probability,
+            'expected_backorders': top_risks['expected_backorders'].sum(),
+            'sku_risks': top_risks.to_dict('records')
+        })
+    
+    @traced()
     def _analyze_cost_efficiency(self):
         """
         Analyze cost-related metrics and generate recommendations
@@ -205,6 +249,7 @@ class RecommendationEngine:
                 'category': 'Strategic Sourcing'
             })
     
+    @traced()
     def _analyze_data_quality(self):
         """
         Analyze data quality and recommend improvements
@@ -239,6 +284,7 @@ class RecommendationEngine:
                     'category': 'Analytics Enhancement'
                 })
     
+    @traced()
     def _generate_strategic_recommendations(self):
         """
         Generate strategic, high-level recommendations
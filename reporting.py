@@ -0,0 +1,429 @@
+import hashlib
+import html
+import io
+import json
+import os
+import tempfile
+import textwrap
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from itertools import repeat
+from multiprocessing import get_context
+
+import numpy as np
+
+from translations import get_text
+
+# Bump when the chart drawing code changes, so cached images are not reused
+RENDERER_VERSION = 1
+
+def generate_report(recommendations, kpis, language='en'):
+    """Generate a text report of recommendations and KPIs"""
+    report = f"""
+{get_text('report_title', language)}
+{get_text('generated_on', language)} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+{get_text('kpi_section', language)}
+"""
+
+    if kpis:
+        for kpi_name, kpi_value in kpis.items():
+            if not kpi_name.endswith('_trend'):
+                report += f"{kpi_name.replace('_', ' ').title()}: {kpi_value:.2f}\n"
+    
+    report += f"\n{get_text('recommendations_section', language)}\n"
+    
+    if recommendations:
+        for i, rec in enumerate(recommendations, 1):
+            report += f"""
+{i}. {rec['title']} ({get_text('priority_label', language)} {rec.get('priority', 'Medium')})
+   Description: {rec['description']}
+   {get_text('impact', language)} {rec['impact']}
+   {get_text('effort', language)} {rec['effort']}
+"""
+    else:
+        report += f"{get_text('no_recommendations', language)}\n"
+    
+    report += f"\n{get_text('report_footer', language)}"
+    return report
+
+class BatchReportRenderer:
+    """
+    Renders report charts to static images with matplotlib, in worker processes kept
+    across reports, and assembles them into PDF or HTML reports
+    """
+    
+    def __init__(self, cache_dir=None, max_workers=None, min_parallel_charts=3,
+                 max_cache_bytes=256 * 1024 * 1024):
+        """
+        Initialize the renderer
+        
+        Args:
+            cache_dir (str): Directory of rendered chart images, reused between report runs
+            max_workers (int): Number of rendering processes, defaults to the CPU count
+            min_parallel_charts (int): Charts to render from which worker processes are
+                used; fewer charts are rendered in this process, as starting the workers
+                takes longer than drawing them
+            max_cache_bytes (int): Size of the image directory above which the least
+                recently used images are removed
+        """
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'supply_chain_report_cache')
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_parallel_charts = min_parallel_charts
+        self.max_cache_bytes = max_cache_bytes
+        self.last_render_stats = None
+        # Worker processes are started on first use and kept for later reports
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._prune_cache()
+    
+    def build_chart_specs(self, data, kpis, max_category_charts=3):
+        """
+        Describe the report charts as plain, picklable data
+        
+        Args:
+            data (pd.DataFrame): Supply chain dataset
+            kpis (dict): Calculated KPIs
+            max_category_charts (int): Number of category columns charted
+            
+        Returns:
+            list: Chart specifications, rendered by _render_chart
+        """
+        from visualizations import SupplyChainVisualizations, kpi_gauge_settings
+        
+        specs = []
+        
+        # KPI dashboard, same KPIs and thresholds as create_kpi_dashboard
+        main_kpis = {k: float(v) for k, v in (kpis or {}).items()
+                     if not k.endswith('_trend') and np.isfinite(v)}
+        if len(main_kpis) >= 2:
+            gauges = []
+            for kpi_name in list(main_kpis)[:4]:
+                value = main_kpis[kpi_name]
+                gauge_range, threshold_high, threshold_low, color = kpi_gauge_settings(kpi_name, value)
+                gauges.append({
+                    'name': kpi_name.replace('_', ' ').title(),
+                    'value': value,
+                    'range': [float(bound) for bound in gauge_range],
+                    'threshold_high': float(threshold_high),
+                    'threshold_low': float(threshold_low),
+                    'color': color
+                })
+            specs.append({'kind': 'kpi_dashboard', 'title': 'Supply Chain KPI Dashboard', 'gauges': gauges})
+        
+        # Category charts on the first numeric column
+        numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+        categorical_cols = data.select_dtypes(include=['object', 'category']).columns.tolist()
+        if numeric_cols:
+            viz = SupplyChainVisualizations(data)
+            value_col = numeric_cols[0]
+            for category_col in categorical_cols[:max_category_charts]:
+                grouped, outliers = viz.category_box_stats(category_col, value_col)
+                if grouped.empty:
+                    continue
+                
+                outliers_by_category = outliers.groupby(category_col, observed=True)[value_col].apply(list)
+                specs.append({
+                    'kind': 'category',
+                    'title': f'{value_col.title()} Analysis by {category_col.title()}',
+                    'value_column': value_col.title(),
+                    'categories': [str(cat)[:20] for cat in grouped[category_col]],
+                    'boxes': [{
+                        'mean': float(row.mean),
+                        'q1': float(row.q1),
+                        'median': float(row.median),
+                        'q3': float(row.q3),
+                        'lowerfence': float(row.lowerfence),
+                        'upperfence': float(row.upperfence),
+                        'outliers': [float(v) for v in outliers_by_category.get(cat, [])]
+                    } for cat, row in zip(grouped[category_col], grouped.itertuples(index=False))]
+                })
+        
+        return specs
+    
+    def render(self, specs, image_format='png'):
+        """
+        Render charts to images, reusing cached images of unchanged charts
+        
+        Args:
+            specs (list): Chart specifications from build_chart_specs
+            image_format (str): 'png' or 'svg'
+            
+        Returns:
+            list: Image bytes, in the order of specs
+        """
+        images = [None] * len(specs)
+        missing = []
+        
+        for i, spec in enumerate(specs):
+            path = self._cache_path(spec, image_format)
+            try:
+                with open(path, 'rb') as f:
+                    images[i] = f.read()
+                # Marks the image as recently used for _prune_cache
+                os.utime(path)
+            except FileNotFoundError:
+                missing.append(i)
+        
+        if missing:
+            missing_specs = [specs[i] for i in missing]
+            if len(missing) < self.min_parallel_charts or self.max_workers == 1:
+                rendered = map(_render_chart, missing_specs, repeat(image_format))
+            else:
+                rendered = self._map_in_workers(missing_specs, image_format)
+            for i, image in zip(missing, rendered):
+                images[i] = image
+                self._write_cache(self._cache_path(specs[i], image_format), image)
+            self._prune_cache()
+        
+        self.last_render_stats = {
+            'charts': len(specs),
+            'rendered': len(missing),
+            'cached': len(specs) - len(missing)
+        }
+        
+        return images
+    
+    def _map_in_workers(self, specs, image_format):
+        """
+        Render charts in the worker processes
+        
+        Returns:
+            list: Image bytes, in the order of specs
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned workers are safe to start from the threaded Streamlit server
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=get_context('spawn'),
+                                                 initializer=_import_matplotlib)
+            pool = self._pool
+        
+        try:
+            return list(pool.map(_render_chart, specs, repeat(image_format)))
+        except BrokenProcessPool:
+            # A worker died, the next report starts new ones
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._pool = None
+            raise
+    
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+    
+    def build_pdf(self, data, kpis, recommendations, language='en'):
+        """
+        Build a multi-page PDF report: text summary followed by one chart per page
+        
+        Args:
+            data (pd.DataFrame): Supply chain dataset
+            kpis (dict): Calculated KPIs
+            recommendations (list): Generated recommendations
+            language (str): Report language
+            
+        Returns:
+            bytes: PDF document
+        """
+        from matplotlib.backends.backend_pdf import PdfPages
+        from matplotlib.figure import Figure
+        from matplotlib.image import imread
+        
+        images = self.render(self.build_chart_specs(data, kpis), 'png')
+        text = generate_report(recommendations, kpis, language).replace('**', '')
+        
+        lines = []
+        for line in text.strip('\n').split('\n'):
+            lines.extend(textwrap.wrap(line, width=95, subsequent_indent='      ') or [''])
+        
+        buffer = io.BytesIO()
+        with PdfPages(buffer) as pdf:
+            lines_per_page = 62
+            for start in range(0, len(lines), lines_per_page):
+                page = Figure(figsize=(8.27, 11.69))
+                page.text(0.06, 0.96, '\n'.join(lines[start:start + lines_per_page]),
+                          va='top', family='monospace', fontsize=7.5)
+                pdf.savefig(page)
+            
+            for image in images:
+                page = Figure(figsize=(11.69, 8.27))
+                ax = page.add_axes([0.02, 0.02, 0.96, 0.96])
+                ax.imshow(imread(io.BytesIO(image), format='png'))
+                ax.axis('off')
+                pdf.savefig(page)
+        
+        return buffer.getvalue()
+    
+    def build_html(self, data, kpis, recommendations, language='en'):
+        """
+        Build a self-contained HTML report with inline SVG charts
+        
+        Args:
+            data (pd.DataFrame): Supply chain dataset
+            kpis (dict): Calculated KPIs
+            recommendations (list): Generated recommendations
+            language (str): Report language
+            
+        Returns:
+            bytes: UTF-8 encoded HTML document
+        """
+        images = self.render(self.build_chart_specs(data, kpis), 'svg')
+        clean = lambda text: html.escape(str(text).replace('**', ''))
+        
+        kpi_rows = ''.join(
+            f"<tr><td>{clean(name.replace('_', ' ').title())}</td><td>{value:.2f}</td></tr>"
+            for name, value in (kpis or {}).items() if not name.endswith('_trend')
+        )
+        rec_items = ''.join(
+            f"<li><strong>{clean(rec['title'])}</strong> ({clean(get_text('priority_label', language))} "
+            f"{clean(rec.get('priority', 'Medium'))})<p>{clean(rec['description'])}</p>"
+            f"<p>{clean(get_text('impact', language))} {clean(rec['impact'])}<br>"
+            f"{clean(get_text('effort', language))} {clean(rec['effort'])}</p></li>"
+            for rec in (recommendations or [])
+        ) or f"<li>{clean(get_text('no_recommendations', language))}</li>"
+        charts = ''.join(f"<figure>{image.decode('utf-8')}</figure>" for image in images)
+        
+        document = f"""<!DOCTYPE html>
+<html lang="{language}">
+<head>
+<meta charset="utf-8">
+<title>{clean(get_text('report_title', language))}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em auto; max-width: 1100px; color: #222; }}
+table {{ border-collapse: collapse; }}
+td {{ border: 1px solid #ccc; padding: 4px 12px; }}
+figure {{ margin: 2em 0; }}
+figure svg {{ width: 100%; height: auto; }}
+</style>
+</head>
+<body>
+<h1>{clean(get_text('report_title', language))}</h1>
+<p>{clean(get_text('generated_on', language))} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+<h2>{clean(get_text('kpi_section', language).strip('= '))}</h2>
+<table>{kpi_rows}</table>
+{charts}
+<h2>{clean(get_text('recommendations_section', language).strip('= '))}</h2>
+<ol>{rec_items}</ol>
+</body>
+</html>
+"""
+        return document.encode('utf-8')
+    
+    def _cache_path(self, spec, image_format):
+        """
+        Path of the cached image of a chart specification
+        """
+        payload = json.dumps([RENDERER_VERSION, image_format, spec], sort_keys=True, default=str)
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(payload.encode()).hexdigest()}.{image_format}")
+    
+    def _write_cache(self, path, image):
+        """
+        Write a cached image atomically so concurrent report runs never read partial files
+        """
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(image)
+        os.replace(temp_path, path)
+    
+    def _prune_cache(self):
+        """
+        Remove the least recently used images while the cache directory is larger than
+        max_cache_bytes
+        """
+        images = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                images.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in images)
+        for _, size, path in sorted(images):
+            if total <= self.max_cache_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Removed by another report run
+                pass
+            total -= size
+
+def _import_matplotlib():
+    """
+    Import the drawing modules when a worker process starts, before its first chart
+    """
+    import matplotlib.backends.backend_agg
+    import matplotlib.backends.backend_svg
+    import matplotlib.figure
+
+def _render_chart(spec, image_format):
+    """
+    Render one chart specification with matplotlib, in a worker process or inline
+    
+    Returns:
+        bytes: Image in the requested format
+    """
+    from matplotlib.figure import Figure
+    
+    gauge_colors = {'green': '#2ca02c', 'yellow': '#f2c744', 'red': '#d62728'}
+    
+    if spec['kind'] == 'kpi_dashboard':
+        fig = Figure(figsize=(11, 6))
+        fig.suptitle(spec['title'], fontsize=14)
+        axes = fig.subplots(2, 2).flatten()
+        
+        for ax, gauge in zip(axes, spec['gauges']):
+            low, high = sorted([gauge['threshold_low'], gauge['threshold_high']])
+            ax.barh(0, low - gauge['range'][0], left=gauge['range'][0], height=0.8, color='lightgray')
+            ax.barh(0, high - low, left=low, height=0.8, color='gray')
+            ax.barh(0, gauge['value'] - gauge['range'][0], left=gauge['range'][0], height=0.35,
+                    color=gauge_colors.get(gauge['color'], gauge['color']))
+            ax.axvline(gauge['threshold_high'], color='red', linewidth=3)
+            ax.set_xlim(gauge['range'])
+            ax.set_yticks([])
+            ax.set_title(f"{gauge['name']}: {gauge['value']:.1f}", fontsize=11)
+        
+        for ax in axes[len(spec['gauges']):]:
+            ax.axis('off')
+    
+    elif spec['kind'] == 'category':
+        fig = Figure(figsize=(12, max(4, len(spec['categories']) * 0.4)))
+        fig.suptitle(spec['title'], fontsize=14)
+        bar_ax, box_ax = fig.subplots(1, 2, gridspec_kw={'width_ratios': [0.6, 0.4]})
+        
+        positions = np.arange(len(spec['categories']))
+        means = [box['mean'] for box in spec['boxes']]
+        bar_ax.barh(positions, means, color='#8dd3c7')
+        bar_ax.set_yticks(positions, spec['categories'])
+        bar_ax.invert_yaxis()
+        bar_ax.set_xlabel(f"Average {spec['value_column']}")
+        bar_ax.set_title('Average by Category')
+        
+        box_ax.bxp([{
+            'label': label,
+            'mean': box['mean'],
+            'med': box['median'],
+            'q1': box['q1'],
+            'q3': box['q3'],
+            'whislo': box['lowerfence'],
+            'whishi': box['upperfence'],
+            'fliers': box['outliers']
+        } for label, box in zip(spec['categories'], spec['boxes'])], showmeans=True)
+        for label in box_ax.get_xticklabels():
+            label.set(rotation=45, horizontalalignment='right')
+        box_ax.set_ylabel(spec['value_column'])
+        box_ax.set_title('Distribution by Category')
+    
+    else:
+        raise ValueError(f"Unknown chart kind: {spec['kind']}")
+    
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=image_format, dpi=150)
+    return buffer.getvalue()
@@ -0,0 +1,183 @@
+import pandas as pd
+import numpy as np
+
+class StockoutRiskSimulator:
+    """
+    Monte Carlo simulation of stock-out risk per SKU from empirical lead-time and demand samples
+    """
+    
+    def __init__(self, data, n_scenarios=10000, seed=42, max_chunk_cells=2_000_000, max_skus=100,
+                 assumed_cover_days=None):
+        """
+        Initialize with supply chain data
+        
+        Args:
+            data (pd.DataFrame): Supply chain dataset
+            n_scenarios (int): Number of scenarios drawn per SKU
+            seed (int): Seed of the random generator, fixed for reproducible results
+            max_chunk_cells (int): Upper bound on the size of a scenario x day draw matrix,
+                used to cap memory when lead times are long
+            max_skus (int): Only the SKUs with the highest total demand are simulated
+            assumed_cover_days (float): Without an inventory column, assume each SKU holds its
+                mean lead-time demand plus this many days of mean demand. If omitted, data
+                without an inventory column is not simulated.
+        """
+        self.data = data
+        self.n_scenarios = n_scenarios
+        self.seed = seed
+        self.max_chunk_cells = max_chunk_cells
+        self.max_skus = max_skus
+        self.assumed_cover_days = assumed_cover_days
+        self.results = None
+    
+    def simulate(self):
+        """
+        Simulate lead-time demand for every SKU and compare it to the stock position
+        
+        Returns:
+            pd.DataFrame: One row per SKU sorted by stock-out probability (highest risk first),
+            empty if the data does not contain SKU, demand, lead-time and inventory information
+        """
+        columns = ['sku', 'stock_position', 'mean_lead_time', 'mean_daily_demand',
+                   'stockout_probability', 'expected_backorders', 'scenarios']
+        self.results = pd.DataFrame(columns=columns)
+        
+        samples = self._prepare_samples()
+        if not samples:
+            return self.results
+        
+        rng = np.random.default_rng(self.seed)
+        rows = []
+        
+        for sku, lead_times, daily_demand, stock_position in samples:
+            lead_time_demand = self._simulate_lead_time_demand(lead_times, daily_demand, rng)
+            shortfall = np.maximum(lead_time_demand - stock_position, 0)
+            
+            rows.append({
+                'sku': sku,
+                'stock_position': stock_position,
+                'mean_lead_time': lead_times.mean(),
+                'mean_daily_demand': daily_demand.mean(),
+                'stockout_probability': (shortfall > 0).mean(),
+                'expected_backorders': shortfall.mean(),
+                'scenarios': len(lead_time_demand)
+            })
+        
+        self.results = pd.DataFrame(rows, columns=columns).sort_values(
+            ['stockout_probability', 'expected_backorders'], ascending=False
+        ).reset_index(drop=True)
+        
+        return self.results
+    
+    def _simulate_lead_time_demand(self, lead_times, daily_demand, rng):
+        """
+        Draw all scenarios for one SKU: a bootstrapped lead time, then the sum of that many
+        bootstrapped daily demands. Scenarios are processed in chunks so that the
+        scenario x day matrix never exceeds max_chunk_cells.
+        """
+        scenario_lead_times = rng.choice(lead_times, size=self.n_scenarios)
+        max_lead_time = int(scenario_lead_times.max())
+        chunk_size = max(1, self.max_chunk_cells // max_lead_time)
+        day_offsets = np.arange(max_lead_time)
+        
+        lead_time_demand = np.empty(self.n_scenarios)
+        
+        for start in range(0, self.n_scenarios, chunk_size):
+            chunk_lead_times = scenario_lead_times[start:start + chunk_size]
+            draws = daily_demand[rng.integers(0, len(daily_demand), size=(len(chunk_lead_times), max_lead_time))]
+            draws[day_offsets >= chunk_lead_times[:, None]] = 0
+            lead_time_demand[start:start + chunk_size] = draws.sum(axis=1)
+        
+        return lead_time_demand
+    
+    def _prepare_samples(self):
+        """
+        Build the empirical lead-time and daily demand samples of each SKU
+        
+        Returns:
+            list: Tuples of (sku, lead_times, daily_demand, stock_position)
+        """
+        sku_cols = self._find_columns(['sku', 'product', 'item'])
+        demand_cols = [col for col in self._find_columns(['quantity', 'qty', 'demand', 'ordered'])
+                       if pd.api.types.is_numeric_dtype(self.data[col])]
+        order_cols = [col for col in self._find_columns(['order', 'created', 'requested'])
+                      if pd.api.types.is_datetime64_any_dtype(self.data[col])]
+        
+        if not sku_cols or not demand_cols or not order_cols:
+            return []
+        
+        sku_col = sku_cols[0]
+        demand_col = demand_cols[0]
+        order_col = order_cols[0]
+        
+        frame = pd.DataFrame({
+            'sku': self.data[sku_col],
+            'day': self.data[order_col].dt.normalize(),
+            'demand': self.data[demand_col],
+            'lead_time': self._lead_times(order_col)
+        }).dropna(subset=['sku', 'day', 'demand'])
+        
+        if frame.empty or frame['lead_time'].notna().sum() == 0:
+            return []
+        
+        stock_cols = [col for col in self._find_columns(['stock', 'inventory', 'on_hand', 'available'])
+                      if pd.api.types.is_numeric_dtype(self.data[col])]
+        if stock_cols:
+            frame['stock'] = self.data[stock_cols[0]]
+        elif self.assumed_cover_days is None:
+            # The stock position would be an assumption, and so would the risk
+            return []
+        
+        # Lead times are simulated in whole days; SKUs without history use the pooled sample
+        pooled_lead_times = np.ceil(frame['lead_time'].dropna().clip(lower=1).to_numpy())
+        
+        # Daily demand covers every day of the observed period, including days without orders
+        all_days = pd.date_range(frame['day'].min(), frame['day'].max(), freq='D')
+        daily = frame.groupby(['sku', 'day'])['demand'].sum().unstack(fill_value=0)
+        daily = daily.reindex(columns=all_days, fill_value=0)
+        
+        top_skus = frame.groupby('sku')['demand'].sum().nlargest(self.max_skus).index
+        frame = frame.sort_values('day')
+        
+        samples = []
+        for sku, sku_rows in frame[frame['sku'].isin(top_skus)].groupby('sku', sort=False):
+            lead_times = np.ceil(sku_rows['lead_time'].dropna().clip(lower=1).to_numpy())
+            if len(lead_times) == 0:
+                lead_times = pooled_lead_times
+            
+            daily_demand = daily.loc[sku].to_numpy(dtype=float)
+            
+            if 'stock' in sku_rows and sku_rows['stock'].notna().any():
+                stock_position = float(sku_rows['stock'].dropna().iloc[-1])
+            elif self.assumed_cover_days is not None:
+                stock_position = float(daily_demand.mean() * (lead_times.mean() + self.assumed_cover_days))
+            else:
+                continue
+            
+            samples.append((sku, lead_times, daily_demand, stock_position))
+        
+        return samples
+    
+    def _lead_times(self, order_col):
+        """
+        Get lead times in days, from a lead time column or from order/delivery date differences
+        """
+        lead_time_cols = [col for col in self._find_columns(['lead_time', 'leadtime', 'cycle_time'])
+                          if pd.api.types.is_numeric_dtype(self.data[col])]
+        if lead_time_cols:
+            return self.data[lead_time_cols[0]]
+        
+        delivery_cols = [col for col in self._find_columns(['delivery', 'delivered', 'shipped'])
+                         if pd.api.types.is_datetime64_any_dtype(self.data[col])]
+        if delivery_cols:
+            lead_times = (self.data[delivery_cols[0]] - self.data[order_col]).dt.days
+            return lead_times.where(lead_times >= 0)
+        
+        return pd.Series(np.nan, index=self.data.index)
+    
+    def _find_columns(self, keywords):
+        """
+        Find columns that contain any of the specified keywords
+        """
+        return [col for col in self.data.columns
+                if any(keyword.lower() in col.lower() for keyword in keywords)]
@@ -0,0 +1,201 @@
+import pandas as pd
+import numpy as np
+
+from caching import LRUCache
+
+# Granularities from finest to coarsest, as pandas period frequencies
+GRANULARITIES = {
+    'day': 'D',
+    'week': 'W',
+    'month': 'M',
+    'quarter': 'Q'
+}
+
+# Materialized rollups per (dataset/filter key, date column)
+_ROLLUP_CACHE = LRUCache(maxsize=32)
+
+class TimeRollups:
+    """
+    Materialized time-bucket aggregates (sum, count, min, max) of numeric metrics per date column
+    """
+    
+    def __init__(self, data):
+        """
+        Initialize with supply chain data
+        
+        Args:
+            data (pd.DataFrame): Supply chain dataset
+        """
+        self.data = data
+        self.rollups = {}
+    
+    @classmethod
+    def for_column(cls, data, date_column, cache_key):
+        """
+        Get the rollups of one date column, reusing the cached rollups for the same data
+        
+        Args:
+            data (pd.DataFrame): Supply chain dataset
+            date_column (str): Date column name
+            cache_key (hashable): Identifies the dataset and filter state of data
+            
+        Returns:
+            TimeRollups: Rollups with date_column built
+        """
+        key = (cache_key, date_column)
+        rollups = _ROLLUP_CACHE.get(key)
+        if rollups is None:
+            rollups = cls(data)
+            rollups.build([date_column])
+            _ROLLUP_CACHE.put(key, rollups)
+        return rollups
+    
+    @classmethod
+    def carry_over(cls, cache_key, new_key, data, changed_rows):
+        """
+        Cache the unfiltered rollups of an appended dataset, updated from the cached
+        rollups of the dataset it was appended to
+        
+        Args:
+            cache_key (hashable): Dataset key of the previous dataset
+            new_key (hashable): Dataset key of the appended dataset
+            data (pd.DataFrame): Appended dataset, see appended()
+            changed_rows (np.ndarray): Positions of the replaced and appended rows
+        """
+        for date_column in data.select_dtypes(include=['datetime64']).columns:
+            rollups = _ROLLUP_CACHE.get(((cache_key, ()), date_column))
+            if rollups is not None:
+                _ROLLUP_CACHE.put(((new_key, ()), date_column), rollups.appended(data, changed_rows))
+    
+    @classmethod
+    def discard(cls, dataset_key):
+        """
+        Drop the cached rollups of every filter state of a dataset
+        
+        Args:
+            dataset_key (hashable): First element of the (dataset, filter state) cache keys
+        """
+        _ROLLUP_CACHE.discard_where(
+            lambda key: isinstance(key[0], tuple) and key[0][:1] == (dataset_key,)
+        )
+    
+    def build(self, date_columns=None):
+        """
+        Aggregate every numeric column into day, week, month and quarter buckets
+        
+        Rows are scanned once per date column to build the daily buckets. Coarser buckets
+        are derived from the daily ones.
+        
+        Args:
+            date_columns (list): Date columns to roll up, all datetime columns if omitted
+            
+        Returns:
+            dict: {date_column: {granularity: pd.DataFrame}}
+        """
+        if date_columns is None:
+            date_columns = self.data.select_dtypes(include=['datetime64']).columns.tolist()
+        
+        numeric_cols = self.data.select_dtypes(include=[np.number]).columns.tolist()
+        
+        for date_column in date_columns:
+            days = self.data[date_column].dt.normalize()
+            daily = self.data[numeric_cols].groupby(days).agg(['sum', 'count', 'min', 'max'])
+            daily.index.name = 'bucket'
+            
+            self.rollups[date_column] = {'day': daily}
+            for granularity, freq in list(GRANULARITIES.items())[1:]:
+                self.rollups[date_column][granularity] = self._coarsen(daily, freq)
+        
+        return self.rollups
+    
+    def appended(self, data, changed_rows):
+        """
+        Get the rollups of the data after an append, aggregating the changed rows only
+        
+        The buckets of appended rows are merged into the daily buckets. Days that lost
+        a replaced row are aggregated again from their rows, as a minimum or maximum
+        cannot be taken back.
+        
+        Args:
+            data (pd.DataFrame): Rows of this rollup's data, some of them replaced,
+                followed by the appended rows
+            changed_rows (np.ndarray): Positions in data of the replaced and appended rows
+            
+        Returns:
+            TimeRollups: Rollups of data with the same date columns built
+        """
+        rollups = TimeRollups(data)
+        changed_rows = np.asarray(changed_rows, dtype=np.int64)
+        replaced_rows = changed_rows[changed_rows < len(self.data)]
+        numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+        changed = data.iloc[changed_rows]
+        
+        for date_column, buckets in self.rollups.items():
+            daily = buckets['day']
+            if list(daily.columns.get_level_values(0).unique()) != numeric_cols:
+                rollups.build([date_column])
+                continue
+            
+            stale = pd.DatetimeIndex(self.data[date_column].iloc[replaced_rows].dt.normalize().dropna().unique())
+            days = data[date_column].dt.normalize()
+            in_stale = days.isin(stale)
+            recomputed = data.loc[in_stale, numeric_cols].groupby(days[in_stale]).agg(['sum', 'count', 'min', 'max'])
+            
+            changed_days = changed[date_column].dt.normalize()
+            fresh = ~changed_days.isin(stale)
+            added = changed.loc[fresh, numeric_cols].groupby(changed_days[fresh]).agg(['sum', 'count', 'min', 'max'])
+            
+            aggregations = {column: column[1] if column[1] in ('min', 'max') else 'sum'
+                            for column in daily.columns}
+            daily = pd.concat([daily.drop(stale, errors='ignore'), added, recomputed]).groupby(level=0).agg(aggregations)
+            daily.index.name = 'bucket'
+            
+            rollups.rollups[date_column] = {'day': daily}
+            for granularity, freq in list(GRANULARITIES.items())[1:]:
+                rollups.rollups[date_column][granularity] = self._coarsen(daily, freq)
+        
+        return rollups
+    
+    def choose_granularity(self, date_column, max_points):
+        """
+        Pick the finest granularity whose number of buckets fits the point budget
+        
+        Args:
+            date_column (str): Date column name
+            max_points (int): Maximum number of buckets to plot
+            
+        Returns:
+            str: Granularity name, the coarsest one if none fits
+        """
+        for granularity in GRANULARITIES:
+            if len(self.rollups[date_column][granularity]) <= max_points:
+                return granularity
+        return list(GRANULARITIES)[-1]
+    
+    def series(self, date_column, value_column, granularity):
+        """
+        Get the bucketed statistics of one metric
+        
+        Args:
+            date_column (str): Date column name
+            value_column (str): Numeric column name
+            granularity (str): 'day', 'week', 'month' or 'quarter'
+            
+        Returns:
+            pd.DataFrame: sum, count, min, max and mean per bucket, empty buckets removed
+        """
+        stats = self.rollups[date_column][granularity][value_column].copy()
+        stats = stats[stats['count'] > 0]
+        stats['mean'] = stats['sum'] / stats['count']
+        return stats
+    
+    def _coarsen(self, daily, freq):
+        """
+        Derive coarser buckets from daily buckets
+        """
+        buckets = daily.index.to_period(freq).start_time
+        aggregations = {column: column[1] if column[1] in ('min', 'max') else 'sum'
+                        for column in daily.columns}
+        coarse = daily.groupby(buckets).agg(aggregations)
+        coarse.index.name = 'bucket'
+        return coarse
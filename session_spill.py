@@ -0,0 +1,308 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+import weakref
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from indexes import DatasetIndex
+from kpi_calculator import KPICalculator
+from rollups import TimeRollups
+
+class SessionSlot:
+    """
+    Heavy state of one session: its dataset handle, KPIs and recommendations
+    """
+    
+    def __init__(self):
+        """
+        Initialize an empty slot
+        """
+        self.handle = None
+        self.kpis = None
+        self.recommendations = None
+        self.last_active = time.monotonic()
+        self.spilled = None
+        self.lock = threading.RLock()
+    
+    @property
+    def data(self):
+        """
+        Processed dataframe of the session, None before upload or while spilled
+        """
+        return self.handle.data if self.handle is not None else None
+    
+    def set_dataset(self, handle):
+        """
+        Replace the dataset handle of the session, releasing the previous one
+        """
+        with self.lock:
+            if self.handle is not None and self.handle is not handle:
+                self.handle.release()
+            self.handle = handle
+
+class SessionSpiller:
+    """
+    Moves the data of idle sessions into compressed Arrow IPC buffers and restores it
+    on the next interaction
+    
+    Each dataset is spilled once, however many sessions hold it, in memory or as a file
+    in a spill directory. Its frame is freed when no active session references it.
+    KPIs and recommendations are pickled and compressed with the same codec.
+    """
+    
+    def __init__(self, store, idle_seconds=900, spill_dir=None, compression='zstd', check_interval=60):
+        """
+        Initialize the spiller
+        
+        Args:
+            store (DatasetStore): Store holding the session datasets
+            idle_seconds (float): Inactivity after which a session is spilled
+            spill_dir (str): Directory of the spill files, None to keep spills in memory
+            compression (str): Arrow IPC codec ('zstd', 'lz4') or None. Uncompressed disk
+                spills are memory-mapped, so restoring them reads no data up front.
+            check_interval (float): Seconds between background sweeps
+        """
+        self.store = store
+        self.idle_seconds = idle_seconds
+        self.spill_dir = spill_dir
+        self.compression = compression
+        self.check_interval = check_interval
+        self._slots = weakref.WeakSet()
+        self._spills = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.spills = 0
+        self.rehydrations = 0
+        self.failures = 0
+        
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+    
+    def new_slot(self):
+        """
+        Create the slot of a new session
+        
+        Returns:
+            SessionSlot: Slot tracked by the spiller
+        """
+        slot = SessionSlot()
+        with self._lock:
+            self._slots.add(slot)
+        return slot
+    
+    def activate(self, slot):
+        """
+        Mark a session as active, restoring its data if it was spilled
+        
+        Args:
+            slot (SessionSlot): Slot of the session
+        """
+        with slot.lock:
+            slot.last_active = time.monotonic()
+            if slot.spilled is not None:
+                self._rehydrate(slot)
+    
+    def sweep(self):
+        """
+        Spill every session idle for longer than idle_seconds
+        
+        Returns:
+            int: Number of sessions spilled
+        """
+        now = time.monotonic()
+        with self._lock:
+            slots = list(self._slots)
+        
+        spilled = 0
+        for slot in slots:
+            if slot.spilled is None and slot.handle is not None and now - slot.last_active >= self.idle_seconds:
+                try:
+                    spilled += self.spill(slot)
+                except (pa.ArrowException, OSError, pickle.PicklingError):
+                    # Data Arrow cannot represent (e.g. mixed-type columns) stays in memory
+                    self.failures += 1
+                    slot.last_active = now
+        
+        self._drop_unused_spills()
+        return spilled
+    
+    def spill(self, slot):
+        """
+        Spill the data of one session and free its frame if no other session uses it
+        
+        Args:
+            slot (SessionSlot): Slot of the session
+            
+        Returns:
+            int: 1 if the session was spilled, 0 if it had nothing to spill
+        """
+        with slot.lock:
+            if slot.spilled is not None or slot.handle is None:
+                return 0
+            
+            digest = slot.handle.digest
+            state = pickle.dumps((slot.kpis, slot.recommendations), protocol=pickle.HIGHEST_PROTOCOL)
+            
+            # Under the spiller lock so the new spill is never dropped as unused in between
+            with self._lock:
+                self._write_dataset(digest, slot.handle.data)
+                slot.spilled = {
+                    'digest': digest,
+                    'state': self._compress(state),
+                    'state_size': len(state)
+                }
+            
+            slot.handle.release()
+            slot.handle = None
+            slot.kpis = None
+            slot.recommendations = None
+        
+        if self.store.refcount(digest) == 0 and self.store.discard(digest):
+            # Derived caches keep references to the frame as well
+            KPICalculator.discard(digest)
+            DatasetIndex.discard(digest)
+            TimeRollups.discard(digest)
+        
+        with self._lock:
+            self.spills += 1
+        return 1
+    
+    def _rehydrate(self, slot):
+        """
+        Restore the dataset, KPIs and recommendations of a spilled session
+        """
+        spilled = slot.spilled
+        digest = spilled['digest']
+        
+        # Sessions still holding the dataset share it, otherwise it is read back from the spill
+        slot.handle = self.store.acquire(digest, lambda: self._read_dataset(digest))
+        slot.kpis, slot.recommendations = pickle.loads(self._decompress(spilled['state'], spilled['state_size']))
+        slot.spilled = None
+        
+        with self._lock:
+            self.rehydrations += 1
+        self._drop_unused_spills()
+    
+    def _write_dataset(self, digest, data):
+        """
+        Write a dataset as an Arrow IPC file unless it is already spilled
+        """
+        with self._lock:
+            if digest in self._spills:
+                return
+            
+            table = pa.Table.from_pandas(data)
+            frame_bytes = self.store.size(digest)
+            options = ipc.IpcWriteOptions(compression=self.compression)
+            
+            if self.spill_dir is None:
+                sink = pa.BufferOutputStream()
+                with ipc.new_file(sink, table.schema, options=options) as writer:
+                    writer.write_table(table, max_chunksize=65536)
+                buffer = sink.getvalue()
+                self._spills[digest] = {'buffer': buffer, 'path': None,
+                                        'bytes': buffer.size, 'frame_bytes': frame_bytes}
+            else:
+                path = os.path.join(self.spill_dir, f"{digest}.arrow")
+                fd, temp_path = tempfile.mkstemp(dir=self.spill_dir, suffix='.tmp')
+                os.close(fd)
+                with pa.OSFile(temp_path, 'wb') as sink:
+                    with ipc.new_file(sink, table.schema, options=options) as writer:
+                        writer.write_table(table, max_chunksize=65536)
+                os.replace(temp_path, path)
+                self._spills[digest] = {'buffer': None, 'path': path,
+                                        'bytes': os.path.getsize(path), 'frame_bytes': frame_bytes}
+    
+    def _read_dataset(self, digest):
+        """
+        Read a spilled dataset back into a dataframe
+        """
+        with self._lock:
+            entry = self._spills[digest]
+        
+        if entry['path'] is None:
+            source = pa.BufferReader(entry['buffer'])
+        else:
+            source = pa.memory_map(entry['path'])
+        
+        # Columns are converted one at a time and their Arrow buffers freed as they go
+        table = ipc.open_file(source).read_all()
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    
+    def _drop_unused_spills(self):
+        """
+        Remove the spilled datasets no spilled session refers to anymore
+        """
+        with self._lock:
+            referenced = {slot.spilled['digest'] for slot in self._slots if slot.spilled is not None}
+            unused = [digest for digest in self._spills if digest not in referenced]
+            entries = [self._spills.pop(digest) for digest in unused]
+        
+        for entry in entries:
+            if entry['path'] is not None:
+                try:
+                    os.remove(entry['path'])
+                except OSError:
+                    pass  # Still memory-mapped on platforms that lock mapped files
+    
+    def _compress(self, payload):
+        if self.compression is None:
+            return payload
+        return pa.compress(payload, codec=self.compression, asbytes=True)
+    
+    def _decompress(self, payload, size):
+        if self.compression is None:
+            return payload
+        return pa.decompress(payload, decompressed_size=size, codec=self.compression, asbytes=True)
+    
+    def start(self):
+        """
+        Start sweeping idle sessions in a background thread
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='session-spiller', daemon=True)
+            self._thread.start()
+    
+    def close(self):
+        """
+        Stop the background thread
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            self.sweep()
+    
+    def stats(self):
+        """
+        Get spill statistics
+        
+        Memory reclaimed counts the frames of spilled datasets that are no longer in the
+        dataset store, minus the spill buffers kept in memory.
+        
+        Returns:
+            dict: Sessions, spilled sessions and datasets, spill size and memory reclaimed
+        """
+        with self._lock:
+            slots = list(self._slots)
+            spills = dict(self._spills)
+            counters = {'spills': self.spills, 'rehydrations': self.rehydrations, 'failures': self.failures}
+        
+        freed = sum(entry['frame_bytes'] for digest, entry in spills.items() if digest not in self.store)
+        in_memory = sum(entry['bytes'] for entry in spills.values() if entry['path'] is None)
+        return {
+            'sessions': len(slots),
+            'spilled_sessions': sum(1 for slot in slots if slot.spilled is not None),
+            'spilled_datasets': len(spills),
+            'spill_bytes': sum(entry['bytes'] for entry in spills.values()),
+            'reclaimed_bytes': max(freed - in_memory, 0),
+            **counters
+        }
@@ -0,0 +1,90 @@
+import sqlite3
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from data_generator import SupplyChainDataGenerator
+from data_processor import DataProcessor
+from database_source import DatabaseSource
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    SQLite file with an 'orders' table of generated rows, dates stored as text in
+    several formats
+    """
+    path = str(tmp_path / 'orders.sqlite')
+    raw = SupplyChainDataGenerator(seed=7).generate(3000)
+    with sqlite3.connect(path) as connection:
+        raw.to_sql('orders', connection, index=False)
+    return path, raw
+
+def test_load_database_matches_clean_data(database):
+    path, raw = database
+    source = DatabaseSource(path, batch_rows=400)
+    filters = (
+        ('order_date', (date(2023, 6, 1), date(2024, 3, 31))),
+        ('supplier', ('Supplier Alpha', 'Supplier Beta'))
+    )
+    
+    loaded = DataProcessor().load_database(source, 'orders', filters)
+    
+    days = pd.to_datetime(raw['order_date'], errors='coerce', format='mixed').dt.normalize()
+    selected = ((days >= '2023-06-01') & (days <= '2024-03-31') &
+                raw['supplier'].isin(['Supplier Alpha', 'Supplier Beta']))
+    expected = DataProcessor().clean_data(raw[selected].reset_index(drop=True))
+    pd.testing.assert_frame_equal(loaded, expected, check_index_type=False)
+    source.close()
+
+def test_text_date_bounds_are_parsed(database):
+    path, raw = database
+    source = DatabaseSource(path)
+    dates = pd.to_datetime(raw['order_date'], errors='coerce', format='mixed')
+    
+    assert not source.compares_dates('orders', 'order_date')
+    assert source.date_bounds('orders', 'order_date') == (dates.min(), dates.max())
+    source.close()
+
+@pytest.mark.parametrize('paramstyle', sorted(DatabaseSource.PLACEHOLDERS))
+def test_parameters_bind_in_every_paramstyle(database, paramstyle):
+    path, raw = database
+    reference = DatabaseSource(path)
+    source = DatabaseSource(lambda: sqlite3.connect(path, check_same_thread=False), paramstyle=paramstyle)
+    filters = (
+        ('location', ('DC Lyon', 'DC Milan', None)),
+        ('quantity_ordered', tuple(raw['quantity_ordered'].unique()[:20]))
+    )
+    
+    sql, params = source.build_query('orders', filters)
+    expected_sql, expected_params = reference.build_query('orders', filters)
+    
+    # sqlite3 binds qmark, numeric and named parameters; the printf styles are turned
+    # into qmark and named ones
+    if paramstyle == 'format':
+        sql = sql % tuple('?' * len(params))
+    elif paramstyle == 'pyformat':
+        sql = sql % {name: f":{name}" for name in params}
+    
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute(sql, params).fetchall()
+        expected_rows = connection.execute(expected_sql, expected_params).fetchall()
+    assert len(rows) > 0
+    assert sorted(rows, key=repr) == sorted(expected_rows, key=repr)
+    reference.close()
+    source.close()
+
+def test_abandoned_batch_reader_returns_its_connection(database):
+    path, _ = database
+    source = DatabaseSource(path, pool_size=1, batch_rows=100)
+    source.pool.timeout = 1
+    
+    batches = source.iter_batches('orders')
+    next(batches)
+    batches.close()
+    
+    assert source.pool._opened == 1
+    assert source.pool._idle.qsize() == 1
+    # The only connection is free again
+    assert len(source.preview('orders', rows=5)) == 5
+    source.close()
@@ -13,6 +13,46 @@ TRANSLATIONS = {
         'data_upload': '📁 Téléchargement de Données',
         'upload_file': 'Téléchargez vos données Excel/CSV',
         'upload_help': 'Téléchargez des données de chaîne d\'approvisionnement incluant stocks, ventes, délais, coûts, etc.',
+        'precompute_charts': 'Précalculer les graphiques',
+        'precompute_charts_help': 'Construit les graphiques par défaut en arrière-plan après le téléchargement pour un affichage immédiat.',
+        'show_diagnostics': 'Afficher les diagnostics',
+        'show_diagnostics_help': 'Temps, lignes et mémoire de chaque étape du traitement',
+        'compute_engine': 'Moteur de calcul',
+        'compute_engine_help': 'Moteur évaluant les filtres et agrégeant les KPI. Automatique utilise DuckDB pour les grands jeux de données s\'il est installé.',
+        'engine_auto': 'Automatique',
+        'engine_pandas': 'pandas (mémoire)',
+        'engine_sqlite': 'SQLite',
+        'engine_duckdb': 'DuckDB (Parquet)',
+        'database_source': 'Source base de données',
+        'database_connection': 'Connexion',
+        'database_connection_help': 'Chemin d\'un fichier SQLite ou URL SQLAlchemy, par exemple postgresql://user@host/db',
+        'database_table': 'Table',
+        'no_database_tables': 'Aucune table dans cette base de données',
+        'load_from_database': 'Charger depuis la base',
+        'database_error': 'Erreur de base de données :',
+        'database_text_dates': 'Les dates de cette colonne sont du texte dans plusieurs formats : la plage de dates est appliquée après la lecture des lignes.',
+        'history': 'Historique',
+        'history_directory': 'Dossier de l\'historique',
+        'history_directory_help': 'Nom du dossier, dans le dossier des historiques du serveur, où le jeu de données est conservé et complété par les fichiers quotidiens. Videz le champ pour fermer l\'historique.',
+        'history_directory_outside': 'Ce dossier est en dehors du dossier des historiques du serveur. Indiquez le nom d\'un dossier qu\'il contient.',
+        'no_history': 'Aucun historique dans ce dossier. Chargez un fichier pour le créer.',
+        'history_key_columns': 'Colonnes clés',
+        'history_key_columns_help': 'Une ligne ajoutée dont la clé existe déjà remplace la ligne conservée.',
+        'duplicate_key_rows': 'lignes partagent leur clé avec une autre ligne. Choisissez des colonnes qui identifient chaque ligne.',
+        'save_history': 'Enregistrer comme historique',
+        'history_segments': 'Segments',
+        'delta_file': 'Fichier du jour à ajouter',
+        'append_delta': 'Ajouter à l\'historique',
+        'delta_appended': 'Fichier ajouté :',
+        'rows_inserted': 'lignes ajoutées',
+        'rows_updated': 'lignes mises à jour',
+        'delta_rejected': 'Fichier refusé :',
+        'history_error': 'Erreur de l\'historique :',
+        'diagnostics': 'Diagnostics',
+        'no_spans_recorded': 'Aucune étape enregistrée pendant cette exécution.',
+        'run_total_time': 'Durée totale des étapes',
+        'download_run_spans': '📥 Exporter cette exécution (JSONL)',
+        'download_recent_spans': '📥 Exporter les étapes récentes (JSONL)',
         'filters': '🔍 Filtres',
         'select_date_column': 'Sélectionnez la Colonne Date',
         'date_range': 'Plage de Dates',
@@ -35,6 +75,19 @@ TRANSLATIONS = {
         'kpi_analysis': '🔍 Analyse KPI',
         'recommendations': '🧠 Recommandations',
         'raw_data': '📋 Données Brutes',
+        'navigation': 'Navigation',
+        'view_render_times': 'Temps de rendu des vues',
+        'idle_sessions_spilled': 'Sessions inactives déchargées',
+        'memory_reclaimed': 'Mémoire libérée',
+        'stage_queued': 'En attente',
+        'stage_reading': 'Lecture du fichier',
+        'stage_parsing': 'Analyse et nettoyage',
+        'stage_cleaning': 'Nettoyage',
+        'stage_finalizing': 'Finalisation',
+        'stage_done': 'Terminé',
+        'rows_parsed': 'lignes traitées',
+        'rows_per_second': 'lignes/s',
+        'preliminary_kpis': 'KPI préliminaires (lignes traitées jusqu\'ici)',
         
         # Dashboard
         'supply_chain_dashboard': 'Tableau de Bord Supply Chain',
@@ -64,11 +117,25 @@ TRANSLATIONS = {
         'select_column': 'Sélectionnez la Colonne',
         'no_numeric_for_distribution': 'Aucune colonne numérique disponible pour l\'analyse de distribution.',
         'not_enough_numeric': 'Pas assez de colonnes numériques pour l\'analyse de corrélation.',
+        'correlation_view': 'Vue de Corrélation',
+        'correlation_heatmap': 'Matrice Complète',
+        'strongest_pairs': 'Paires les Plus Corrélées',
+        'number_of_pairs': 'Nombre de Paires',
         'select_date_column_viz': 'Sélectionnez la Colonne Date',
         'select_value_column': 'Sélectionnez la Colonne Valeur',
         'date_numeric_required': 'Colonnes de date et numériques requises pour l\'analyse de série temporelle.',
         'select_category_column': 'Sélectionnez la Colonne Catégorie',
         'category_numeric_required': 'Colonnes de catégorie et numériques requises pour l\'analyse par catégorie.',
+        'figure_cache': 'Cache des graphiques',
+        'cache_hits': 'succès',
+        'cache_misses': 'échecs',
+        'cache_entries': 'graphiques',
+        'downsampled_points': '{displayed:,} points affichés sur {original:,} (réduction x{ratio:.1f})',
+        'downsampled_buckets': '{label} : {displayed:,} intervalles pour {original:,} lignes (réduction x{ratio:.1f})',
+        'day_averages': 'Moyennes journalières',
+        'week_averages': 'Moyennes hebdomadaires',
+        'month_averages': 'Moyennes mensuelles',
+        'quarter_averages': 'Moyennes trimestrielles',
         
         # KPI Analysis
         'kpi_analysis_title': '🔍 Analyse KPI',
@@ -93,6 +160,10 @@ TRANSLATIONS = {
         'future_considerations': '💡 Considérations Futures',
         'export_recommendations': '📤 Exporter les Recommandations',
         'generate_report': 'Générer le Rapport',
+        'report_format': 'Format du Rapport',
+        'rendering_report': 'Génération des graphiques du rapport...',
+        'charts_rendered': 'Graphiques générés',
+        'charts_from_cache': 'Graphiques en cache',
         'download_report': 'Télécharger le Rapport',
         'recommendations_after_analysis': 'Les recommandations business apparaîtront ici une fois les données analysées.',
         
@@ -106,6 +177,9 @@ TRANSLATIONS = {
         'export_data': '📤 Exporter les Données',
         'download_csv': 'Télécharger CSV',
         'download_excel': 'Télécharger Excel',
+        'prepare_csv': 'Préparer l\'Export CSV',
+        'prepare_excel': 'Préparer l\'Export Excel',
+        'preparing_export': 'Préparation du fichier d\'export...',
         
         # Status indicators
         'good': '🟢 Bon',
@@ -159,6 +233,46 @@ TRANSLATIONS = {
         'data_upload': '📁 Data Upload',
         'upload_file': 'Upload your Excel/CSV data',
         'upload_help': 'Upload supply chain data including stocks, sales, delays, costs, etc.',
+        'precompute_charts': 'Precompute charts',
+        'precompute_charts_help': 'Builds the default charts in the background after upload so they display instantly.',
+        'show_diagnostics': 'Show Diagnostics',
+        'show_diagnostics_help': 'Time, rows and memory of every processing stage',
+        'compute_engine': 'Compute Engine',
+        'compute_engine_help': 'Engine evaluating the filters and aggregating the KPIs. Automatic uses DuckDB for large datasets when it is installed.',
+        'engine_auto': 'Automatic',
+        'engine_pandas': 'pandas (In Memory)',
+        'engine_sqlite': 'SQLite',
+        'engine_duckdb': 'DuckDB (Parquet)',
+        'database_source': 'Database Source',
+        'database_connection': 'Connection',
+        'database_connection_help': 'Path of an SQLite file or SQLAlchemy URL, e.g. postgresql://user@host/db',
+        'database_table': 'Table',
+        'no_database_tables': 'No table in this database',
+        'load_from_database': 'Load from Database',
+        'database_error': 'Database error:',
+        'database_text_dates': 'This column stores dates as text in several formats: the date range is applied after the rows are read.',
+        'history': 'History',
+        'history_directory': 'History Folder',
+        'history_directory_help': 'Name of the folder, inside the server\'s history folder, where the dataset is kept and extended with daily files. Clear the field to close the history.',
+        'history_directory_outside': 'This folder is outside the server\'s history folder. Enter the name of a folder inside it.',
+        'no_history': 'No history in this folder. Load a file to create one.',
+        'history_key_columns': 'Key Columns',
+        'history_key_columns_help': 'An appended row whose key is already stored replaces the stored row.',
+        'duplicate_key_rows': 'rows share their key with another row. Choose columns that identify every row.',
+        'save_history': 'Save as History',
+        'history_segments': 'Segments',
+        'delta_file': 'Daily File to Append',
+        'append_delta': 'Append to History',
+        'delta_appended': 'File appended:',
+        'rows_inserted': 'rows inserted',
+        'rows_updated': 'rows updated',
+        'delta_rejected': 'File rejected:',
+        'history_error': 'History error:',
+        'diagnostics': 'Diagnostics',
+        'no_spans_recorded': 'No stage was recorded during this run.',
+        'run_total_time': 'Total Stage Time',
+        'download_run_spans': '📥 Export This Run (JSONL)',
+        'download_recent_spans': '📥 Export Recent Stages (JSONL)',
         'filters': '🔍 Filters',
         'select_date_column': 'Select Date Column',
         'date_range': 'Date Range',
@@ -181,6 +295,19 @@ TRANSLATIONS = {
         'kpi_analysis': '🔍 KPI Analysis',
         'recommendations': '🧠 Recommendations',
         'raw_data': '📋 Raw Data',
+        'navigation': 'Navigation',
+        'view_render_times': 'View Render Times',
+        'idle_sessions_spilled': 'Idle Sessions Spilled',
+        'memory_reclaimed': 'Memory Reclaimed',
+        'stage_queued': 'Queued',
+        'stage_reading': 'Reading File',
+        'stage_parsing': 'Parsing And Cleaning',
+        'stage_cleaning': 'Cleaning',
+        'stage_finalizing': 'Finalizing',
+        'stage_done': 'Done',
+        'rows_parsed': 'rows processed',
+        'rows_per_second': 'rows/s',
+        'preliminary_kpis': 'Preliminary KPIs (Rows Processed So Far)',
         
         # Dashboard
         'supply_chain_dashboard': 'Supply Chain Dashboard',
@@ -210,11 +337,25 @@ TRANSLATIONS = {
         'select_column': 'Select Column',
         'no_numeric_for_distribution': 'No numeric columns available for distribution analysis.',
         'not_enough_numeric': 'Not enough numeric columns for correlation analysis.',
+        'correlation_view': 'Correlation View',
+        'correlation_heatmap': 'Full Matrix',
+        'strongest_pairs': 'Strongest Pairs',
+        'number_of_pairs': 'Number of Pairs',
         'select_date_column_viz': 'Select Date Column',
         'select_value_column': 'Select Value Column',
         'date_numeric_required': 'Date and numeric columns required for time series analysis.',
         'select_category_column': 'Select Category Column',
         'category_numeric_required': 'Category and numeric columns required for category analysis.',
+        'figure_cache': 'Figure cache',
+        'cache_hits': 'hits',
+        'cache_misses': 'misses',
+        'cache_entries': 'figures',
+        'downsampled_points': 'Showing {displayed:,} of {original:,} points ({ratio:.1f}x reduction)',
+        'downsampled_buckets': '{label}: {displayed:,} buckets from {original:,} rows ({ratio:.1f}x reduction)',
+        'day_averages': 'Daily averages',
+        'week_averages': 'Weekly averages',
+        'month_averages': 'Monthly averages',
+        'quarter_averages': 'Quarterly averages',
         
         # KPI Analysis
         'kpi_analysis_title': '🔍 KPI Analysis',
@@ -239,6 +380,10 @@ TRANSLATIONS = {
         'future_considerations': '💡 Future Considerations',
         'export_recommendations': '📤 Export Recommendations',
         'generate_report': 'Generate Report',
+        'report_format': 'Report Format',
+        'rendering_report': 'Rendering report charts...',
+        'charts_rendered': 'Charts Rendered',
+        'charts_from_cache': 'Charts From Cache',
         'download_report': 'Download Report',
         'recommendations_after_analysis': 'Business recommendations will appear here once data is analyzed.',
         
@@ -252,6 +397,9 @@ TRANSLATIONS = {
         'export_data': '📤 Export Data',
         'download_csv': 'Download CSV',
         'download_excel': 'Download Excel',
+        'prepare_csv': 'Prepare CSV Export',
+        'prepare_excel': 'Prepare Excel Export',
+        'preparing_export': 'Preparing export file...',
         
         # Status indicators
         'good': '🟢 Good',
@@ -305,6 +453,46 @@ TRANSLATIONS = {
         'data_upload': '📁 Carga de Datos',
         'upload_file': 'Suba sus datos Excel/CSV',
         'upload_help': 'Suba datos de cadena de suministro incluyendo inventarios, ventas, retrasos, costos, etc.',
+        'precompute_charts': 'Precalcular gráficos',
+        'precompute_charts_help': 'Construye los gráficos predeterminados en segundo plano después de la carga para mostrarlos al instante.',
+        'show_diagnostics': 'Mostrar diagnósticos',
+        'show_diagnostics_help': 'Tiempo, filas y memoria de cada etapa del procesamiento',
+        'compute_engine': 'Motor de cálculo',
+        'compute_engine_help': 'Motor que evalúa los filtros y agrega los KPI. Automático usa DuckDB para grandes conjuntos de datos si está instalado.',
+        'engine_auto': 'Automático',
+        'engine_pandas': 'pandas (memoria)',
+        'engine_sqlite': 'SQLite',
+        'engine_duckdb': 'DuckDB (Parquet)',
+        'database_source': 'Fuente de base de datos',
+        'database_connection': 'Conexión',
+        'database_connection_help': 'Ruta de un archivo SQLite o URL de SQLAlchemy, por ejemplo postgresql://user@host/db',
+        'database_table': 'Tabla',
+        'no_database_tables': 'No hay tablas en esta base de datos',
+        'load_from_database': 'Cargar desde la base de datos',
+        'database_error': 'Error de base de datos:',
+        'database_text_dates': 'Esta columna guarda las fechas como texto en varios formatos: el rango de fechas se aplica después de leer las filas.',
+        'history': 'Historial',
+        'history_directory': 'Carpeta del historial',
+        'history_directory_help': 'Nombre de la carpeta, dentro de la carpeta de historiales del servidor, donde se guarda el conjunto de datos y se amplía con los archivos diarios. Vacíe el campo para cerrar el historial.',
+        'history_directory_outside': 'Esta carpeta está fuera de la carpeta de historiales del servidor. Indique el nombre de una carpeta dentro de ella.',
+        'no_history': 'No hay historial en esta carpeta. Cargue un archivo para crearlo.',
+        'history_key_columns': 'Columnas clave',
+        'history_key_columns_help': 'Una fila añadida cuya clave ya existe reemplaza la fila guardada.',
+        'duplicate_key_rows': 'filas comparten su clave con otra fila. Elija columnas que identifiquen cada fila.',
+        'save_history': 'Guardar como historial',
+        'history_segments': 'Segmentos',
+        'delta_file': 'Archivo diario para añadir',
+        'append_delta': 'Añadir al historial',
+        'delta_appended': 'Archivo añadido:',
+        'rows_inserted': 'filas insertadas',
+        'rows_updated': 'filas actualizadas',
+        'delta_rejected': 'Archivo rechazado:',
+        'history_error': 'Error del historial:',
+        'diagnostics': 'Diagnósticos',
+        'no_spans_recorded': 'No se registró ninguna etapa en esta ejecución.',
+        'run_total_time': 'Tiempo total de las etapas',
+        'download_run_spans': '📥 Exportar esta ejecución (JSONL)',
+        'download_recent_spans': '📥 Exportar etapas recientes (JSONL)',
         'filters': '🔍 Filtros',
         'select_date_column': 'Seleccione Columna de Fecha',
         'date_range': 'Rango de Fechas',
@@ -327,6 +515,19 @@ TRANSLATIONS = {
         'kpi_analysis': '🔍 Análisis KPI',
         'recommendations': '🧠 Recomendaciones',
         'raw_data': '📋 Datos Crudos',
+        'navigation': 'Navegación',
+        'view_render_times': 'Tiempos de renderizado de las vistas',
+        'idle_sessions_spilled': 'Sesiones inactivas descargadas',
+        'memory_reclaimed': 'Memoria liberada',
+        'stage_queued': 'En espera',
+        'stage_reading': 'Leyendo archivo',
+        'stage_parsing': 'Analizando y limpiando',
+        'stage_cleaning': 'Limpiando',
+        'stage_finalizing': 'Finalizando',
+        'stage_done': 'Terminado',
+        'rows_parsed': 'filas procesadas',
+        'rows_per_second': 'filas/s',
+        'preliminary_kpis': 'KPI preliminares (filas procesadas hasta ahora)',
         
         # Dashboard
         'supply_chain_dashboard': 'Tablero de Cadena de Suministro',
@@ -356,11 +557,25 @@ TRANSLATIONS = {
         'select_column': 'Seleccione Columna',
         'no_numeric_for_distribution': 'No hay columnas numéricas disponibles para análisis de distribución.',
         'not_enough_numeric': 'No hay suficientes columnas numéricas para análisis de correlación.',
+        'correlation_view': 'Vista de Correlación',
+        'correlation_heatmap': 'Matriz Completa',
+        'strongest_pairs': 'Pares Más Correlacionados',
+        'number_of_pairs': 'Número de Pares',
         'select_date_column_viz': 'Seleccione Columna de Fecha',
         'select_value_column': 'Seleccione Columna de Valor',
         'date_numeric_required': 'Se requieren columnas de fecha y numéricas para análisis de serie de tiempo.',
         'select_category_column': 'Seleccione Columna de Categoría',
         'category_numeric_required': 'Se requieren columnas de categoría y numéricas para análisis por categoría.',
+        'figure_cache': 'Caché de gráficos',
+        'cache_hits': 'aciertos',
+        'cache_misses': 'fallos',
+        'cache_entries': 'gráficos',
+        'downsampled_points': 'Mostrando {displayed:,} de {original:,} puntos (reducción x{ratio:.1f})',
+        'downsampled_buckets': '{label}: {displayed:,} intervalos de {original:,} filas (reducción x{ratio:.1f})',
+        'day_averages': 'Promedios diarios',
+        'week_averages': 'Promedios semanales',
+        'month_averages': 'Promedios mensuales',
+        'quarter_averages': 'Promedios trimestrales',
         
         # KPI Analysis
         'kpi_analysis_title': '🔍 Análisis KPI',
@@ -385,6 +600,10 @@ TRANSLATIONS = {
         'future_considerations': '💡 Consideraciones Futuras',
         'export_recommendations': '📤 Exportar Recomendaciones',
         'generate_report': 'Generar Reporte',
+        'report_format': 'Formato del Reporte',
+        'rendering_report': 'Generando los gráficos del reporte...',
+        'charts_rendered': 'Gráficos generados',
+        'charts_from_cache': 'Gráficos en caché',
         'download_report': 'Descargar Reporte',
         'recommendations_after_analysis': 'Las recomendaciones empresariales aparecerán aquí una vez que se analicen los datos.',
         
@@ -398,6 +617,9 @@ TRANSLATIONS = {
         'export_data': '📤 Exportar Datos',
         'download_csv': 'Descargar CSV',
         'download_excel': 'Descargar Excel',
+        'prepare_csv': 'Preparar Exportación CSV',
+        'prepare_excel': 'Preparar Exportación Excel',
+        'preparing_export': 'Preparando el archivo de exportación...',
         
         # Status indicators
         'good': '🟢 Bueno',
@@ -451,6 +673,46 @@ TRANSLATIONS = {
         'data_upload': '📁 Загрузка данных',
         'upload_file': 'Загрузите ваши данные Excel/CSV',
         'upload_help': 'Загрузите данные цепи поставок, включая запасы, продажи, задержки, затраты и т.д.',
+        'precompute_charts': 'Предварительно строить графики',
+        'precompute_charts_help': 'Строит графики по умолчанию в фоновом режиме после загрузки для мгновенного отображения.',
+        'show_diagnostics': 'Показать диагностику',
+        'show_diagnostics_help': 'Время, строки и память каждого этапа обработки',
+        'compute_engine': 'Вычислительный движок',
+        'compute_engine_help': 'Движок, применяющий фильтры и агрегирующий KPI. Автоматический режим использует DuckDB для больших наборов данных, если он установлен.',
+        'engine_auto': 'Автоматически',
+        'engine_pandas': 'pandas (в памяти)',
+        'engine_sqlite': 'SQLite',
+        'engine_duckdb': 'DuckDB (Parquet)',
+        'database_source': 'Источник: база данных',
+        'database_connection': 'Подключение',
+        'database_connection_help': 'Путь к файлу SQLite или URL SQLAlchemy, например postgresql://user@host/db',
+        'database_table': 'Таблица',
+        'no_database_tables': 'В этой базе данных нет таблиц',
+        'load_from_database': 'Загрузить из базы данных',
+        'database_error': 'Ошибка базы данных:',
+        'database_text_dates': 'Даты в этом столбце хранятся как текст в разных форматах: диапазон дат применяется после чтения строк.',
+        'history': 'История',
+        'history_directory': 'Папка истории',
+        'history_directory_help': 'Имя папки внутри папки историй сервера, где хранится набор данных, пополняемый ежедневными файлами. Очистите поле, чтобы закрыть историю.',
+        'history_directory_outside': 'Эта папка находится вне папки историй сервера. Укажите имя папки внутри неё.',
+        'no_history': 'В этой папке нет истории. Загрузите файл, чтобы создать её.',
+        'history_key_columns': 'Ключевые столбцы',
+        'history_key_columns_help': 'Добавленная строка с уже сохранённым ключом заменяет сохранённую строку.',
+        'duplicate_key_rows': 'строк имеют тот же ключ, что и другая строка. Выберите столбцы, однозначно определяющие каждую строку.',
+        'save_history': 'Сохранить как историю',
+        'history_segments': 'Сегменты',
+        'delta_file': 'Ежедневный файл для добавления',
+        'append_delta': 'Добавить в историю',
+        'delta_appended': 'Файл добавлен:',
+        'rows_inserted': 'строк добавлено',
+        'rows_updated': 'строк обновлено',
+        'delta_rejected': 'Файл отклонён:',
+        'history_error': 'Ошибка истории:',
+        'diagnostics': 'Диагностика',
+        'no_spans_recorded': 'За этот запуск этапы не записаны.',
+        'run_total_time': 'Общее время этапов',
+        'download_run_spans': '📥 Экспорт этого запуска (JSONL)',
+        'download_recent_spans': '📥 Экспорт последних этапов (JSONL)',
         'filters': '🔍 Фильтры',
         'select_date_column': 'Выберите столбец даты',
         'date_range': 'Диапазон дат',
@@ -473,6 +735,19 @@ TRANSLATIONS = {
         'kpi_analysis': '🔍 Анализ KPI',
         'recommendations': '🧠 Рекомендации',
         'raw_data': '📋 Сырые данные',
+        'navigation': 'Навигация',
+        'view_render_times': 'Время отрисовки представлений',
+        'idle_sessions_spilled': 'Выгружено неактивных сессий',
+        'memory_reclaimed': 'Освобождено памяти',
+        'stage_queued': 'В очереди',
+        'stage_reading': 'Чтение файла',
+        'stage_parsing': 'Разбор и очистка',
+        'stage_cleaning': 'Очистка',
+        'stage_finalizing': 'Завершение',
+        'stage_done': 'Готово',
+        'rows_parsed': 'строк обработано',
+        'rows_per_second': 'строк/с',
+        'preliminary_kpis': 'Предварительные KPI (по обработанным строкам)',
         
         # Dashboard
         'supply_chain_dashboard': 'Панель управления цепи поставок',
@@ -502,11 +777,25 @@ TRANSLATIONS = {
         'select_column': 'Выберите столбец',
         'no_numeric_for_distribution': 'Нет числовых столбцов для анализа распределения.',
         'not_enough_numeric': 'Недостаточно числовых столбцов для корреляционного анализа.',
+        'correlation_view': 'Вид Корреляции',
+        'correlation_heatmap': 'Полная матрица',
+        'strongest_pairs': 'Наиболее коррелированные пары',
+        'number_of_pairs': 'Количество пар',
         'select_date_column_viz': 'Выберите столбец даты',
         'select_value_column': 'Выберите столбец значений',
         'date_numeric_required': 'Для анализа временных рядов требуются столбцы даты и числовые столбцы.',
         'select_category_column': 'Выберите столбец категории',
         'category_numeric_required': 'Для анализа по категориям требуются столбцы категорий и числовые столбцы.',
+        'figure_cache': 'Кэш графиков',
+        'cache_hits': 'попаданий',
+        'cache_misses': 'промахов',
+        'cache_entries': 'графиков',
+        'downsampled_points': 'Показано {displayed:,} из {original:,} точек (сокращение в {ratio:.1f} раза)',
+        'downsampled_buckets': '{label}: {displayed:,} интервалов из {original:,} строк (сокращение в {ratio:.1f} раза)',
+        'day_averages': 'Средние по дням',
+        'week_averages': 'Средние по неделям',
+        'month_averages': 'Средние по месяцам',
+        'quarter_averages': 'Средние по кварталам',
         
         # KPI Analysis
         'kpi_analysis_title': '🔍 Анализ KPI',
@@ -531,6 +820,10 @@ TRANSLATIONS = {
         'future_considerations': '💡 Будущие соображения',
         'export_recommendations': '📤 Экспорт рекомендаций',
         'generate_report': 'Создать отчет',
+        'report_format': 'Формат отчета',
+        'rendering_report': 'Построение графиков отчета...',
+        'charts_rendered': 'Построено графиков',
+        'charts_from_cache': 'Графиков из кэша',
         'download_report': 'Скачать отчет',
         'recommendations_after_analysis': 'Бизнес-рекомендации появятся здесь после анализа данных.',
         
@@ -544,6 +837,9 @@ TRANSLATIONS = {
         'export_data': '📤 Экспорт данных',
         'download_csv': 'Скачать CSV',
         'download_excel': 'Скачать Excel',
+        'prepare_csv': 'Подготовить экспорт CSV',
+        'prepare_excel': 'Подготовить экспорт Excel',
+        'preparing_export': 'Подготовка файла экспорта...',
         
         # Status indicators
         'good': '🟢 Хорошо',
@@ -1,32 +1,98 @@
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from plotly.colors import qualitative
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
+
+from caching import LRUCache, dataset_fingerprint
+from correlation import CorrelationService
+from downsampling import lttb_indices
+from instrumentation import traced
+from rollups import TimeRollups
+from translations import get_text
+
+# Histogram bins and summary statistics per (dataset/filter key, column)
+_DISTRIBUTION_CACHE = LRUCache(maxsize=64)
+
+def kpi_gauge_settings(kpi_name, value):
+    """
+    Determine the gauge range, thresholds and color of a KPI
+    
+    Args:
+        kpi_name (str): Name of the KPI
+        value (float): KPI value
+        
+    Returns:
+        tuple: (gauge_range, threshold_high, threshold_low, color)
+    """
+    # Determine gauge range and thresholds based on KPI type
+    if 'rate' in kpi_name.lower() or 'level' in kpi_name.lower():
+        gauge_range = [0, 100]
+        threshold_high = 90
+        threshold_low = 75
+    elif 'turnover' in kpi_name.lower():
+        gauge_range = [0, max(15, value * 1.5)]
+        threshold_high = 8
+        threshold_low = 4
+    elif 'time' in kpi_name.lower():
+        gauge_range = [0, max(30, value * 1.5)]
+        threshold_high = 7  # Lower is better for time
+        threshold_low = 14
+    else:
+        gauge_range = [0, max(100, value * 1.2)]
+        threshold_high = value * 0.9
+        threshold_low = value * 0.7
+    
+    # Determine color based on performance
+    if 'time' in kpi_name.lower():  # Lower is better
+        if value <= threshold_high:
+            color = "green"
+        elif value <= threshold_low:
+            color = "yellow"
+        else:
+            color = "red"
+    else:  # Higher is better
+        if value >= threshold_high:
+            color = "green"
+        elif value >= threshold_low:
+            color = "yellow"
+        else:
+            color = "red"
+    
+    return gauge_range, threshold_high, threshold_low, color
 
 class SupplyChainVisualizations:
     """
     Create interactive visualizations for supply chain data analysis
     """
     
-    def __init__(self, data):
+    def __init__(self, data, max_points=2000, webgl_threshold=1000, cache_key=None, language='en'):
         """
         Initialize with supply chain data
         
         Args:
             data (pd.DataFrame): Supply chain dataset
+            max_points (int): Point budget per time-series trace, larger series are downsampled
+            webgl_threshold (int): Number of plotted points above which WebGL traces are used
+            cache_key (hashable): Identifies the dataset and filter state of data, used to
+                reuse precomputed chart statistics. Computed from the data content if omitted.
+            language (str): Language of the chart notes
         """
         self.data = data
-        self.color_palette = px.colors.qualitative.Set3
+        self._cache_key = cache_key
+        self.color_palette = qualitative.Set3
+        self.max_points = max_points
+        self.webgl_threshold = webgl_threshold
+        self.last_downsampling = None
+        self.language = language
     
-    def create_distribution_plot(self, column):
+    @traced()
+    def create_distribution_plot(self, column, max_bins=200):
         """
         Create distribution plot for a numeric column
         
         Args:
             column (str): Column name to analyze
+            max_bins (int): Upper bound on the number of histogram bins
             
         Returns:
             plotly.graph_objects.Figure: Distribution plot
@@ -37,12 +103,14 @@ class SupplyChainVisualizations:
         if not pd.api.types.is_numeric_dtype(self.data[column]):
             return None
         
-        # Remove null values
-        data_clean = self.data[column].dropna()
+        stats = self._distribution_stats(column, max_bins)
         
-        if len(data_clean) == 0:
+        if stats is None:
             return None
         
+        # Imported on first use, plotly.subplots is slow to import
+        from plotly.subplots import make_subplots
+        
         # Create subplot with histogram and box plot
         fig = make_subplots(
             rows=2, cols=1,
@@ -51,11 +119,12 @@ class SupplyChainVisualizations:
             row_heights=[0.7, 0.3]
         )
         
-        # Histogram
+        # Histogram, binned server-side
         fig.add_trace(
-            go.Histogram(
-                x=data_clean,
-                nbinsx=30,
+            go.Bar(
+                x=stats['bin_centers'],
+                y=stats['counts'],
+                width=stats['bin_widths'],
                 name='Distribution',
                 marker_color=self.color_palette[0],
                 opacity=0.7
@@ -63,10 +132,17 @@ class SupplyChainVisualizations:
             row=1, col=1
         )
         
-        # Box plot
+        # Box plot from precomputed quantiles
         fig.add_trace(
             go.Box(
-                x=data_clean,
+                y=[''],
+                q1=[stats['q1']],
+                median=[stats['median']],
+                q3=[stats['q3']],
+                lowerfence=[stats['lowerfence']],
+                upperfence=[stats['upperfence']],
+                mean=[stats['mean']],
+                orientation='h',
                 name='',
                 marker_color=self.color_palette[1],
                 showlegend=False
@@ -77,11 +153,12 @@ class SupplyChainVisualizations:
         fig.update_layout(
             title=f'Statistical Analysis: {column.title()}',
             height=600,
-            showlegend=False
+            showlegend=False,
+            bargap=0
         )
         
         # Add statistics annotation
-        stats_text = f"Mean: {data_clean.mean():.2f}<br>Median: {data_clean.median():.2f}<br>Std: {data_clean.std():.2f}"
+        stats_text = f"Mean: {stats['mean']:.2f}<br>Median: {stats['median']:.2f}<br>Std: {stats['std']:.2f}"
         fig.add_annotation(
             text=stats_text,
             xref="paper", yref="paper",
@@ -94,51 +171,197 @@ class SupplyChainVisualizations:
         
         return fig
     
-    def create_correlation_matrix(self):
+    def _distribution_stats(self, column, max_bins):
+        """
+        Compute histogram bins and summary statistics of a numeric column, so the
+        chart only plots aggregates instead of every value. Results are cached per
+        (dataset/filter key, column).
+        
+        Args:
+            column (str): Column name to analyze
+            max_bins (int): Upper bound on the number of histogram bins
+            
+        Returns:
+            dict: Bins, quartiles, whiskers, mean and std, or None if the column is empty
+        """
+        cache_key = (self.cache_key, column, max_bins)
+        stats = _DISTRIBUTION_CACHE.get(cache_key)
+        if stats is not None:
+            return stats
+        
+        # Remove null values
+        values = self.data[column].to_numpy(dtype=float, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        
+        if len(values) == 0:
+            return None
+        
+        minimum, q1, median, q3, maximum = np.quantile(values, [0, 0.25, 0.5, 0.75, 1])
+        iqr = q3 - q1
+        
+        # Freedman-Diaconis bin width, falling back to 30 bins for degenerate spreads
+        bin_width = 2 * iqr / len(values) ** (1 / 3)
+        if bin_width > 0 and maximum > minimum:
+            n_bins = int(np.clip(np.ceil((maximum - minimum) / bin_width), 1, max_bins))
+        else:
+            n_bins = 30
+        
+        counts, edges = np.histogram(values, bins=n_bins, range=(minimum, maximum) if maximum > minimum else None)
+        
+        low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        
+        stats = {
+            'counts': counts,
+            'bin_centers': (edges[:-1] + edges[1:]) / 2,
+            'bin_widths': np.diff(edges),
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'lowerfence': values[values >= low].min(),
+            'upperfence': values[values <= high].max(),
+            'mean': values.mean(),
+            'std': values.std(ddof=1) if len(values) > 1 else np.nan
+        }
+        
+        _DISTRIBUTION_CACHE.put(cache_key, stats)
+        return stats
+    
+    @property
+    def cache_key(self):
+        """
+        Key identifying the dataset and filter state of the data, used by chart caches
+        """
+        if self._cache_key is None:
+            self._cache_key = dataset_fingerprint(self.data)
+        return self._cache_key
+    
+    @traced()
+    def create_correlation_matrix(self, cluster=None, max_cell_labels=20):
         """
         Create correlation matrix heatmap for numeric columns
         
+        Args:
+            cluster (bool): Reorder columns so correlated columns are adjacent.
+                Defaults to True when there are more than max_cell_labels columns.
+            max_cell_labels (int): Cell values are printed only up to this many columns
+            
         Returns:
             plotly.graph_objects.Figure: Correlation heatmap
         """
         # Get numeric columns
-        numeric_data = self.data.select_dtypes(include=[np.number])
-        
-        if numeric_data.shape[1] < 2:
+        if self.data.select_dtypes(include=[np.number]).shape[1] < 2:
             return None
         
-        # Calculate correlation matrix
-        corr_matrix = numeric_data.corr()
+        # Calculate correlation matrix (cached per dataset and filter state)
+        service = self._correlation_service()
+        result = service.compute()
+        corr_matrix = result['matrix']
+        wide = len(corr_matrix.columns) > max_cell_labels
+        
+        if cluster or (cluster is None and wide):
+            order = service.clustered_order()
+            corr_matrix = corr_matrix.loc[order, order]
         
         # Create heatmap
+        heatmap_args = {}
+        if not wide:
+            heatmap_args = dict(
+                text=np.round(corr_matrix.values, 2),
+                texttemplate="%{text}",
+                textfont={"size": 10}
+            )
+        
         fig = go.Figure(data=go.Heatmap(
             z=corr_matrix.values,
             x=corr_matrix.columns,
             y=corr_matrix.columns,
             colorscale='RdBu',
             zmid=0,
-            text=np.round(corr_matrix.values, 2),
-            texttemplate="%{text}",
-            textfont={"size": 10},
-            hoverongaps=False
+            hoverongaps=False,
+            **heatmap_args
         ))
         
         fig.update_layout(
-            title='Correlation Matrix of Numeric Variables',
+            title='Correlation Matrix of Numeric Variables' + self._sample_note(result),
             xaxis_title='Variables',
             yaxis_title='Variables',
-            height=600
+            height=max(600, min(len(corr_matrix.columns) * 12, 1600))
+        )
+        
+        return fig
+    
+    @traced()
+    def create_top_correlations(self, k=20):
+        """
+        Create a chart of the most strongly correlated pairs of numeric columns
+        
+        Args:
+            k (int): Number of pairs to show
+            
+        Returns:
+            plotly.graph_objects.Figure: Bar chart with 95% confidence intervals
+        """
+        if self.data.select_dtypes(include=[np.number]).shape[1] < 2:
+            return None
+        
+        service = self._correlation_service()
+        pairs = service.top_pairs(k)
+        
+        if pairs.empty:
+            return None
+        
+        pairs = pairs.iloc[::-1]
+        labels = pairs['variable_1'].astype(str) + ' / ' + pairs['variable_2'].astype(str)
+        
+        fig = go.Figure(go.Bar(
+            x=pairs['correlation'],
+            y=labels,
+            orientation='h',
+            marker_color=np.where(pairs['correlation'] >= 0, self.color_palette[3], self.color_palette[4]),
+            error_x=dict(
+                type='data',
+                symmetric=False,
+                array=pairs['ci_high'] - pairs['correlation'],
+                arrayminus=pairs['correlation'] - pairs['ci_low']
+            ),
+            text=pairs['correlation'].round(2),
+            textposition='auto'
+        ))
+        
+        fig.update_layout(
+            title=f'Top {len(pairs)} Correlated Pairs' + self._sample_note(service.compute()),
+            xaxis_title='Correlation',
+            xaxis_range=[-1, 1],
+            height=max(400, len(pairs) * 28)
         )
         
         return fig
     
-    def create_time_series(self, date_column, value_column):
+    def _correlation_service(self, max_rows=200000):
+        """
+        Get the correlation service for the current dataset and filter state
+        """
+        return CorrelationService(self.data, cache_key=self.cache_key, max_rows=max_rows)
+    
+    def _sample_note(self, result):
+        """
+        Describe the row sample used for correlations, empty when every row was used
+        """
+        if not result['sampled']:
+            return ''
+        return f" (sample of {result['n_rows']:,} / {result['total_rows']:,} rows, ±{result['error_bound']:.3f})"
+    
+    @traced()
+    def create_time_series(self, date_column, value_column, aggregate=True):
         """
         Create time series plot
         
         Args:
             date_column (str): Date column name
             value_column (str): Value column name
+            aggregate (bool): Plot the mean per time bucket from the materialized rollups, at
+                the finest granularity fitting max_points. Otherwise raw rows are plotted,
+                downsampled with LTTB.
             
         Returns:
             plotly.graph_objects.Figure: Time series plot
@@ -147,29 +370,32 @@ class SupplyChainVisualizations:
             value_column not in self.data.columns):
             return None
         
-        # Sort by date
-        df_sorted = self.data.sort_values(date_column)
+        aggregate = aggregate and self._can_aggregate(date_column, [value_column])
+        granularity = self._rollup_granularity(date_column) if aggregate else None
+        
+        # Bucket means or downsampled rows; the trend line is computed on the full data
+        x, y, original_points = self._series_points(date_column, value_column, granularity)
+        self._record_downsampling(original_points, len(x), granularity)
+        scatter = self._scatter_class(len(x))
         
         # Create time series plot
         fig = go.Figure()
         
-        fig.add_trace(go.Scatter(
-            x=df_sorted[date_column],
-            y=df_sorted[value_column],
+        fig.add_trace(scatter(
+            x=x,
+            y=y,
             mode='lines+markers',
             name=value_column.title(),
             line=dict(color=self.color_palette[0]),
             marker=dict(size=4)
         ))
         
-        # Add trend line
-        if len(df_sorted) > 2:
-            z = np.polyfit(range(len(df_sorted)), df_sorted[value_column].fillna(0), 1)
-            p = np.poly1d(z)
-            
-            fig.add_trace(go.Scatter(
-                x=df_sorted[date_column],
-                y=p(range(len(df_sorted))),
+        # Add trend line, fitted on real time offsets
+        trend = self._time_trend(date_column, value_column)
+        if trend is not None:
+            fig.add_trace(scatter(
+                x=x,
+                y=trend(x),
                 mode='lines',
                 name='Trend',
                 line=dict(color='red', dash='dash'),
@@ -182,16 +408,76 @@ class SupplyChainVisualizations:
             yaxis_title=value_column.title(),
             height=500
         )
+        self._annotate_downsampling(fig)
         
         return fig
     
-    def create_category_analysis(self, category_column, value_column):
+    def _can_aggregate(self, date_column, value_columns):
+        """
+        Check that a date column and value columns can be rolled up into time buckets
+        """
+        return (pd.api.types.is_datetime64_any_dtype(self.data[date_column]) and
+                all(pd.api.types.is_numeric_dtype(self.data[col]) for col in value_columns))
+    
+    def _rollup_granularity(self, date_column):
+        """
+        Pick the finest rollup granularity of a date column that fits the point budget
+        """
+        rollups = TimeRollups.for_column(self.data, date_column, self.cache_key)
+        return rollups.choose_granularity(date_column, self.max_points)
+    
+    def _series_points(self, date_column, value_column, granularity=None):
+        """
+        Get the plotted points of one metric
+        
+        Args:
+            date_column (str): Date column name
+            value_column (str): Value column name
+            granularity (str): Rollup granularity, None to plot raw rows downsampled with LTTB
+            
+        Returns:
+            tuple: (x values, y values, number of rows represented)
+        """
+        if granularity is not None:
+            rollups = TimeRollups.for_column(self.data, date_column, self.cache_key)
+            stats = rollups.series(date_column, value_column, granularity)
+            return stats.index, stats['mean'], int(stats['count'].sum())
+        
+        series = self.data[[date_column, value_column]].dropna().sort_values(date_column)
+        selected = lttb_indices(series[date_column], series[value_column], self.max_points)
+        return series[date_column].iloc[selected], series[value_column].iloc[selected], len(series)
+    
+    def _time_trend(self, date_column, value_column):
+        """
+        Fit a linear trend of a metric against time, in days since the first date
+        
+        Returns:
+            callable: Function mapping dates to trend values, or None if no trend can be fitted
+        """
+        if not self._can_aggregate(date_column, [value_column]):
+            return None
+        
+        frame = self.data[[date_column, value_column]].dropna()
+        if len(frame) <= 2:
+            return None
+        
+        origin = frame[date_column].min()
+        offsets = (frame[date_column] - origin) / pd.Timedelta(days=1)
+        if offsets.nunique() < 2:
+            return None
+        
+        p = np.poly1d(np.polyfit(offsets, frame[value_column], 1))
+        return lambda dates: p((pd.DatetimeIndex(dates) - origin) / pd.Timedelta(days=1))
+    
+    @traced()
+    def create_category_analysis(self, category_column, value_column, max_outliers=50):
         """
         Create category analysis visualization
         
         Args:
             category_column (str): Category column name
             value_column (str): Value column name
+            max_outliers (int): Maximum number of outlier points plotted per category
             
         Returns:
             plotly.graph_objects.Figure: Category analysis plot
@@ -200,17 +486,13 @@ class SupplyChainVisualizations:
             value_column not in self.data.columns):
             return None
         
-        # Group by category and calculate statistics
-        grouped = self.data.groupby(category_column)[value_column].agg([
-            'mean', 'median', 'sum', 'count', 'std'
-        ]).reset_index()
+        # Box statistics and outliers of the top 15 categories by mean value
+        grouped, outliers = self.category_box_stats(category_column, value_column, max_outliers=max_outliers)
         
-        # Sort by mean value
-        grouped = grouped.sort_values('mean', ascending=False)
+        if grouped.empty:
+            return None
         
-        # Limit to top 15 categories for readability
-        if len(grouped) > 15:
-            grouped = grouped.head(15)
+        from plotly.subplots import make_subplots
         
         # Create subplot with bar chart and box plot
         fig = make_subplots(
@@ -233,18 +515,40 @@ class SupplyChainVisualizations:
             row=1, col=1
         )
         
-        # Box plot for each category
+        # Box plot for each category, drawn from the precomputed statistics
         categories = grouped[category_column].tolist()
-        for i, cat in enumerate(categories):
-            category_data = self.data[self.data[category_column] == cat][value_column].dropna()
+        outliers_by_category = dict(tuple(outliers.groupby(category_column, observed=True)[value_column]))
+        
+        for i, stats in enumerate(grouped.itertuples(index=False)):
+            cat = categories[i]
+            name = str(cat)[:20]  # Truncate long names
+            color = self.color_palette[i % len(self.color_palette)]
             
-            if len(category_data) > 0:
+            fig.add_trace(
+                go.Box(
+                    x=[name],
+                    q1=[stats.q1],
+                    median=[stats.median],
+                    q3=[stats.q3],
+                    lowerfence=[stats.lowerfence],
+                    upperfence=[stats.upperfence],
+                    mean=[stats.mean],
+                    name=name,
+                    marker_color=color,
+                    showlegend=False
+                ),
+                row=1, col=2
+            )
+            
+            if cat in outliers_by_category:
+                category_outliers = outliers_by_category[cat]
                 fig.add_trace(
-                    go.Box(
-                        y=category_data,
-                        name=str(cat)[:20],  # Truncate long names
-                        boxpoints='outliers',
-                        marker_color=self.color_palette[i % len(self.color_palette)],
+                    go.Scatter(
+                        x=[name] * len(category_outliers),
+                        y=category_outliers,
+                        mode='markers',
+                        name=name,
+                        marker=dict(color=color, size=4),
                         showlegend=False
                     ),
                     row=1, col=2
@@ -262,6 +566,50 @@ class SupplyChainVisualizations:
         
         return fig
     
+    def category_box_stats(self, category_column, value_column, max_categories=15, max_outliers=50):
+        """
+        Compute summary and box statistics for all categories from a single groupby
+        
+        Used by create_category_analysis and by the static report charts.
+        
+        Args:
+            category_column (str): Category column name
+            value_column (str): Value column name
+            max_categories (int): Number of categories kept, by descending mean value
+            max_outliers (int): Maximum number of outlier values kept per category
+            
+        Returns:
+            tuple: (statistics per category, outlier rows)
+        """
+        values = self.data[[category_column, value_column]].dropna()
+        group = values.groupby(category_column, observed=True)[value_column]
+        
+        # Group by category and calculate statistics
+        grouped = group.agg(['mean', 'median', 'sum', 'count', 'std'])
+        quartiles = group.quantile([0.25, 0.75]).unstack()
+        grouped['q1'] = quartiles[0.25]
+        grouped['q3'] = quartiles[0.75]
+        
+        # Sort by mean value and limit to the top categories for readability
+        grouped = grouped.sort_values('mean', ascending=False).head(max_categories)
+        
+        # Whiskers extend to the most extreme values within 1.5 IQR of the quartiles
+        values = values[values[category_column].isin(grouped.index)]
+        categories = values[category_column]
+        iqr = grouped['q3'] - grouped['q1']
+        low = categories.map(grouped['q1'] - 1.5 * iqr).astype(float)
+        high = categories.map(grouped['q3'] + 1.5 * iqr).astype(float)
+        inside = values[value_column].between(low, high)
+        
+        fences = values[inside].groupby(category_column, observed=True)[value_column].agg(['min', 'max'])
+        grouped['lowerfence'] = fences['min']
+        grouped['upperfence'] = fences['max']
+        
+        outliers = values[~inside].groupby(category_column, observed=True).head(max_outliers)
+        
+        return grouped.reset_index(), outliers
+    
+    @traced()
     def create_kpi_dashboard(self, kpis):
         """
         Create KPI dashboard visualization
@@ -284,6 +632,7 @@ class SupplyChainVisualizations:
         # Create gauge charts for key KPIs
         kpi_names = list(main_kpis.keys())[:4]  # Limit to 4 KPIs
         
+        from plotly.subplots import make_subplots
         fig = make_subplots(
             rows=2, cols=2,
             subplot_titles=[name.replace('_', ' ').title() for name in kpi_names],
@@ -298,40 +647,7 @@ class SupplyChainVisualizations:
                 break
                 
             value = main_kpis[kpi_name]
-            
-            # Determine gauge range and thresholds based on KPI type
-            if 'rate' in kpi_name.lower() or 'level' in kpi_name.lower():
-                gauge_range = [0, 100]
-                threshold_high = 90
-                threshold_low = 75
-            elif 'turnover' in kpi_name.lower():
-                gauge_range = [0, max(15, value * 1.5)]
-                threshold_high = 8
-                threshold_low = 4
-            elif 'time' in kpi_name.lower():
-                gauge_range = [0, max(30, value * 1.5)]
-                threshold_high = 7  # Lower is better for time
-                threshold_low = 14
-            else:
-                gauge_range = [0, max(100, value * 1.2)]
-                threshold_high = value * 0.9
-                threshold_low = value * 0.7
-            
-            # Determine color based on performance
-            if 'time' in kpi_name.lower():  # Lower is better
-                if value <= threshold_high:
-                    color = "green"
-                elif value <= threshold_low:
-                    color = "yellow"
-                else:
-                    color = "red"
-            else:  # Higher is better
-                if value >= threshold_high:
-                    color = "green"
-                elif value >= threshold_low:
-                    color = "yellow"
-                else:
-                    color = "red"
+            gauge_range, threshold_high, threshold_low, color = kpi_gauge_settings(kpi_name, value)
             
             fig.add_trace(go.Indicator(
                 mode = "gauge+number+delta",
@@ -361,13 +677,15 @@ class SupplyChainVisualizations:
         
         return fig
     
-    def create_trend_analysis(self, date_column, metrics_columns):
+    @traced()
+    def create_trend_analysis(self, date_column, metrics_columns, aggregate=True):
         """
         Create trend analysis for multiple metrics over time
         
         Args:
             date_column (str): Date column name
             metrics_columns (list): List of metric column names
+            aggregate (bool): Plot bucket means from the rollups instead of raw rows
             
         Returns:
             plotly.graph_objects.Figure: Trend analysis plot
@@ -381,15 +699,24 @@ class SupplyChainVisualizations:
         if not existing_metrics:
             return None
         
-        # Sort by date
-        df_sorted = self.data.sort_values(date_column)
+        aggregate = aggregate and self._can_aggregate(date_column, existing_metrics)
+        granularity = self._rollup_granularity(date_column) if aggregate else None
+        
+        # Bucket means or downsampled rows of each metric
+        points = {metric: self._series_points(date_column, metric, granularity) for metric in existing_metrics}
+        
+        original_points = sum(rows for _, _, rows in points.values())
+        displayed_points = sum(len(x) for x, _, _ in points.values())
+        self._record_downsampling(original_points, displayed_points, granularity)
+        scatter = self._scatter_class(displayed_points)
         
         fig = go.Figure()
         
         for i, metric in enumerate(existing_metrics):
-            fig.add_trace(go.Scatter(
-                x=df_sorted[date_column],
-                y=df_sorted[metric],
+            x, y, _ = points[metric]
+            fig.add_trace(scatter(
+                x=x,
+                y=y,
                 mode='lines+markers',
                 name=metric.title(),
                 line=dict(color=self.color_palette[i % len(self.color_palette)]),
@@ -403,9 +730,11 @@ class SupplyChainVisualizations:
             height=500,
             hovermode='x unified'
         )
+        self._annotate_downsampling(fig)
         
         return fig
     
+    @traced()
     def create_performance_comparison(self, category_column, metrics):
         """
         Create performance comparison across categories
@@ -449,3 +778,46 @@ class SupplyChainVisualizations:
         )
         
         return fig
+    
+    def _scatter_class(self, n_points):
+        """
+        Use WebGL scatter traces when the number of plotted points is above the threshold
+        """
+        return go.Scattergl if n_points > self.webgl_threshold else go.Scatter
+    
+    def _record_downsampling(self, original_points, displayed_points, granularity=None):
+        """
+        Store the point reduction of the last time-series chart
+        """
+        self.last_downsampling = {
+            'original_points': original_points,
+            'displayed_points': displayed_points,
+            'reduction_ratio': original_points / displayed_points if displayed_points else 1.0,
+            'granularity': granularity
+        }
+    
+    def _annotate_downsampling(self, fig):
+        """
+        Add a note to the figure when the plotted series were downsampled
+        """
+        info = self.last_downsampling
+        if not info or info['displayed_points'] >= info['original_points']:
+            return
+        
+        counts = dict(displayed=info['displayed_points'], original=info['original_points'],
+                      ratio=info['reduction_ratio'])
+        if info['granularity']:
+            text = get_text('downsampled_buckets', self.language).format(
+                label=get_text(f"{info['granularity']}_averages", self.language), **counts
+            )
+        else:
+            text = get_text('downsampled_points', self.language).format(**counts)
+        
+        fig.add_annotation(
+            text=text,
+            xref="paper", yref="paper",
+            x=1, y=1.06,
+            xanchor="right",
+            showarrow=False,
+            font=dict(size=10, color="gray")
+        )